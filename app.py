@@ -1,6 +1,7 @@
 import uvicorn
-import os
+from src.config.settings import settings
 
 if __name__ == "__main__":
     # Roda o servidor Uvicorn apontando para a pasta src, arquivo app, objeto app
-    uvicorn.run("src.main:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
+    # reload só em desenvolvimento (API_RELOAD=true): o processo vigia os arquivos e sobe mais devagar
+    uvicorn.run("src.main:app", host=settings.API_HOST, port=settings.API_PORT, reload=settings.API_RELOAD)
\ No newline at end of file
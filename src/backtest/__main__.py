@@ -0,0 +1,47 @@
+import argparse
+import time
+
+from src.backtest.engine import BacktestConfig, run_backtest
+from src.backtest.loader import load_bars
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline backtest of the MarketAnalyzer RSI rules")
+    parser.add_argument("path", help="CSV or Parquet file with time/open/high/low/close/tick_volume")
+    parser.add_argument("--symbol", default="BACKTEST")
+    parser.add_argument("--volume", type=float, default=0.01)
+    parser.add_argument("--point", type=float, default=0.00001)
+    parser.add_argument("--spread", type=float, default=None, help="Spread in points (default: file column)")
+    parser.add_argument("--slippage", type=float, default=0.0, help="Slippage in points")
+    parser.add_argument("--deviation", type=int, default=20)
+    parser.add_argument("--sl", type=float, default=0.0, help="Stop loss in points")
+    parser.add_argument("--tp", type=float, default=0.0, help="Take profit in points")
+    parser.add_argument("--confirm-v-shape", type=int, default=0)
+    parser.add_argument("--confirm-vsa-climax", type=int, default=0)
+    args = parser.parse_args()
+
+    config = BacktestConfig(
+        symbol=args.symbol,
+        volume=args.volume,
+        point=args.point,
+        spread_points=args.spread,
+        slippage_points=args.slippage,
+        deviation=args.deviation,
+        sl_points=args.sl,
+        tp_points=args.tp,
+        confirm_v_shape=args.confirm_v_shape,
+        confirm_vsa_climax=args.confirm_vsa_climax,
+    )
+
+    started = time.perf_counter()
+    rates = load_bars(args.path)
+    result = run_backtest(rates, config)
+    elapsed = time.perf_counter() - started
+
+    print(f"📊 Backtest {args.symbol}: {len(rates)} bars in {elapsed:.2f}s")
+    for key, value in result.stats.items():
+        print(f"   {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
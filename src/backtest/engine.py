@@ -0,0 +1,344 @@
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+from pydantic import BaseModel
+from typing import Optional
+
+from src.strategy.candles import (
+    V_SHAPE_COOLDOWN,
+    V_SHAPE_RECOVERY,
+    VSA_VOLUME_MULTIPLIER,
+    detect_v_shape,
+)
+
+
+class BacktestConfig(BaseModel):
+    """Strategy + execution parameters of one backtest run."""
+    symbol: str = "BACKTEST"
+    volume: float = 0.01
+    contract_size: float = 100000
+    point: float = 0.00001
+    initial_balance: float = 10000.0
+
+    # Execution (mirrors TradeService market orders)
+    spread_points: Optional[float] = None  # None -> use the 'spread' column of the bars
+    slippage_points: float = 0.0           # Simulated slippage on every fill
+    deviation: int = 20                    # Max slippage accepted, as in the order request
+
+    # MarketAnalyzer rules
+    rsi_length: int = 14
+    rsi_oversold: float = 30
+    rsi_overbought: float = 70
+
+    # Optional filters on the MarketAnalyzer columns (off: same signals as the live bot)
+    ema_fast: int = 20
+    ema_slow: int = 50
+    ema_trend_filter: bool = False  # buy only if EMA fast > EMA slow, sell only below
+    bb_length: int = 20
+    bb_std: float = 2.0
+    bb_filter: bool = False         # buy only at/below the lower band, sell at/above the upper one
+
+    # VSA / V-Shape (get_candles rules, averaged over a trailing chart window)
+    vsa_window: int = 100
+    vsa_multiplier: float = VSA_VOLUME_MULTIPLIER
+    v_shape_recovery: float = V_SHAPE_RECOVERY
+    v_shape_cooldown: int = V_SHAPE_COOLDOWN
+    confirm_v_shape: int = 0  # > 0: buy only if a V-Shape formed in the last N bars
+    confirm_vsa_climax: int = 0  # > 0: trade only if a VSA climax bar formed in the last N bars
+
+    # Exits (live bot only has "one position per symbol")
+    exit_on_opposite: bool = True
+    sl_points: float = 0.0
+    tp_points: float = 0.0
+
+
+class BacktestResult:
+    """Trades, per-bar equity curve and summary statistics of a run."""
+    def __init__(self, config: BacktestConfig, times, trades, equity, extra_stats=None):
+        self.config = config
+        self.times = times
+        self.trades = trades
+        self.equity = equity
+        self.stats = self._compute_stats(extra_stats or {})
+
+    def _compute_stats(self, extra):
+        profits = np.array([t["profit"] for t in self.trades], dtype=np.float64)
+        wins = profits[profits > 0]
+        losses = profits[profits <= 0]
+
+        peak = np.maximum.accumulate(self.equity) if len(self.equity) else np.array([])
+        drawdown = (peak - self.equity) if len(self.equity) else np.array([0.0])
+
+        gross_profit = float(wins.sum())
+        gross_loss = float(-losses.sum())
+        return {
+            "trades": int(len(profits)),
+            "wins": int(len(wins)),
+            "losses": int(len(losses)),
+            "win_rate": float(len(wins) / len(profits)) if len(profits) else 0.0,
+            "net_profit": float(profits.sum()),
+            "gross_profit": gross_profit,
+            "gross_loss": gross_loss,
+            "profit_factor": gross_profit / gross_loss if gross_loss > 0 else float("inf") if gross_profit > 0 else 0.0,
+            "avg_trade": float(profits.mean()) if len(profits) else 0.0,
+            "max_drawdown": float(drawdown.max()) if len(drawdown) else 0.0,
+            "final_equity": float(self.equity[-1]) if len(self.equity) else self.config.initial_balance,
+            **extra,
+        }
+
+    def equity_frame(self):
+        """Equity curve as a DataFrame indexed by bar time."""
+        return pd.DataFrame(
+            {"equity": self.equity},
+            index=pd.to_datetime(self.times, unit="s"),
+        )
+
+
+def rolling_mean(values, window: int):
+    """Trailing mean over `window` values (shorter at the start), via cumsum."""
+    values = np.asarray(values, dtype=np.float64)
+    cumsum = np.cumsum(values)
+    totals = cumsum.copy()
+    totals[window:] = cumsum[window:] - cumsum[:-window]
+    counts = np.minimum(np.arange(1, len(values) + 1), window)
+    return totals / counts
+
+
+def compute_rsi(close, length: int):
+    """RSI over the whole series with pandas_ta (same as MarketAnalyzer.prepare_data)."""
+    return ta.rsi(pd.Series(close), length=length).to_numpy(dtype=np.float64)
+
+
+def compute_ema(close, length: int):
+    """EMA over the whole series with pandas_ta (same as MarketAnalyzer.prepare_data)."""
+    return ta.ema(pd.Series(close), length=length).to_numpy(dtype=np.float64)
+
+
+def compute_bbands(close, length: int, std: float):
+    """(lower, upper) Bollinger Bands with pandas_ta (same as MarketAnalyzer.prepare_data)."""
+    bands = ta.bbands(pd.Series(close), length=length, std=std)
+    return bands.iloc[:, 0].to_numpy(dtype=np.float64), bands.iloc[:, 2].to_numpy(dtype=np.float64)
+
+
+def compute_pattern_columns(rates, config: BacktestConfig):
+    """
+    VSA climax and V-Shape flags for every bar. Live, get_candles averages volume and
+    body size over the chart window; here the averages trail over `vsa_window` bars
+    ending at each bar, so a bar is only judged with data available at its close.
+    """
+    open_ = np.asarray(rates["open"], dtype=np.float64)
+    close = np.asarray(rates["close"], dtype=np.float64)
+    volume = np.asarray(rates["tick_volume"], dtype=np.float64)
+
+    avg_volume = rolling_mean(volume, config.vsa_window)
+    avg_body = rolling_mean(np.abs(open_ - close), config.vsa_window)
+
+    climax = volume > avg_volume * config.vsa_multiplier
+    v_shape = np.zeros(len(rates), dtype=bool)
+    v_shape[detect_v_shape(
+        open_, close, avg_body[1:],
+        recovery=config.v_shape_recovery,
+        cooldown=config.v_shape_cooldown,
+    )] = True
+    return climax, v_shape
+
+
+def compute_signals(rates, config: BacktestConfig, rsi=None, v_shape=None, columns=None, climax=None):
+    """
+    Buy/sell signal for every bar (evaluated on the bar close).
+    `rsi` / `v_shape` / `climax` can be passed in to reuse already computed columns, and
+    `columns(name, *params)` to get the others (e.g. a cache shared between runs):
+    ("ema", length) and ("bbands", length, std).
+    """
+    close = np.asarray(rates["close"], dtype=np.float64)
+    if rsi is None:
+        rsi = compute_rsi(close, config.rsi_length)
+    if columns is None:
+        def columns(name, *params):
+            return compute_ema(close, *params) if name == "ema" else compute_bbands(close, *params)
+
+    with np.errstate(invalid="ignore"):
+        buy = rsi < config.rsi_oversold
+        sell = rsi > config.rsi_overbought
+
+        if config.ema_trend_filter:
+            fast = columns("ema", config.ema_fast)
+            slow = columns("ema", config.ema_slow)
+            buy &= fast > slow
+            sell &= fast < slow
+
+        if config.bb_filter:
+            lower, upper = columns("bbands", config.bb_length, config.bb_std)
+            buy &= close <= lower
+            sell &= close >= upper
+
+    if config.confirm_v_shape > 0 or config.confirm_vsa_climax > 0:
+        if v_shape is None or climax is None:
+            patterns = compute_pattern_columns(rates, config)
+            climax = patterns[0] if climax is None else climax
+            v_shape = patterns[1] if v_shape is None else v_shape
+
+    if config.confirm_v_shape > 0:
+        recent = rolling_mean(v_shape, config.confirm_v_shape) > 0
+        buy &= recent
+
+    if config.confirm_vsa_climax > 0:
+        recent = rolling_mean(climax, config.confirm_vsa_climax) > 0
+        buy &= recent
+        sell &= recent
+
+    return buy, sell
+
+
+def simulate(rates, buy, sell, config: BacktestConfig):
+    """
+    Replays the signals with market fills at the next bar open.
+
+    - Bars are bid prices: longs fill at ask (open + spread) and close at bid,
+      shorts the other way around; slippage always works against the trade.
+    - One position per symbol, like TradingBot.tick: signals are ignored while
+      a position is open and buy wins when both fire on the same bar.
+    - If slippage_points > deviation every order is rejected (requote).
+    - Exits: opposite signal (next open), SL/TP inside the bar (SL first when
+      both are touched), or the last bar close.
+    """
+    n = len(rates)
+    times = np.asarray(rates["time"], dtype=np.int64)
+    open_ = np.asarray(rates["open"], dtype=np.float64)
+    high = np.asarray(rates["high"], dtype=np.float64)
+    low = np.asarray(rates["low"], dtype=np.float64)
+    close = np.asarray(rates["close"], dtype=np.float64)
+
+    point = config.point
+    if config.spread_points is None:
+        spread = np.asarray(rates["spread"], dtype=np.float64) * point
+    else:
+        spread = np.full(n, config.spread_points * point)
+    slip = config.slippage_points * point
+    lot_value = config.volume * config.contract_size
+
+    buy_idx = np.flatnonzero(buy[:-1])
+    sell_idx = np.flatnonzero(sell[:-1])
+
+    rejected = 0
+    if config.slippage_points > config.deviation:
+        # Every market order would come back as a requote
+        rejected = int(np.count_nonzero(buy[:-1] | sell[:-1]))
+        buy_idx = sell_idx = np.empty(0, dtype=np.int64)
+
+    trades = []
+
+    def next_signal(indices, start):
+        pos = indices.searchsorted(start)
+        return int(indices[pos]) if pos < len(indices) else None
+
+    cursor = 0
+    while True:
+        next_buy = next_signal(buy_idx, cursor)
+        next_sell = next_signal(sell_idx, cursor)
+        if next_buy is None and next_sell is None:
+            break
+
+        if next_sell is None or (next_buy is not None and next_buy <= next_sell):
+            direction, signal_bar = 1, next_buy
+        else:
+            direction, signal_bar = -1, next_sell
+
+        entry_bar = signal_bar + 1
+        if direction == 1:
+            entry_price = open_[entry_bar] + spread[entry_bar] + slip
+        else:
+            entry_price = open_[entry_bar] - slip
+
+        # Planned exit: opposite signal (filled at the next open) or end of data
+        exit_bar, reason = n - 1, "end"
+        if config.exit_on_opposite:
+            opposite = next_signal(sell_idx if direction == 1 else buy_idx, entry_bar)
+            if opposite is not None:
+                exit_bar, reason = opposite + 1, "signal"
+
+        if reason == "signal":
+            exit_price = open_[exit_bar] - slip if direction == 1 else open_[exit_bar] + spread[exit_bar] + slip
+        else:
+            exit_price = close[exit_bar] if direction == 1 else close[exit_bar] + spread[exit_bar]
+
+        # SL / TP between entry and planned exit (vectorized over the holding period)
+        if config.sl_points > 0 or config.tp_points > 0:
+            segment = slice(entry_bar, exit_bar + 1 if reason == "end" else exit_bar)
+            if direction == 1:
+                bar_low, bar_high = low[segment], high[segment]
+                sl_price = entry_price - config.sl_points * point
+                tp_price = entry_price + config.tp_points * point
+                sl_hit = bar_low <= sl_price if config.sl_points > 0 else np.zeros(len(bar_low), bool)
+                tp_hit = bar_high >= tp_price if config.tp_points > 0 else np.zeros(len(bar_high), bool)
+            else:
+                ask_low = low[segment] + spread[segment]
+                ask_high = high[segment] + spread[segment]
+                sl_price = entry_price + config.sl_points * point
+                tp_price = entry_price - config.tp_points * point
+                sl_hit = ask_high >= sl_price if config.sl_points > 0 else np.zeros(len(ask_high), bool)
+                tp_hit = ask_low <= tp_price if config.tp_points > 0 else np.zeros(len(ask_low), bool)
+
+            hit = sl_hit | tp_hit
+            if hit.any():
+                k = int(np.argmax(hit))
+                exit_bar = entry_bar + k
+                if sl_hit[k]:
+                    exit_price, reason = sl_price - direction * slip, "sl"
+                else:
+                    exit_price, reason = tp_price, "tp"
+
+        profit = direction * (exit_price - entry_price) * lot_value
+        trades.append({
+            "symbol": config.symbol,
+            "direction": "BUY" if direction == 1 else "SELL",
+            "entry_time": int(times[entry_bar]),
+            "entry_price": float(entry_price),
+            "exit_time": int(times[exit_bar]),
+            "exit_price": float(exit_price),
+            "exit_reason": reason,
+            "entry_bar": entry_bar,
+            "exit_bar": exit_bar,
+            "profit": float(profit),
+        })
+
+        # Signals from the exit bar's close on can open the next position
+        cursor = exit_bar
+        if reason == "end":
+            break
+
+    equity = _equity_curve(trades, close, spread, lot_value, config.initial_balance)
+    return BacktestResult(config, times, trades, equity, {"rejected_orders": rejected})
+
+
+def _equity_curve(trades, close, spread, lot_value: float, initial_balance: float):
+    """Per-bar equity: realized profit from each exit bar on + open trade marked to market."""
+    n = len(close)
+    realized = np.zeros(n)
+    unrealized = np.zeros(n)
+
+    for trade in trades:
+        entry, exit_ = trade["entry_bar"], trade["exit_bar"]
+        realized[exit_] += trade["profit"]
+        if exit_ > entry:
+            if trade["direction"] == "BUY":
+                unrealized[entry:exit_] += (close[entry:exit_] - trade["entry_price"]) * lot_value
+            else:
+                unrealized[entry:exit_] += (trade["entry_price"] - close[entry:exit_] - spread[entry:exit_]) * lot_value
+
+    return initial_balance + np.cumsum(realized) + unrealized
+
+
+def run_backtest(rates, config: BacktestConfig = None):
+    """Computes indicators, patterns and signals for the whole series and simulates the fills."""
+    config = config or BacktestConfig()
+    climax, v_shape = compute_pattern_columns(rates, config)
+    buy, sell = compute_signals(rates, config, v_shape=v_shape, climax=climax)
+
+    result = simulate(rates, buy, sell, config)
+    result.stats.update({
+        "bars": int(len(rates)),
+        "vsa_climax_bars": int(np.count_nonzero(climax)),
+        "v_shape_patterns": int(np.count_nonzero(v_shape)),
+    })
+    return result
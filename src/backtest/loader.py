@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.strategy.candles import RATES_DTYPE
+
+REQUIRED_COLUMNS = ("time", "open", "high", "low", "close")
+
+
+def load_bars(path: str):
+    """
+    Loads historical bars from a CSV or Parquet file into a MT5-style rates array.
+
+    Expected columns: time, open, high, low, close and optionally tick_volume,
+    spread, real_volume. `time` may be Unix seconds or any datetime pandas can parse.
+    Rows are sorted by time and duplicated timestamps are dropped (last one wins).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".parquet", ".pq"):
+        df = pd.read_parquet(path)
+    elif ext in (".csv", ".txt"):
+        df = pd.read_csv(path)
+    else:
+        raise ValueError(f"Unsupported bar file format: {path}")
+
+    return frame_to_rates(df)
+
+
+def frame_to_rates(df: pd.DataFrame):
+    """Converts a DataFrame of bars into a RATES_DTYPE structured array."""
+    df = df.rename(columns=str.lower)
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing bar columns: {missing}")
+
+    times = df["time"]
+    if not pd.api.types.is_numeric_dtype(times):
+        times = pd.to_datetime(times, utc=True).astype("int64") // 10**9
+
+    rates = np.zeros(len(df), dtype=RATES_DTYPE)
+    rates["time"] = np.asarray(times, dtype=np.int64)
+    for column in ("open", "high", "low", "close"):
+        rates[column] = df[column].to_numpy(dtype=np.float64)
+    for column in ("tick_volume", "spread", "real_volume"):
+        if column in df.columns:
+            rates[column] = df[column].to_numpy()
+
+    order = np.argsort(rates["time"], kind="stable")
+    rates = rates[order]
+
+    # Keep the last row of each duplicated timestamp
+    keep = np.ones(len(rates), dtype=bool)
+    keep[:-1] = rates["time"][1:] != rates["time"][:-1]
+    return rates[keep]
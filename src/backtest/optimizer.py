@@ -0,0 +1,431 @@
+"""
+Grid / random search over the BacktestConfig parameters.
+
+    python -m src.backtest.optimizer bars.csv rsi_length=7,14,21 rsi_oversold=20:35:5 --out results.jsonl
+    python -m src.backtest.optimizer bars.csv rsi_length=5:30 v_shape_recovery=0.5:1.0 confirm_v_shape=0,3,5 \\
+        --random 10000 --seed 1 --out results.jsonl
+
+Specs: `name=a,b,c` (values), `name=lo:hi:step` (grid range, both ends included) or
+`name=lo:hi` (random range, integers if both ends are). The BacktestConfig fields
+that change the signals or the fills (SEARCH_FIELDS) can be searched; --set fixes
+any field (e.g. --set sl_points=150 spread_points=12 point=0.01). A parameter of a
+filter that is off everywhere (e.g. vsa_multiplier without confirm_vsa_climax) is
+refused, it would only multiply the runs.
+
+1. The bars are copied once into shared memory: every worker of the process pool
+   maps the same buffer, nothing is pickled per evaluation.
+2. The combinations are sorted by their indicator parameters and handed out in
+   batches, so a worker computes each RSI / EMA / Bollinger / V-Shape column once
+   (per-process LRU cache) for all the parameter sets that share it.
+3. Every result is appended to the JSONL file as soon as its batch lands. A rerun
+   with the same file skips the combinations already there (same bars and same
+   config); the ranking by --metric is written to <out>.ranked.jsonl at the end.
+"""
+import argparse
+import concurrent.futures
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import time
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.backtest.engine import (
+    BacktestConfig,
+    compute_bbands,
+    compute_ema,
+    compute_pattern_columns,
+    compute_rsi,
+    compute_signals,
+    rolling_mean,
+    simulate,
+)
+from src.backtest.loader import load_bars
+from src.strategy.candles import RATES_DTYPE
+
+# Fields that change a cached column; combinations are sorted by them
+COLUMN_FIELDS = (
+    "rsi_length", "ema_fast", "ema_slow", "bb_length", "bb_std",
+    "vsa_window", "vsa_multiplier", "v_shape_recovery", "v_shape_cooldown",
+    "confirm_v_shape", "confirm_vsa_climax",
+)
+# Fields that change the signals or the fills (symbol, volume, balance... do not)
+SEARCH_FIELDS = COLUMN_FIELDS + (
+    "rsi_oversold", "rsi_overbought", "ema_trend_filter", "bb_filter",
+    "spread_points", "slippage_points", "deviation", "exit_on_opposite", "sl_points", "tp_points",
+)
+# Parameter -> filters it belongs to (it does nothing unless one of them is on)
+FILTER_PARAMS = {
+    "ema_fast": ("ema_trend_filter",),
+    "ema_slow": ("ema_trend_filter",),
+    "bb_length": ("bb_filter",),
+    "bb_std": ("bb_filter",),
+    "vsa_window": ("confirm_v_shape", "confirm_vsa_climax"),
+    "vsa_multiplier": ("confirm_vsa_climax",),
+    "v_shape_recovery": ("confirm_v_shape",),
+    "v_shape_cooldown": ("confirm_v_shape",),
+}
+COLUMN_CACHE_SIZE = 64
+METRICS = ("net_profit", "profit_factor", "win_rate", "avg_trade", "final_equity", "max_drawdown")
+
+
+# --- Search space ---
+
+def _number(text: str):
+    text = text.strip()
+    if text.lower() in ("true", "false"):
+        return text.lower() == "true"
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parse_space(specs, fields=SEARCH_FIELDS):
+    """
+    {"name": [values]} or {"name": (lo, hi)} from "name=..." specs (see module doc).
+    Fields outside `fields` raise ValueError.
+    """
+    space = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        name = name.strip()
+        if not sep or not values:
+            raise ValueError(f"Bad parameter spec '{spec}' (expected name=values)")
+        if name not in fields:
+            raise ValueError(f"Parameter '{name}' cannot be searched. Use one of {sorted(fields)}.")
+
+        if ":" in values:
+            parts = [_number(v) for v in values.split(":")]
+            if len(parts) == 2:
+                space[name] = tuple(parts)
+            elif len(parts) == 3:
+                lo, hi, step = parts
+                if step <= 0:
+                    raise ValueError(f"Step of '{name}' must be positive")
+                count = int(math.floor((hi - lo) / step + 1e-9)) + 1
+                space[name] = [round(lo + i * step, 10) if isinstance(step, float) else lo + i * step for i in range(count)]
+            else:
+                raise ValueError(f"Bad range '{values}' for '{name}' (lo:hi or lo:hi:step)")
+        else:
+            space[name] = [_number(v) for v in values.split(",")]
+    return space
+
+
+def check_space(space, base: dict):
+    """Raises ValueError for searched parameters of filters that are off in every combination."""
+    for name, filters in FILTER_PARAMS.items():
+        if name not in space:
+            continue
+        if not any(base.get(f) or any(space.get(f, ())) for f in filters):
+            raise ValueError(f"'{name}' has no effect unless one of {', '.join(filters)} is on")
+
+
+def grid(space):
+    """Every combination of the listed values (ranges need a step for a grid)."""
+    for name, values in space.items():
+        if isinstance(values, tuple):
+            raise ValueError(f"Grid search needs values or lo:hi:step for '{name}'")
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*space.values())]
+
+
+def random_samples(space, count: int, seed: int = None):
+    """`count` distinct random combinations (fewer if the space is smaller)."""
+    rng = random.Random(seed)
+    combos, seen = [], set()
+    for _ in range(count * 20):
+        if len(combos) == count:
+            break
+        params = {}
+        for name, values in space.items():
+            if isinstance(values, list):
+                params[name] = rng.choice(values)
+            elif isinstance(values[0], int) and isinstance(values[1], int):
+                params[name] = rng.randint(values[0], values[1])
+            else:
+                params[name] = round(rng.uniform(values[0], values[1]), 6)
+        key = json.dumps(params, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            combos.append(params)
+    return combos
+
+
+def dataset_id(rates) -> str:
+    """Fingerprint of the bars: results of other data are never reused."""
+    digest = hashlib.sha1(np.ascontiguousarray(rates).tobytes()).hexdigest()[:12]
+    return f"{len(rates)}:{digest}"
+
+
+def combo_id(dataset: str, config: BacktestConfig) -> str:
+    payload = json.dumps({"dataset": dataset, "config": config.model_dump()}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+# --- Shared bars ---
+
+class SharedBars:
+    """A RATES_DTYPE array in a named shared memory block, created once by the parent."""
+    def __init__(self, rates):
+        rates = np.ascontiguousarray(rates, dtype=RATES_DTYPE)
+        self.count = len(rates)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, rates.nbytes))
+        self.array = np.ndarray(self.count, dtype=RATES_DTYPE, buffer=self.shm.buf)
+        self.array[:] = rates
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        self.array = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+# --- Worker side ---
+
+_worker = {}
+
+
+def _init_worker(shm_name: str, count: int, base: dict):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker.update(
+        shm=shm,  # Keeps the mapping alive for the life of the process
+        rates=np.ndarray(count, dtype=RATES_DTYPE, buffer=shm.buf),
+        base=base,
+        cache=OrderedDict(),
+    )
+
+
+def _column(key, compute):
+    """Per-process LRU of indicator columns (one column per key, shared by every combination)."""
+    cache = _worker["cache"]
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache[key] = value
+        if len(cache) > COLUMN_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return value
+
+
+def evaluate(rates, config: BacktestConfig, column=None):
+    """
+    Stats of run_backtest for one config. `column(key, compute)` returns the indicator
+    column of `key`, computing it only when it is not cached.
+    """
+    if column is None:
+        def column(_key, compute):
+            return compute()
+
+    close = np.asarray(rates["close"], dtype=np.float64)
+    rsi = column(("rsi", config.rsi_length), lambda: compute_rsi(close, config.rsi_length))
+
+    def columns(name, *params):
+        if name == "ema":
+            return column(("ema", *params), lambda: compute_ema(close, *params))
+        return column(("bbands", *params), lambda: compute_bbands(close, *params))
+
+    # compute_signals would recompute the trailing pattern means: the filters are
+    # applied here with cached columns instead
+    buy, sell = compute_signals(
+        rates, config.model_copy(update={"confirm_v_shape": 0, "confirm_vsa_climax": 0}), rsi=rsi, columns=columns
+    )
+
+    if config.confirm_v_shape > 0:
+        v_shape_key = ("v_shape", config.vsa_window, config.v_shape_recovery, config.v_shape_cooldown)
+        v_shape = column(v_shape_key, lambda: compute_pattern_columns(rates, config)[1])
+        buy &= column(
+            (*v_shape_key, "recent", config.confirm_v_shape),
+            lambda: rolling_mean(v_shape, config.confirm_v_shape) > 0,
+        )
+
+    if config.confirm_vsa_climax > 0:
+        climax_key = ("climax", config.vsa_window, config.vsa_multiplier)
+        climax = column(climax_key, lambda: compute_pattern_columns(rates, config)[0])
+        recent = column(
+            (*climax_key, "recent", config.confirm_vsa_climax),
+            lambda: rolling_mean(climax, config.confirm_vsa_climax) > 0,
+        )
+        buy &= recent
+        sell &= recent
+
+    return simulate(rates, buy, sell, config).stats
+
+
+def _evaluate_batch(batch):
+    rates, base = _worker["rates"], _worker["base"]
+    results = []
+    for key, params in batch:
+        config = BacktestConfig(**{**base, **params})
+        results.append({"id": key, "params": params, "stats": evaluate(rates, config, _column)})
+    return results
+
+
+# --- Parent side ---
+
+def load_results(path: str):
+    """Results already in a JSONL file, by id (a torn last line is ignored)."""
+    done = {}
+    if not path or not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done[record["id"]] = record
+    return done
+
+
+def rank(records, metric: str = "net_profit", min_trades: int = 0):
+    """Records sorted best first (lowest first for max_drawdown)."""
+    records = [r for r in records if r["stats"]["trades"] >= min_trades]
+    return sorted(records, key=lambda r: r["stats"][metric], reverse=metric != "max_drawdown")
+
+
+def _batches(jobs, workers: int):
+    # Neighbouring combinations share their columns: keep them in the same batch
+    jobs = sorted(jobs, key=lambda job: tuple(str(job[2].get(f)) for f in COLUMN_FIELDS))
+    size = max(1, min(256, math.ceil(len(jobs) / (workers * 8))))
+    for i in range(0, len(jobs), size):
+        yield [(key, params) for key, params, _ in jobs[i:i + size]]
+
+
+class Optimizer:
+    """
+    Evaluates parameter combinations of BacktestConfig over one bar series with a
+    process pool (all cores by default), appending each result to `results_path`.
+    """
+    def __init__(self, rates, base: dict = None, results_path: str = None, workers: int = None):
+        self.rates = rates
+        self.base = BacktestConfig(**(base or {})).model_dump()
+        self.results_path = results_path
+        self.workers = workers or os.cpu_count() or 1
+        self.dataset = dataset_id(rates)
+        self.stats = {"combinations": 0, "skipped": 0, "evaluated": 0, "seconds": 0.0, "per_second": 0.0}
+
+    def run(self, combos, progress=None):
+        """Evaluates the combinations not already in the results file; returns every record."""
+        done = load_results(self.results_path)
+        records, jobs, seen = [], [], set()
+        for params in combos:
+            config = BacktestConfig(**{**self.base, **params})
+            key = combo_id(self.dataset, config)
+            if key in seen:
+                continue
+            seen.add(key)
+            if key in done:
+                records.append(done[key])
+            else:
+                jobs.append((key, params, config.model_dump()))
+
+        self.stats.update(combinations=len(seen), skipped=len(records))
+        started = time.perf_counter()
+        if jobs:
+            records += self._evaluate(jobs, progress)
+        elapsed = time.perf_counter() - started
+        self.stats.update(
+            evaluated=len(jobs),
+            seconds=round(elapsed, 2),
+            per_second=round(len(jobs) / elapsed, 1) if elapsed else 0.0,
+        )
+        return records
+
+    def _evaluate(self, jobs, progress):
+        records = []
+        bars = SharedBars(self.rates)
+        out = None
+        if self.results_path:
+            out = open(self.results_path, "a+", encoding="utf-8")
+            if out.tell() > 0:
+                out.seek(out.tell() - 1)
+                if out.read(1) != "\n":
+                    out.write("\n")  # Ends a line torn by a killed run
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(bars.name, bars.count, self.base),
+            ) as pool:
+                futures = [pool.submit(_evaluate_batch, batch) for batch in _batches(jobs, self.workers)]
+                for future in concurrent.futures.as_completed(futures):
+                    batch = future.result()
+                    records += batch
+                    if out is not None:
+                        out.write("".join(json.dumps(record) + "\n" for record in batch))
+                        out.flush()  # A killed run resumes from the last written batch
+                    if progress is not None:
+                        progress(len(records), len(jobs))
+        finally:
+            if out is not None:
+                out.close()
+            bars.close()
+        return records
+
+
+def write_ranked(path: str, ranked):
+    with open(path, "w", encoding="utf-8") as f:
+        for position, record in enumerate(ranked, 1):
+            f.write(json.dumps({"rank": position, **record}) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid / random search over the backtest parameters")
+    parser.add_argument("path", help="CSV or Parquet file with time/open/high/low/close/tick_volume")
+    parser.add_argument("specs", nargs="+", metavar="NAME=VALUES", help="Searched parameters (see the module doc)")
+    parser.add_argument("--random", type=int, default=None, metavar="N", help="N random combinations (default: grid)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--set", nargs="+", default=[], metavar="NAME=VALUE", help="Fixed BacktestConfig fields")
+    parser.add_argument("--out", default="optimizer_results.jsonl", help="JSONL results (appended, resumable)")
+    parser.add_argument("--metric", default="net_profit", choices=METRICS)
+    parser.add_argument("--min-trades", type=int, default=0, help="Leave out of the ranking below this")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: every core)")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    try:
+        base = {name: values[0] for name, values in parse_space(args.set, BacktestConfig.model_fields).items()}
+        space = parse_space(args.specs)
+        check_space(space, base)
+        combos = grid(space) if args.random is None else random_samples(space, args.random, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+
+    rates = load_bars(args.path)
+    optimizer = Optimizer(rates, base, args.out, args.workers)
+    print(f"🔎 {len(combos)} combinations over {len(rates)} bars with {optimizer.workers} workers")
+
+    next_report = [0]
+
+    def progress(done, total):
+        if done >= next_report[0] or done == total:
+            print(f"   {done}/{total}")
+            next_report[0] = done + max(1, total // 10)
+
+    records = optimizer.run(combos, progress)
+    ranked = rank(records, args.metric, args.min_trades)
+    ranked_path = os.path.splitext(args.out)[0] + ".ranked.jsonl"
+    write_ranked(ranked_path, ranked)
+
+    s = optimizer.stats
+    print(f"✅ {s['evaluated']} evaluated ({s['skipped']} resumed) in {s['seconds']}s ({s['per_second']}/s) "
+          f"-> {args.out}, ranking by {args.metric} -> {ranked_path}")
+    for position, record in enumerate(ranked[:args.top], 1):
+        stats = record["stats"]
+        print(f"   #{position:<3} {args.metric}={stats[args.metric]:.4f} trades={stats['trades']} "
+              f"win_rate={stats['win_rate']:.2f} max_dd={stats['max_drawdown']:.2f}  {record['params']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark suite on top of the fake MetaTrader5 terminal (src/testing/fake_mt5.py).
+
+    python -m src.benchmarks                     # all cases, saved to benchmark_results/
+    python -m src.benchmarks -k get_candles      # only cases whose name contains the text
+    python -m src.benchmarks --latency 0.002     # simulated terminal IPC per call
+
+Every run is saved as JSON (commit, Python version, settings, per-case stats) and
+compared with the previous run in the same folder; --fail-above turns regressions of
+the median into a non-zero exit code.
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+from pathlib import Path
+
+# Must run before any src module reads the settings or imports MetaTrader5
+for _name, _value in (("MT5_LOGIN", "1"), ("MT5_PASSWORD", "bench"), ("MT5_SERVER", "Fake-Server")):
+    os.environ.setdefault(_name, _value)
+os.environ["TELEGRAM_TOKEN"] = ""  # Never send alerts from a benchmark
+
+from src.testing import fake_mt5  # noqa: E402
+
+
+STANDARD_STATS = ("runs", "min_ms", "median_ms", "p95_ms", "mean_ms", "max_ms")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def latest_result(folder: Path):
+    files = sorted(folder.glob("*.json"))
+    if not files:
+        return None
+    with open(files[-1], encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(current, previous, fail_above: float):
+    """Prints the median change per case. Returns the names of the regressed cases."""
+    print(f"\n📈 Compared with {previous['commit']} ({previous['timestamp']})")
+    regressions = []
+    for name, stats in current["results"].items():
+        before = previous["results"].get(name)
+        if before is None or not before.get("median_ms"):
+            print(f"   {name:<36} new")
+            continue
+        change = (stats["median_ms"] - before["median_ms"]) / before["median_ms"] * 100
+        flag = ""
+        if fail_above and change > fail_above:
+            flag = "  ⚠️ regression"
+            regressions.append(name)
+        print(f"   {name:<36} {before['median_ms']:>10.3f} -> {stats['median_ms']:>10.3f} ms  {change:+6.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks against the fake MetaTrader5 terminal")
+    parser.add_argument("-k", "--filter", default="", help="Run only cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed runs per case")
+    parser.add_argument("--latency", type=float, default=0.0005, help="Seconds slept per fake MT5 call")
+    parser.add_argument("--output", default="benchmark_results", help="Folder of the JSON results")
+    parser.add_argument("--no-save", action="store_true", help="Do not write the results file")
+    parser.add_argument("--fail-above", type=float, default=0.0,
+                        help="Exit with 1 if a median got slower than this percentage (0 = never)")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    args = parser.parse_args()
+
+    fake_mt5.install(latency=args.latency)
+    from src.benchmarks.suite import CASES
+    from src.config.settings import settings
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # One INFO line per request otherwise
+
+    names = [name for name in CASES if args.filter in name]
+    if args.list:
+        print("\n".join(names))
+        return
+
+    results = {}
+    for name in names:
+        # Every case starts from the same terminal state (same clock, same series)
+        fake_mt5.configure(latency=args.latency)
+        fake_mt5.initialize()
+        stats = CASES[name](args.repeat)
+        results[name] = stats
+        extra = "".join(f"  {key} {value}" for key, value in stats.items() if key not in STANDARD_STATS)
+        print(f"⏱️  {name:<36} median {stats['median_ms']:>10.3f} ms  p95 {stats['p95_ms']:>10.3f} ms{extra}")
+
+    run = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "latency": args.latency,
+        "repeat": args.repeat,
+        "symbol": settings.SYMBOL,
+        "timeframe": settings.TIMEFRAME,
+        "results": results,
+    }
+
+    folder = Path(args.output)
+    previous = latest_result(folder) if folder.is_dir() else None
+    regressions = compare(run, previous, args.fail_above) if previous else []
+
+    if not args.no_save:
+        folder.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = folder / f"{stamp}-{run['commit']}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+        print(f"\n💾 Results saved to {path}")
+
+    if regressions:
+        print(f"❌ {len(regressions)} case(s) slower than {args.fail_above:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Runs the API against the fake MetaTrader5 terminal (used by the startup benchmark).
+
+    python -m src.benchmarks.serve --port 8765 --latency 0.0005
+"""
+import argparse
+import os
+
+for _name, _value in (("MT5_LOGIN", "1"), ("MT5_PASSWORD", "bench"), ("MT5_SERVER", "Fake-Server")):
+    os.environ.setdefault(_name, _value)
+os.environ["TELEGRAM_TOKEN"] = ""
+
+from src.testing import fake_mt5  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API server on the fake MetaTrader5 terminal")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0005)
+    args = parser.parse_args()
+
+    fake_mt5.install(latency=args.latency)
+    import uvicorn
+
+    uvicorn.run("src.main:app", host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+import asyncio
+import statistics
+import time
+
+from src.testing import fake_mt5
+
+# name -> callable(repeat) returning the stats dict of the case
+CASES = {}
+
+
+def case(name: str):
+    def register(func):
+        CASES[name] = func
+        return func
+    return register
+
+
+def summarize(samples, **extra):
+    """Milliseconds: min / median / p95 / mean / max over the timed runs."""
+    ordered = sorted(samples)
+    ms = [s * 1000 for s in ordered]
+    stats = {
+        "runs": len(ms),
+        "min_ms": round(ms[0], 4),
+        "median_ms": round(statistics.median(ms), 4),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 4),
+        "mean_ms": round(statistics.fmean(ms), 4),
+        "max_ms": round(ms[-1], 4),
+    }
+    stats.update(extra)
+    return stats
+
+
+def measure(func, repeat: int, warmup: int = 1, setup=None):
+    """Times `func()` `repeat` times (after `warmup` untimed runs); `setup()` is not timed."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+async def measure_async(func, repeat: int, warmup: int = 1, setup=None):
+    for _ in range(warmup):
+        if setup:
+            setup()
+        await func()
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+# --- MT5Service.get_candles ---
+
+def _connected_service():
+    from src.services.mt5_service import MT5Service
+
+    service = MT5Service()
+    service.initialize()
+    return service
+
+
+def bench_get_candles(num_candles: int, warm: bool, repeat: int):
+    """
+    cold: empty candle cache, the whole window is copied from the terminal.
+    warm: the clock moves 1s between calls (forming bar update + VSA / V-Shape pass).
+    """
+    from src.config.settings import settings
+    from src.services.candle_cache import CandleCache
+    from src.utils import get_mt5_timeframe
+
+    service = _connected_service()
+    timeframe = get_mt5_timeframe(settings.TIMEFRAME)
+
+    def reset():
+        service.candle_cache = CandleCache()
+
+    def tick():
+        fake_mt5.advance(1)
+
+    return measure(
+        lambda: service.get_candles(settings.SYMBOL, timeframe, num_candles),
+        repeat, setup=tick if warm else reset,
+    )
+
+
+for _count in (100, 1_000, 10_000):
+    for _warm in (False, True):
+        case(f"get_candles[{_count},{'warm' if _warm else 'cold'}]")(
+            lambda repeat, count=_count, warm=_warm: bench_get_candles(count, warm, repeat)
+        )
+
+
+# --- Every timeframe of a symbol (M1 + M5..D1) ---
+
+def bench_multi_timeframe(resample_from_m1: bool, repeat: int):
+    """
+    The clock moves 1s, then 200-bar windows of M1, M5, M15, H1, H4 and D1 are read:
+    native = one tail fetch per timeframe, resampled = M2..D1 built from the M1 series.
+    """
+    from src.services.candle_cache import CandleCache
+
+    cache = CandleCache(resample_from_m1=resample_from_m1)
+    timeframes = (fake_mt5.TIMEFRAME_M1, fake_mt5.TIMEFRAME_M5, fake_mt5.TIMEFRAME_M15,
+                  fake_mt5.TIMEFRAME_H1, fake_mt5.TIMEFRAME_H4, fake_mt5.TIMEFRAME_D1)
+
+    def read_all():
+        for timeframe in timeframes:
+            cache.get_window("EURUSDm", timeframe, 200)
+
+    read_all()
+    calls_before = _rate_calls()
+    stats = measure(read_all, repeat, setup=lambda: fake_mt5.advance(1))
+    stats["terminal_rate_calls_per_run"] = round((_rate_calls() - calls_before) / (repeat + 1), 2)
+    return stats
+
+
+case("multi_timeframe[native]")(lambda repeat: bench_multi_timeframe(False, repeat))
+case("multi_timeframe[resampled]")(lambda repeat: bench_multi_timeframe(True, repeat))
+
+
+# --- MarketAnalyzer.prepare_data ---
+
+def bench_prepare_data(num_candles: int, repeat: int):
+    from src.strategy.analysis import MarketAnalyzer
+
+    rates = fake_mt5.copy_rates_from_pos("EURUSDm", fake_mt5.TIMEFRAME_M5, 0, num_candles)
+    analyzer = MarketAnalyzer()
+    return measure(lambda: analyzer.prepare_data(rates), repeat)
+
+
+for _count in (100, 1_000, 10_000):
+    case(f"prepare_data[{_count}]")(lambda repeat, count=_count: bench_prepare_data(count, repeat))
+
+
+# --- Pattern detectors over a long history ---
+
+def bench_patterns(spec: str, repeat: int):
+    from src.strategy.candles import compute_candle_columns
+    from src.strategy.patterns import warmup
+
+    warmup()
+    rates = fake_mt5.copy_rates_from_pos("EURUSDm", fake_mt5.TIMEFRAME_M1, 0, 100_000)
+    return measure(lambda: compute_candle_columns(rates, patterns=spec), repeat)
+
+
+case("candle_columns[100000,default]")(lambda repeat: bench_patterns("VSA_CLIMAX,V_SHAPE", repeat))
+case("candle_columns[100000,all_patterns]")(
+    lambda repeat: bench_patterns("VSA_CLIMAX,V_SHAPE,ENGULFING,PIN_BAR,INSIDE_BAR,DOJI", repeat)
+)
+
+
+# --- TradingBot.tick ---
+
+@case("trading_bot_tick")
+def bench_tick(repeat: int):
+    """Full tick through the MT5 worker thread; the clock moves 1s per tick."""
+    from src.main_logic import TradingBot
+
+    async def run():
+        bot = TradingBot()
+        await bot.mt5_service.initialize_async()
+        stats = await measure_async(bot.tick, repeat, warmup=3, setup=lambda: fake_mt5.advance(1))
+        bot.trade_service.pipeline.stop()
+        return stats
+
+    return asyncio.run(run())
+
+
+@case("replay_bot_tick")
+def bench_replay(repeat: int):
+    """
+    TradingBot.tick after every step of a recorded market: 30 min of fake ticks of two
+    symbols recorded with TickRecorder, replayed as fast as possible (10 steps per repeat).
+    """
+    import tempfile
+
+    from src.config.settings import settings
+    from src.main_logic import TradingBot
+    from src.ticks.recorder import TickRecorder
+    from src.ticks.replay import ReplayEngine, ReplayMarket
+    from src.ticks.store import TickStore
+
+    async def run():
+        with tempfile.TemporaryDirectory() as folder:
+            store = TickStore(folder)
+            recorder = TickRecorder(store, [settings.SYMBOL, "XAUUSDm"], interval=10)
+            for _ in range(180):
+                fake_mt5.advance(10)
+                await recorder.poll()
+            await recorder.stop()
+
+            market = ReplayMarket(store)
+            fake_mt5.configure(latency=fake_mt5.terminal.latency, symbols=market.symbols,
+                               market=market, now=market.start_msc / 1000)
+            bot = TradingBot()
+            await bot.mt5_service.initialize_async()
+
+            samples = []
+
+            async def on_step(_time_msc):
+                started = time.perf_counter()
+                await bot.tick()
+                samples.append(time.perf_counter() - started)
+
+            stats = await ReplayEngine(market, speed=0).run(on_step, steps=repeat * 10)
+            bot.trade_service.pipeline.stop()
+        return summarize(samples, steps_per_second=round(stats["steps"] / stats["wall_seconds"], 1))
+
+    return asyncio.run(run())
+
+
+# --- API startup ---
+
+@case("startup")
+def bench_startup(repeat: int):
+    """
+    Starts the API in a fresh process (fake terminal) and records, from the spawn:
+    time to the first HTTP byte and time until /api/ready answers 200 (MT5
+    connected, watchlist history loaded, pattern kernels compiled).
+    """
+    import os
+    import socket
+    import subprocess
+    import sys
+
+    import httpx
+
+    first_byte, ready = [], []
+    for _ in range(max(1, min(repeat, 5))):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "src.benchmarks.serve", "--port", str(port),
+             "--latency", str(fake_mt5.terminal.latency)],
+            env=os.environ.copy(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            first = None
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+                while time.perf_counter() - started < 60:
+                    try:
+                        response = client.get("/api/ready")
+                    except httpx.TransportError:
+                        time.sleep(0.005)
+                        continue
+                    first = first or time.perf_counter() - started
+                    if response.status_code == 200:
+                        ready.append(time.perf_counter() - started)
+                        break
+                    time.sleep(0.005)
+            if first is None or len(ready) < len(first_byte) + 1:
+                raise RuntimeError("API did not become ready within 60s")
+            first_byte.append(first)
+        finally:
+            server.terminate()
+            server.wait(10)
+
+    stats = summarize(ready)
+    stats["first_byte_median_ms"] = round(statistics.median(first_byte) * 1000, 1)
+    return stats
+
+
+# --- /api/chart-data under concurrent load ---
+
+def _rate_calls():
+    return fake_mt5.terminal.calls.get("copy_rates_from_pos", 0)
+
+
+def bench_chart_data(response_format: str, concurrency: int, repeat: int):
+    """
+    `repeat * concurrency` requests, at most `concurrency` in flight, spread over the
+    fake symbols. In-process ASGI transport: measures the app, not the network.
+    Also reports the terminal rate fetches of the timed part (they should follow the
+    number of symbols, not of requests) and the chart cache hit ratio.
+    """
+    import httpx
+    from src.main import app
+    from src.router import chart_cache
+
+    symbols = fake_mt5.terminal.symbols
+    symbols = [name for name, info in symbols.items() if info.visible]
+    total = repeat * concurrency
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            semaphore = asyncio.Semaphore(concurrency)
+            samples = []
+
+            async def request(i):
+                params = {"symbol": symbols[i % len(symbols)], "format": response_format}
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.get("/api/chart-data", params=params)
+                    samples.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+            # Warmup: fills the candle cache of every symbol
+            await asyncio.gather(*(request(i) for i in range(len(symbols))))
+            samples.clear()
+
+            calls_before = _rate_calls()
+            lookups_before = dict(chart_cache.stats)
+            started = time.perf_counter()
+            await asyncio.gather(*(request(i) for i in range(total)))
+            elapsed = time.perf_counter() - started
+            lookups = {key: chart_cache.stats[key] - lookups_before[key] for key in lookups_before}
+        return summarize(
+            samples,
+            requests_per_second=round(total / elapsed, 1),
+            terminal_rate_calls=_rate_calls() - calls_before,
+            cache_hit_ratio=round((lookups["hits"] + lookups["stale"]) / total, 3),
+        )
+
+    return asyncio.run(run())
+
+
+for _format in ("rows", "columnar"):
+    for _concurrency in (1, 16, 64):
+        case(f"chart_data[{_format},c={_concurrency}]")(
+            lambda repeat, fmt=_format, c=_concurrency: bench_chart_data(fmt, c, repeat)
+        )
@@ -1,6 +1,11 @@
 import asyncio
+from src.config.settings import settings
+from src.services.chart_renderer import ChartRenderer
+from src.services.market_events import MarketEventWatcher
 from src.services.mt5_service import MT5Service
 from src.services.telegram_service import TelegramService 
+from src.services.trade_service import TradeService
+from src.utils import get_mt5_timeframe
 
 class TradingBot:
     """
@@ -12,7 +17,12 @@ class TradingBot:
         
         # Initialize Services
         self.mt5_service = MT5Service()
-        self.telegram_service = TelegramService()  
+        self.telegram_service = TelegramService(chart_renderer=ChartRenderer(self.mt5_service))
+        self.trade_service = TradeService()
+        self.event_watcher = MarketEventWatcher()
+
+        # Positions may have changed while the terminal was offline
+        self.mt5_service.connection.on_reconnect(self.trade_service.position_book.reconcile_async)
     
     async def run_cycle(self):
         """
@@ -20,19 +30,25 @@ class TradingBot:
         This method will be called when you click 'START' on the dashboard.
         """
         print("🚀 Bot started! Waiting for market data...")
+        self.running = True
+        timeframe = get_mt5_timeframe(settings.TIMEFRAME)
         
         while self.running:
             try:
+                # Wakes up on the next tick of the symbol (backs off while the market is closed)
+                event = await self.event_watcher.wait(
+                    settings.SYMBOL, [timeframe], is_running=lambda: self.running
+                )
+                if event is None or not event.bar_closed(timeframe):
+                    continue
+
                 # Placeholder for future strategy logic:
                 # 1. Get Candle Data -> self.mt5_service.get_candles(...)
                 # 2. Analyze Strategy (RSI, OrderBlock)
                 # 3. Execute Trade -> self.mt5_service.open_trade(...)
-                # 4. Send Alert -> await self.telegram_service.send_message(...)
-                
-                print("💤 Bot heartbeat... (Analysis pending)")
+                # 4. Send Alert -> self.telegram_service.notify(...)
                 
-                # Wait 5 seconds before next check to avoid overloading CPU
-                await asyncio.sleep(5) 
+                print(f"💤 Bot heartbeat... {settings.TIMEFRAME} bar closed (Analysis pending)")
                 
             except Exception as e:
                 print(f"❌ Error in main cycle: {e}")
@@ -41,6 +57,7 @@ class TradingBot:
     def stop(self):
         """Stops the analysis cycle."""
         self.running = False
+        self.telegram_service.stop()
         print("🛑 Bot stopped.")
 
 # Global instance used by the API Router
@@ -1,6 +1,33 @@
 import os
+from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field
+from pydantic import BaseModel, Field
+
+class WatchlistEntry(BaseModel):
+    """One instrument traded by the scheduler, with its own strategy parameters."""
+    symbol: str
+    timeframe: str = "M5"
+    volume: Optional[float] = None  # Defaults to settings.VOLUME
+    num_candles: int = 100
+    rsi_length: int = 14
+    rsi_oversold: float = 30
+    rsi_overbought: float = 70
+
+    def strategy_params(self) -> dict:
+        return {
+            "rsi_length": self.rsi_length,
+            "rsi_oversold": self.rsi_oversold,
+            "rsi_overbought": self.rsi_overbought,
+        }
+
+class AccountConfig(BaseModel):
+    """One MT5 account/terminal served by its own worker process (see AccountSupervisor)."""
+    name: str
+    login: int
+    password: str
+    server: str
+    path: Optional[str] = None   # terminal64.exe of this account; defaults to MT5_PATH
+    magic: Optional[int] = None  # Magic number of its orders; defaults to TradeService's
 
 class Settings(BaseSettings):
     # --- MetaTrader 5 Configuration ---
@@ -15,10 +42,103 @@ class Settings(BaseSettings):
     TIMEFRAME: str = Field("M5", description="Timeframe string (e.g., M5, H1)")
     VOLUME: float = Field(0.01, description="Trade volume")
 
+    # --- Multi-Symbol Scheduler ---
+    # JSON list, e.g. WATCHLIST='[{"symbol": "EURUSDm", "timeframe": "M5"}, {"symbol": "XAUUSDm", "timeframe": "H1"}]'
+    # Empty -> the bot trades SYMBOL / TIMEFRAME only
+    WATCHLIST: List[WatchlistEntry] = Field(default_factory=list, description="Instruments for the scheduler")
+    ANALYSIS_WORKERS: int = Field(0, description="Analysis processes (0 = one per CPU)")
+    INSTRUMENT_TIMEOUT: float = Field(5.0, description="Max seconds for one instrument's analysis")
+    STREAMING_INDICATORS: bool = Field(True, description="O(1) incremental indicators instead of pandas_ta recomputation")
+
+    # --- MT5 Worker Thread ---
+    MT5_QUEUE_SIZE: int = Field(256, description="Max pending calls for the MT5 worker thread")
+    MT5_CALL_TIMEOUT: float = Field(10.0, description="Default timeout (seconds) for a MT5 call")
+
+    # --- MT5 Connection ---
+    MT5_HEALTH_CHECK_INTERVAL: float = Field(5.0, description="Seconds between terminal_info health checks")
+    MT5_RECONNECT_BASE_DELAY: float = Field(1.0, description="Wait after the first failed reconnect (doubles per failure, with jitter)")
+    MT5_RECONNECT_MAX_DELAY: float = Field(60.0, description="Max wait between reconnect attempts")
+
+    # --- Event-Driven Scheduling ---
+    TICK_POLL_INTERVAL: float = Field(0.1, description="Seconds between symbol_info_tick polls while the market is active")
+    IDLE_POLL_MAX_INTERVAL: float = Field(30.0, description="Max poll interval when no ticks arrive (market closed)")
+    IDLE_AFTER_SECONDS: float = Field(60.0, description="Seconds without ticks before the poll interval backs off")
+    ANALYSIS_TRIGGER: str = Field("tick", description="Run the analysis on every new 'tick' or only on 'bar_close'")
+
+    # --- Order Execution ---
+    ORDER_DEVIATION: int = Field(20, description="Max slippage accepted on market orders (points)")
+    ORDER_FILLING: str = Field("AUTO", description="AUTO (from the symbol specs), FOK, IOC or RETURN")
+    ORDER_CHECK: bool = Field(True, description="Validate orders with order_check before sending")
+    ORDER_MAX_RETRIES: int = Field(2, description="Retries with a fresh price on requote / price changed")
+    ORDER_QUEUE_SIZE: int = Field(64, description="Max orders waiting in the submission queue")
+    EXECUTION_HISTORY: int = Field(500, description="Execution reports kept for latency/slippage stats")
+
+    # --- Multi-Account Workers ---
+    # JSON list, e.g. ACCOUNTS='[{"name": "main", "login": 123, "password": "...", "server": "Exness-MT5Real", "path": "C:\\MT5-A\\terminal64.exe"}]'
+    # Empty -> single account (MT5_LOGIN) served in-process
+    ACCOUNTS: List[AccountConfig] = Field(default_factory=list, description="Accounts, one worker process each")
+    WORKER_CALL_TIMEOUT: float = Field(15.0, description="Max seconds for one command sent to an account worker")
+    WORKER_HEARTBEAT_INTERVAL: float = Field(5.0, description="Seconds between worker pings (hung workers are restarted)")
+    WORKER_RESTART_MAX_DELAY: float = Field(60.0, description="Max backoff (seconds) between restarts of a crashing worker")
+    WORKER_SHM_SLOTS: int = Field(4, description="Shared-memory bar buffers per worker (concurrent bar transfers)")
+    WORKER_SHM_BARS: int = Field(100000, description="Bars per shared-memory buffer (bigger answers go through the pipe)")
+
+    # --- Position Book ---
+    POSITION_RECONCILE_INTERVAL: float = Field(30.0, description="Seconds between positions_get/orders_get reconciles")
+
+    # --- Symbol Catalog ---
+    SYMBOL_CATALOG_TTL: float = Field(300.0, description="Seconds before the symbols_get() snapshot is refreshed")
+
+    # --- Local Bar Store ---
+    BAR_STORE_DIR: str = Field("", description="Folder for the on-disk bar history (empty = disabled)")
+    BAR_STORE_BACKFILL: int = Field(50000, description="Max bars fetched per series when backfilling")
+
+    # --- Timeframe Resampling ---
+    RESAMPLE_FROM_M1: bool = Field(False, description="Build M2..D1 bars from the M1 stream after their warmup")
+    RESAMPLE_REFRESH_INTERVAL: float = Field(0.1, description="Min seconds between M1 fetches of a symbol (shared by every timeframe)")
+    RESAMPLE_M1_BARS: int = Field(2880, description="M1 bars kept per symbol (must cover the forming D1 bar)")
+    SESSION_OFFSET_HOURS: float = Field(0.0, description="Shift of the D1/H4 boundaries when bar times are not the broker's session time")
+    RESAMPLE_M1_WARMUP_MAX: int = Field(100000, description="Max M1 bars fetched to warm up a shifted-session timeframe (terminal 'Max bars in chart')")
+
+    # --- Tick Recorder ---
+    TICK_STORE_DIR: str = Field("", description="Folder for recorded ticks (empty = the API does not record)")
+    TICK_RECORD_INTERVAL: float = Field(1.0, description="Seconds between copy_ticks_from polls per symbol")
+    TICK_RECORD_BATCH: int = Field(50000, description="Max ticks per copy_ticks_from call")
+    TICK_FLUSH_INTERVAL: float = Field(10.0, description="Max seconds recorded ticks stay in memory before a write")
+    TICK_FLUSH_TICKS: int = Field(20000, description="Buffered ticks that trigger a write right away")
+
+    # --- Streaming ---
+    STREAM_POLL_INTERVAL: float = Field(1.0, description="Seconds between upstream polls per streamed symbol")
+
+    # --- Chart Data Cache ---
+    CHART_DATA_TTL: float = Field(1.0, description="Seconds a /chart-data result is served without asking MT5")
+    CHART_DATA_STALE: float = Field(5.0, description="Extra seconds an expired result is served while it is refreshed")
+    CHART_DATA_CACHE_SIZE: int = Field(256, description="Max (symbol, timeframe, count, patterns) results kept")
+    CHART_DATA_MAX_CANDLES: int = Field(10000, description="Max ?count= accepted by /chart-data")
+
+    # --- Chart Images ---
+    CHART_WIDTH: int = Field(800, description="Width (px) of rendered alert charts")
+    CHART_HEIGHT: int = Field(450, description="Height (px) of rendered alert charts")
+    CHART_CACHE_SIZE: int = Field(32, description="Rendered charts kept in memory")
+
+    # --- API Server ---
+    API_HOST: str = Field("127.0.0.1", description="Address uvicorn binds to (app.py)")
+    API_PORT: int = Field(8000, description="Port uvicorn listens on (app.py)")
+    API_RELOAD: bool = Field(False, description="Auto-reload on code changes (development only, slow startup)")
+    STARTUP_WARMUP: bool = Field(True, description="Connect to MT5 and prefetch the watchlist history on startup")
+
+    # --- Metrics ---
+    LOOP_LAG_INTERVAL: float = Field(0.5, description="Seconds between event-loop lag probes")
+
     # --- Telegram Configuration ---
     # Optional fields (default to empty string if not provided)
     TELEGRAM_TOKEN: str = Field("", description="BotFather Token")
     TELEGRAM_CHAT_ID: str = Field("", description="Your Chat ID")
+    TELEGRAM_RATE_PER_SECOND: float = Field(1.0, description="Average messages per second sent to the chat")
+    TELEGRAM_BURST: int = Field(3, description="Messages that can be sent back-to-back before rate limiting")
+    TELEGRAM_COALESCE_SECONDS: float = Field(2.0, description="Alerts arriving within this window are merged")
+    TELEGRAM_MAX_RETRIES: int = Field(5, description="Retries on timeouts / network errors / 429")
+    TELEGRAM_QUEUE_SIZE: int = Field(200, description="Max alerts waiting to be sent (extra ones are dropped)")
 
     # --- Pydantic v2 Config ---
     model_config = SettingsConfigDict(
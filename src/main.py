@@ -2,21 +2,51 @@ import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.router import router
+from src.router import router, startup
 from src.bot_instance import global_bot
+from src.config.settings import settings
+from src.services.account_supervisor import supervisor
+from src.services.metrics import HTTPMetricsMiddleware, LoopLagMonitor
+from src.ticks.recorder import TickRecorder
 
 # Configuração de Logs
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("API")
 
+loop_lag_monitor = LoopLagMonitor()
+tick_recorder = TickRecorder() if settings.TICK_STORE_DIR else None
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("🔥 API Starting up...")
+    loop_lag_monitor.start()
+    # Conecta ao MT5 e pré-carrega o histórico em segundo plano (ver /api/ready)
+    if settings.STARTUP_WARMUP:
+        startup.start()
+    else:
+        startup.skip()
+    # Health check do terminal + reconexão com backoff (as rotas só leem o estado)
+    global_bot.mt5_service.connection.start()
+    # Mantém o activeOrders do /status em dia com o terminal (mesmo sem /start)
+    global_bot.trade_service.position_book.start_background_reconcile()
+    # Um processo worker por conta de ACCOUNTS (vazio = só a conta MT5_LOGIN, no processo da API)
+    if supervisor.enabled:
+        supervisor.start()
+    # Grava os ticks da watchlist em TICK_STORE_DIR (para replay, ver src/ticks)
+    if tick_recorder is not None:
+        tick_recorder.start()
     yield
+    startup.stop()
+    global_bot.mt5_service.connection.stop()
+    global_bot.trade_service.position_book.stop_background_reconcile()
+    loop_lag_monitor.stop()
+    await supervisor.stop()
+    if tick_recorder is not None:
+        await tick_recorder.stop()
     # Shutdown (Garante que o robô pare se derrubarem o servidor)
     logger.info("🧯 API Shutting down...")
-    if global_bot.is_running:
+    if global_bot.running:
         global_bot.stop()
 
 def create_app() -> FastAPI:
@@ -31,6 +61,9 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Tempo de cada endpoint (exposto em /api/metrics)
+    app.add_middleware(HTTPMetricsMiddleware)
+
     # Inclui as rotas
     app.include_router(router, prefix="/api")
 
@@ -1,9 +1,14 @@
 import asyncio
 import logging
-import MetaTrader5 as mt5
 
 from src.config.settings import settings
+from src.scheduler import WatchlistScheduler
+from src.services.chart_renderer import ChartRenderer
+from src.services.market_events import MarketEventWatcher
+from src.services.metrics import TICK_STAGE_SECONDS
+from src.services.mt5_client import mt5_client
 from src.services.mt5_service import MT5Service
+from src.services.telegram_service import TelegramService
 from src.services.trade_service import TradeService
 from src.strategy.analysis import MarketAnalyzer
 from src.utils import get_mt5_timeframe
@@ -16,31 +21,62 @@ class TradingBot:
         # Initialize Services
         self.mt5_service = MT5Service()
         self.trade_service = TradeService()
+        self.telegram = TelegramService(chart_renderer=ChartRenderer(self.mt5_service))
         self.analyzer = MarketAnalyzer()
+        self.scheduler = None
+        self.event_watcher = MarketEventWatcher()
         self.is_running = False
 
+        # Positions may have changed while the terminal was offline
+        self.mt5_service.connection.on_reconnect(self.trade_service.position_book.reconcile_async)
+
     async def start(self):
         """
         Main execution loop.
         """
         # 1. Connect to MT5
-        if not self.mt5_service.initialize():
+        if not await self.mt5_service.initialize_async():
             logger.error("❌ Failed to connect to MT5. Exiting...")
             return
 
         self.is_running = True
         logger.info(f"✅ Bot connected to {settings.MT5_SERVER} | Account: {settings.MT5_LOGIN}")
+
+        # Health checks / reconnects on their own cadence (tick() only reads the state)
+        self.mt5_service.connection.start()
+
+        # Position book: periodic reconcile with the terminal (first one runs right away)
+        self.trade_service.position_book.start_background_reconcile()
+
+        # Multi-symbol mode: the scheduler owns the loop
+        if settings.WATCHLIST:
+            self.scheduler = WatchlistScheduler(self.mt5_service, self.trade_service, telegram=self.telegram)
+            await self.scheduler.run()
+            return
+
         logger.info(f"📊 Monitoring: {settings.SYMBOL} | Timeframe: {settings.TIMEFRAME}")
 
-        # 2. Infinite Loop
+        current_tf = get_mt5_timeframe(settings.TIMEFRAME)
+
+        # 2. Event Loop: analysis only runs when a new tick (or bar close) arrives
         while self.is_running:
             try:
+                event = await self.event_watcher.wait(
+                    settings.SYMBOL, [current_tf],
+                    is_running=lambda: self.is_running,
+                    max_wait=settings.IDLE_POLL_MAX_INTERVAL
+                )
+
+                if event is None:
+                    # No ticks for a while: market closed or connection lost
+                    await self.check_connection()
+                    continue
+
+                if settings.ANALYSIS_TRIGGER == "bar_close" and not event.bar_closed(current_tf):
+                    continue
+
                 await self.tick()
                 
-                # Sleep for 1 second before next tick to save CPU
-                # (You can adjust this based on your strategy needs)
-                await asyncio.sleep(1) 
-                
             except Exception as e:
                 logger.error(f"⚠️ Error in main loop: {e}")
                 await asyncio.sleep(5) # Wait a bit on error before retrying
@@ -48,51 +84,80 @@ class TradingBot:
     async def tick(self):
         """
         Single execution step (The logic happens here).
+        Every stage is timed into bot_tick_stage_seconds (see /api/metrics).
         """
+        with TICK_STAGE_SECONDS.time(stage="total"):
+            await self._tick()
+
+    async def _tick(self):
         symbol = settings.SYMBOL
         
         # A. Check connection (Watchdog)
-        if not mt5.terminal_info():
-            logger.warning("⚠️ MT5 connection lost, reconnecting...")
-            self.mt5_service.initialize()
+        with TICK_STAGE_SECONDS.time(stage="terminal_check"):
+            connected = await self.check_connection()
+        if not connected:
             return
 
         # B. Get Data
         current_tf = get_mt5_timeframe(settings.TIMEFRAME)
 
-        df = self.mt5_service.get_historical_data(
-            symbol=symbol, 
-            timeframe=current_tf, 
-            num_candles=100
-        )
+        with TICK_STAGE_SECONDS.time(stage="fetch"):
+            df = await self.mt5_service.get_historical_data_async(
+                symbol=symbol, 
+                timeframe=current_tf, 
+                num_candles=100
+            )
 
         if df is None:
             return
 
         # C. Analyze Strategy (Delegating to Strategy Layer)
-        df_analyzed = self.analyzer.prepare_data(df)
+        with TICK_STAGE_SECONDS.time(stage="prepare_data"):
+            if settings.STREAMING_INDICATORS:
+                # Only the new/updated bars are fed to the incremental engine
+                df_analyzed = self.analyzer.update_indicators((symbol, current_tf), df)
+            else:
+                df_analyzed = self.analyzer.prepare_data(df)
         
-        buy_signal = self.analyzer.check_buy_signal(df_analyzed)
-        sell_signal = self.analyzer.check_sell_signal(df_analyzed)
+        with TICK_STAGE_SECONDS.time(stage="signals"):
+            buy_signal = self.analyzer.check_buy_signal(df_analyzed)
+            sell_signal = self.analyzer.check_sell_signal(df_analyzed)
 
         # D. Execute Trade (Delegating to Trade Layer)
-        if buy_signal:
-            logger.info(f"🟢 BUY SIGNAL DETECTED for {symbol}")
-            # Check if we already have positions to avoid opening 1000 orders
-            positions = mt5.positions_get(symbol=symbol)
-            if positions is None or len(positions) == 0:
-                self.trade_service.open_buy(symbol, settings.VOLUME)
-                # await self.telegram.send_message("Buy Order Executed!")
-            
-        elif sell_signal:
-            logger.info(f"🔴 SELL SIGNAL DETECTED for {symbol}")
-            positions = mt5.positions_get(symbol=symbol)
-            if positions is None or len(positions) == 0:
-                self.trade_service.open_sell(symbol, settings.VOLUME)
-                # await self.telegram.send_message("Sell Order Executed!")
+        # Check if we already have positions to avoid opening 1000 orders (in-memory book)
+        has_position = self.trade_service.has_exposure(symbol)
+
+        # Orders are queued: the loop does not wait for the fill (see order_signal_to_fill_seconds)
+        with TICK_STAGE_SECONDS.time(stage="order_send"):
+            if buy_signal:
+                logger.info(f"🟢 BUY SIGNAL DETECTED for {symbol}")
+                if not has_position:
+                    self.trade_service.submit_order("BUY", symbol, settings.VOLUME)
+                    self.telegram.notify(f"🟢 BUY order sent: {symbol}")
+                    self.telegram.notify_chart(symbol, settings.TIMEFRAME)
+                
+            elif sell_signal:
+                logger.info(f"🔴 SELL SIGNAL DETECTED for {symbol}")
+                if not has_position:
+                    self.trade_service.submit_order("SELL", symbol, settings.VOLUME)
+                    self.telegram.notify(f"🔴 SELL order sent: {symbol}")
+                    self.telegram.notify_chart(symbol, settings.TIMEFRAME)
+
+    async def check_connection(self):
+        """
+        Watchdog: state kept by the connection manager (health checks and reconnects
+        with backoff run in its own task), so no terminal call here. True if connected.
+        """
+        return self.mt5_service.connection.ready
 
     def stop(self):
         """Stops the bot safely."""
         self.is_running = False
-        self.mt5_service.shutdown()
+        self.mt5_service.connection.stop()
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        self.trade_service.position_book.stop_background_reconcile()
+        self.trade_service.pipeline.stop()
+        self.telegram.stop()
+        mt5_client.submit(self.mt5_service.shutdown)
         logger.info("Bot Stopped.")
\ No newline at end of file
@@ -1,13 +1,36 @@
 import asyncio
-from fastapi import APIRouter, Query # <--- Importamos Query
+import logging
+from fastapi import APIRouter, Header, HTTPException, Query, Response, WebSocket, WebSocketDisconnect # <--- Importamos Query
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from typing import List, Optional
+from pydantic import TypeAdapter
 from src.bot_instance import global_bot
-from src.schemas import BotStatusResponse, ActionResponse, CandleResponse
+from src.schemas import BotStatusResponse, ActionResponse, CandleResponse, OrderRequest
 from src.config.settings import settings
-import MetaTrader5 as mt5
+from src.services.account_supervisor import WorkerCommandError, WorkerUnavailableError, supervisor as account_supervisor
+from src.services.candle_stream import CandleStreamHub
+from src.services.chart_cache import ChartDataCache
+from src.services.chart_payload import build_columnar_payload, encode_payload, etag_matches, make_etag
+from src.services.metrics import registry
+from src.services.mt5_client import MT5QueueFullError, MT5TimeoutError
+from src.services.warmup import StartupWarmup
+from src.strategy.candles import columns_to_candles
+from src.strategy.patterns import DEFAULT_PATTERNS, PATTERNS, parse_patterns
+from src.utils import TIMEFRAMES, get_mt5_timeframe
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Um único poll no MT5 por símbolo/timeframe, compartilhado por todos os clientes
+candle_stream = CandleStreamHub(global_bot.mt5_service)
+
+# Resultados do /chart-data: TTL curto + single flight por símbolo/timeframe/count
+chart_cache = ChartDataCache()
+
+# Conexão + histórico da watchlist em segundo plano (iniciado no lifespan)
+startup = StartupWarmup(global_bot.mt5_service)
+
 @router.get("/status", response_model=BotStatusResponse)
 async def get_status():
     """Retorna o estado atual do bot."""
@@ -15,9 +38,15 @@ async def get_status():
         "isRunning": global_bot.running,
         "symbol": settings.SYMBOL,
         "strategy": "RSI + OrderBlock",
-        "activeOrders": 0
+        "activeOrders": global_bot.trade_service.position_book.active_orders()
     }
 
+@router.get("/ready")
+async def get_ready():
+    """Prontidão: 200 quando o MT5 conectou e o histórico foi carregado, 503 enquanto aquece."""
+    status = {**startup.status(), "connection": global_bot.mt5_service.connection.status()}
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
 @router.post("/start", response_model=ActionResponse)
 async def start_bot():
     """Inicia o processamento do bot."""
@@ -37,50 +66,259 @@ async def stop_bot():
     return {"success": True, "message": "Bot stopped successfully."}
 
 @router.get("/symbols", response_model=List[str])
-async def get_all_symbols():
-    """Endpoint para pegar a lista de moedas."""
-    return global_bot.mt5_service.get_available_symbols()
+async def get_all_symbols(
+    response: Response,
+    q: Optional[str] = Query(None, description="Substring of the name or description"),
+    prefix: Optional[str] = Query(None, description="Name prefix (case-insensitive)"),
+    path: Optional[str] = Query(None, description="Broker path prefix, e.g. Forex"),
+    trade_mode: Optional[int] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    offset: int = Query(0, ge=0)
+):
+    """
+    Endpoint para pegar a lista de moedas.
+    Servido do catálogo em memória (sem ida ao terminal enquanto o cache é válido),
+    com busca, filtros e paginação. O total vem no header X-Total-Count.
+    """
+    catalog = await _fresh_symbol_catalog()
+    total, names = catalog.search(
+        query=q, prefix=prefix, path=path, trade_mode=trade_mode, limit=limit, offset=offset
+    )
+    response.headers["X-Total-Count"] = str(total)
+    return names
+
+@router.get("/symbols/{name}")
+async def get_symbol_info(name: str):
+    """Metadados do símbolo (digits, contract size, volume step, trade mode...)."""
+    catalog = await _fresh_symbol_catalog()
+    info = catalog.info(name)
+    if info is None:
+        raise HTTPException(status_code=404, detail=f"Symbol {name} not found")
+    return info
+
+async def _fresh_symbol_catalog():
+    """Recarrega o catálogo só se estiver vencido; serve o snapshot antigo se o MT5 falhar."""
+    catalog = global_bot.mt5_service.symbol_catalog
+    if catalog.is_stale:
+        try:
+            await global_bot.mt5_service.refresh_symbol_catalog_async()
+        except (MT5TimeoutError, MT5QueueFullError) as e:
+            if not catalog.index.names:
+                raise HTTPException(status_code=503, detail=str(e))
+    catalog.start_background_refresh()
+    return catalog
+
+@router.get("/patterns")
+async def list_patterns():
+    """Detectores disponíveis para ?patterns= do /chart-data, com os parâmetros padrão."""
+    return [
+        {
+            "name": pattern.name,
+            "params": dict(zip(pattern.param_names, pattern.defaults.tolist())),
+            "description": pattern.description,
+        }
+        for pattern in PATTERNS.values()
+    ]
 
 @router.get("/chart-data", response_model=List[CandleResponse])
-async def get_chart_data(symbol: Optional[str] = Query(None)): # <--- MUDANÇA CRÍTICA: = Query(None)
+async def get_chart_data(
+    symbol: Optional[str] = Query(None), # <--- MUDANÇA CRÍTICA: = Query(None)
+    timeframe: Optional[str] = Query(None, description="M1, M5, M15, M30, H1, H4 ou D1 (padrão: TIMEFRAME)"),
+    count: int = Query(100, ge=1, le=settings.CHART_DATA_MAX_CANDLES),
+    response_format: str = Query("rows", alias="format", pattern="^(rows|columnar)$"),
+    digits: Optional[int] = Query(None, ge=0, le=10),
+    patterns: str = Query(DEFAULT_PATTERNS, max_length=500),
+    account: Optional[str] = Query(None, description="Conta de ACCOUNTS (worker dedicado)"),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Endpoint para pegar dados do gráfico.
     Usa Query(None) para garantir que o FastAPI leia o ?symbol=USDJPY da URL.
+
+    ?timeframe=H1&count=500 escolhem o timeframe e o número de candles.
+
+    ?format=columnar (opt-in) devolve arrays paralelos pré-serializados, sem
+    validação por candle, com ETag / If-None-Match (304 se nada mudou).
+
+    ?patterns=V_SHAPE(cooldown=5),ENGULFING escolhe os detectores (lista em /patterns).
+
+    ?account=nome busca as barras no terminal dessa conta (processo worker próprio).
+
+    O resultado passa pelo chart_cache: pedidos iguais dentro do CHART_DATA_TTL não vão
+    ao MT5 e pedidos simultâneos compartilham uma única busca.
     """
-    # 1. Garante conexão
-    if not global_bot.mt5_service.connected:
-        global_bot.mt5_service.initialize()
+    # 1. Valida os parâmetros antes de ir ao MT5 (400 se o timeframe/detector não existe)
+    try:
+        parse_patterns(patterns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    tf_name = (timeframe or settings.TIMEFRAME).upper()
+    if tf_name not in TIMEFRAMES:
+        raise HTTPException(status_code=400, detail=f"Unknown timeframe '{timeframe}'. Use one of {tuple(TIMEFRAMES)}.")
+    tf = TIMEFRAMES[tf_name]
 
     # 2. Define o símbolo (da URL ou padrão)
     target_symbol = symbol if symbol else settings.SYMBOL
     
-    # 3. DEBUG: Imprime no terminal para sabermos o que está acontecendo
-    print(f"🔍 DEBUG: Frontend pediu: '{symbol}' -> Backend vai buscar: '{target_symbol}'")
-
-    # 4. Define Timeframe
-    tf_map = {
-        "M1": mt5.TIMEFRAME_M1, 
-        "M5": mt5.TIMEFRAME_M5, 
-        "H1": mt5.TIMEFRAME_H1,
-        "D1": mt5.TIMEFRAME_D1
-    }
-    timeframe = tf_map.get(settings.TIMEFRAME, mt5.TIMEFRAME_M5)
+    # 3. DEBUG: só aparece com o log em nível DEBUG
+    logger.debug("Frontend pediu: '%s' -> Backend vai buscar: '%s'", symbol, target_symbol)
+
+    # 4. Busca as barras só se o cache venceu (na thread do MT5 ou no worker da conta)
+    if account:
+        # Conta dedicada: barras vêm do worker via memória compartilhada, análise roda aqui
+        worker = _account_worker(account)
+        fetch = lambda: _account_call(worker.get_rates(target_symbol, tf, count))
+    else:
+        fetch = lambda: _mt5_call(global_bot.mt5_service.get_historical_data_async(target_symbol, tf, count))
+        if not global_bot.mt5_service.connection.ready and global_bot.mt5_service.connection.retry_in() > 0:
+            fetch = _mt5_not_ready
+    entry = await chart_cache.get(fetch, target_symbol, tf_name, count, patterns, source=account or "")
+
+    # 5. Monta a resposta (uma vez por versão da última barra e formato)
+    if response_format == "columnar":
+        body, etag = entry.render(
+            ("columnar", digits),
+            lambda: _encode_with_etag(build_columnar_payload(target_symbol, tf_name, entry.columns, digits))
+        )
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+    # Validado e serializado uma vez por versão: os pedidos seguintes só copiam os bytes
+    body = entry.render("rows", lambda: _encode_rows(entry.columns))
+    return Response(content=body, media_type="application/json")
+
+_candle_list = TypeAdapter(List[CandleResponse])
+
+def _encode_rows(columns):
+    candles = columns_to_candles(columns) if columns is not None else []
+    return _candle_list.dump_json(_candle_list.validate_python(candles))
 
-    # 5. Busca os dados
-    candles = global_bot.mt5_service.get_candles(
-        symbol=target_symbol,
-        timeframe=timeframe,
-        num_candles=100
+def _encode_with_etag(payload):
+    body = encode_payload(payload)
+    return body, make_etag(body)
+
+async def _mt5_not_ready():
+    """Terminal fora e reconexão em backoff -> 503 na hora, sem passar pela fila do MT5."""
+    connection = global_bot.mt5_service.connection
+    raise HTTPException(status_code=503, detail=f"MT5 not connected (next reconnect in {connection.retry_in():.1f}s)")
+
+async def _mt5_call(awaitable):
+    """Fila do MT5 cheia ou chamada lenta -> 503."""
+    try:
+        return await awaitable
+    except (MT5TimeoutError, MT5QueueFullError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+# ---  ACCOUNT WORKERS ---
+def _account_worker(name: str):
+    """Worker da conta (404 se a conta não está em ACCOUNTS)."""
+    try:
+        return account_supervisor.get(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Account {name} not configured")
+
+async def _account_call(awaitable):
+    """Worker caído / reiniciando ou lento -> 503; erro dentro do worker -> 502."""
+    try:
+        return await awaitable
+    except (WorkerUnavailableError, MT5TimeoutError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except WorkerCommandError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+@router.get("/accounts")
+async def list_accounts():
+    """Estado dos workers (pid, vivo, reinícios) de cada conta configurada."""
+    return account_supervisor.status()
+
+@router.get("/accounts/{name}/status")
+async def get_account_status(name: str):
+    """Saldo, conexão e ordens ativas, direto do worker da conta."""
+    return await _account_call(_account_worker(name).call("status"))
+
+@router.get("/accounts/{name}/positions")
+async def get_account_positions(name: str):
+    """Posições da conta (reconciliadas com o terminal)."""
+    return await _account_call(_account_worker(name).call("positions"))
+
+@router.post("/accounts/{name}/orders")
+async def send_account_order(name: str, order: OrderRequest):
+    """Envia uma ordem a mercado pelo terminal da conta. Retorna o resultado do order_send."""
+    result = await _account_call(
+        _account_worker(name).send_order(order.side, order.symbol, order.volume, order.sl, order.tp)
     )
+    if result is None:
+        raise HTTPException(status_code=422, detail="Order rejected (see the worker log)")
+    return result
 
-    return candles
+# ---  STREAMING ENDPOINTS ---
+@router.websocket("/ws/candles")
+async def stream_candles_ws(
+    websocket: WebSocket,
+    symbol: Optional[str] = Query(None),
+    timeframe: Optional[str] = Query(None)
+):
+    """
+    WebSocket: envia um snapshot ao conectar e depois apenas deltas
+    ("update" da última barra / "append" de nova barra).
+    """
+    target_symbol = symbol if symbol else settings.SYMBOL
+    tf = get_mt5_timeframe(timeframe or settings.TIMEFRAME)
+
+    await websocket.accept()
+    queue = candle_stream.subscribe(target_symbol, tf)
+
+    async def send_messages():
+        while True:
+            message = await queue.get()
+            await websocket.send_text(candle_stream.encode(message))
+
+    async def wait_disconnect():
+        # Com o mercado parado nada é enviado: sem ler o socket, um cliente que caiu
+        # manteria a inscrição (e o poll do canal) para sempre
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = [asyncio.create_task(send_messages()), asyncio.create_task(wait_disconnect())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+        candle_stream.unsubscribe(target_symbol, tf, queue)
+
+@router.get("/stream/candles")
+async def stream_candles_sse(
+    symbol: Optional[str] = Query(None),
+    timeframe: Optional[str] = Query(None)
+):
+    """Fallback Server-Sent Events com as mesmas mensagens do WebSocket."""
+    target_symbol = symbol if symbol else settings.SYMBOL
+    tf = get_mt5_timeframe(timeframe or settings.TIMEFRAME)
+    queue = candle_stream.subscribe(target_symbol, tf)
+
+    async def events():
+        try:
+            while True:
+                message = await queue.get()
+                yield f"event: {message['type']}\ndata: {candle_stream.encode(message)}\n\n"
+        finally:
+            candle_stream.unsubscribe(target_symbol, tf, queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
 
 # ---  TELEGRAM ENDPOINT ---
 @router.post("/telegram_test", response_model=ActionResponse)
 async def send_telegram_alert():
     """
-    Captures a full-screen screenshot and sends it to the configured Telegram chat.
-    This is asynchronous to prevent blocking the main thread.
+    Renders the current chart and sends it to the configured Telegram chat.
+    Only queues the work: the notification dispatcher sends it in the background.
     """
     # 1. Check if the service is initialized and has a token
     if not global_bot.telegram_service.bot:
@@ -90,23 +328,23 @@ async def send_telegram_alert():
         }
 
     try:
-        # 2. Send a text notification first
+        # 2. Queue a text notification first
         status_text = "RUNNING" if global_bot.running else "STOPPED"
-        await global_bot.telegram_service.send_message(
-            f"📸 **Screenshot Requested!**\n"
+        global_bot.telegram_service.notify(
+            f"📸 **Chart Requested!**\n"
             f"Asset: {settings.SYMBOL}\n"
             f"Bot Status: {status_text}"
         )
 
-        # 3. Capture and send the screenshot (Async upload)
-        # We assume you implemented send_screenshot in the service as discussed
-        await global_bot.telegram_service.send_screenshot(
+        # 3. Queue the chart image (rendered headless and uploaded in the background)
+        global_bot.telegram_service.notify_chart(
+            settings.SYMBOL, settings.TIMEFRAME,
             caption=f"Current Chart: {settings.SYMBOL}"
         )
 
         return {
             "success": True, 
-            "message": "Screenshot sent to Telegram successfully!"
+            "message": "Chart queued for Telegram."
         }
 
     except Exception as e:
@@ -114,4 +352,10 @@ async def send_telegram_alert():
         return {
             "success": False, 
             "message": f"Failed to send: {str(e)}"
-        }
\ No newline at end of file
+        }
+
+# --- METRICS ENDPOINT ---
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Histogramas e contadores no formato texto do Prometheus."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.config.settings import settings, WatchlistEntry
+from src.services.market_events import AdaptiveBackoff, MarketEventWatcher
+from src.services.mt5_client import mt5_client
+from src.strategy.analysis import MarketAnalyzer, analyze_rates
+from src.utils import get_mt5_timeframe
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentState:
+    """Per-instrument bookkeeping: errors are isolated and backed off per symbol."""
+    def __init__(self, entry: WatchlistEntry):
+        self.entry = entry
+        self.symbol = entry.symbol
+        self.timeframe = get_mt5_timeframe(entry.timeframe)
+        self.params = entry.strategy_params()
+        self.analyzer = MarketAnalyzer(**self.params)
+        self.failures = 0
+        self.skip_until_cycle = 0
+        self.analyzed = False
+        self.last_duration = 0.0
+
+    @property
+    def key(self):
+        return (self.symbol, self.timeframe)
+
+
+class WatchlistScheduler:
+    """
+    Trades a watchlist of (symbol, timeframe, strategy params) from one process.
+
+    Each cycle:
+    1. Polls symbol_info_tick of every active instrument and fetches the bars of the
+       ones that got a new tick (or closed a bar) in ONE job on the MT5 thread.
+    2. Updates the streaming indicators of every instrument (microseconds each), or with
+       STREAMING_INDICATORS=False runs the full pandas_ta analysis in a process pool
+       (GIL and event loop stay free).
+    3. Dispatches the signals to TradeService.
+
+    Fairness: the fetch order rotates every cycle, each analysis has its own timeout,
+    and an instrument that keeps failing is backed off without affecting the others.
+    Idle cycles (no new ticks, e.g. market closed) back off up to IDLE_POLL_MAX_INTERVAL.
+    """
+    MAX_BACKOFF_CYCLES = 60
+
+    def __init__(self, mt5_service, trade_service, entries=None, workers: int = None, telegram=None):
+        self.mt5_service = mt5_service
+        self.trade_service = trade_service
+        self.telegram = telegram
+
+        entries = entries or settings.WATCHLIST or [
+            WatchlistEntry(symbol=settings.SYMBOL, timeframe=settings.TIMEFRAME)
+        ]
+        self.instruments = [InstrumentState(e) for e in entries]
+        self.workers = workers or settings.ANALYSIS_WORKERS or os.cpu_count() or 1
+
+        self.watcher = MarketEventWatcher()
+        self.idle_backoff = AdaptiveBackoff(
+            settings.TICK_POLL_INTERVAL, settings.IDLE_POLL_MAX_INTERVAL, settings.IDLE_AFTER_SECONDS
+        )
+
+        self.pool = None
+        self.cycle = 0
+        self.is_running = False
+        self.last_cycle_duration = 0.0
+
+    async def run(self):
+        """Runs cycles until stop() is called, polling faster while ticks are flowing."""
+        self.is_running = True
+        if self.pool is None and not settings.STREAMING_INDICATORS:
+            self.pool = ProcessPoolExecutor(max_workers=min(self.workers, len(self.instruments)))
+
+        logger.info(f"📊 Scheduler monitoring {len(self.instruments)} instruments with {self.workers} workers")
+        try:
+            while self.is_running:
+                started = time.perf_counter()
+                changed = 0
+                try:
+                    changed = await self.run_cycle()
+                except Exception as e:
+                    logger.error(f"⚠️ Error in scheduler cycle: {e}")
+
+                if changed:
+                    self.idle_backoff.reset()
+                self.last_cycle_duration = time.perf_counter() - started
+                await asyncio.sleep(max(0.0, self.idle_backoff.next_delay() - self.last_cycle_duration))
+        finally:
+            self.shutdown_pool()
+
+    def stop(self):
+        self.is_running = False
+
+    def shutdown_pool(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    async def run_cycle(self):
+        """One pass over every instrument that is not backed off. Returns how many changed."""
+        self.cycle += 1
+
+        # Rotate the order so the same symbol is not always fetched first
+        offset = self.cycle % len(self.instruments)
+        ordered = self.instruments[offset:] + self.instruments[:offset]
+        active = [i for i in ordered if i.skip_until_cycle <= self.cycle]
+        if not active:
+            return 0
+
+        # 1. Batched poll + fetch: one queue hop to the MT5 thread for all instruments
+        batch = await mt5_client.run(self._fetch_batch, active)
+        if not batch:
+            return 0
+
+        # 2 + 3. Analysis and dispatch, isolated per instrument (only the ones that changed)
+        changed = [i for i in active if i.key in batch]
+        await asyncio.gather(*(self._process(i, batch[i.key]) for i in changed))
+        return len(changed)
+
+    def _is_due(self, instrument: InstrumentState, event) -> bool:
+        """New input for this instrument? (first pass always analyzes)"""
+        if event is None:
+            return not instrument.analyzed
+        if settings.ANALYSIS_TRIGGER == "bar_close":
+            return event.bar_closed(instrument.timeframe) or not instrument.analyzed
+        return True
+
+    def _fetch_batch(self, instruments):
+        """
+        Runs on the MT5 thread. Returns {key: rates | Exception | None} for the
+        instruments with new input; unchanged instruments are left out.
+        """
+        # The watcher cursor is per symbol: poll each symbol once with all of its
+        # timeframes and fan the event out (M5 + H1 of a symbol share the same ticks)
+        timeframes = {}
+        for instrument in instruments:
+            timeframes.setdefault(instrument.symbol, []).append(instrument.timeframe)
+
+        events = {}
+        results = {}
+        for instrument in instruments:
+            try:
+                symbol = instrument.symbol
+                if symbol not in events:
+                    events[symbol] = self.watcher.poll(symbol, tuple(timeframes[symbol]))
+                event = events[symbol]
+                if not self._is_due(instrument, event):
+                    continue
+                results[instrument.key] = self.mt5_service.get_historical_data(
+                    symbol=instrument.symbol,
+                    timeframe=instrument.timeframe,
+                    num_candles=instrument.entry.num_candles
+                )
+            except Exception as e:
+                results[instrument.key] = e
+        return results
+
+    async def _process(self, instrument: InstrumentState, rates):
+        started = time.perf_counter()
+        try:
+            if isinstance(rates, Exception):
+                raise rates
+            if rates is None or len(rates) == 0:
+                return
+
+            if settings.STREAMING_INDICATORS:
+                values = instrument.analyzer.update_indicators(instrument.key, rates)
+                buy_signal = instrument.analyzer.check_buy_signal(values)
+                sell_signal = instrument.analyzer.check_sell_signal(values)
+            else:
+                loop = asyncio.get_running_loop()
+                buy_signal, sell_signal = await asyncio.wait_for(
+                    loop.run_in_executor(self.pool, analyze_rates, rates, instrument.params),
+                    settings.INSTRUMENT_TIMEOUT
+                )
+            instrument.analyzed = True
+            await self._dispatch(instrument, buy_signal, sell_signal)
+            instrument.failures = 0
+
+        except Exception as e:
+            instrument.failures += 1
+            backoff = min(2 ** instrument.failures, self.MAX_BACKOFF_CYCLES)
+            instrument.skip_until_cycle = self.cycle + backoff
+            logger.warning(
+                f"⚠️ {instrument.symbol}: {type(e).__name__} {e} "
+                f"(failure {instrument.failures}, skipping {backoff} cycles)"
+            )
+        finally:
+            instrument.last_duration = time.perf_counter() - started
+
+    async def _dispatch(self, instrument: InstrumentState, buy_signal: bool, sell_signal: bool):
+        """Same execution rule as TradingBot.tick: one position per symbol."""
+        if not buy_signal and not sell_signal:
+            return
+
+        symbol = instrument.symbol
+        volume = instrument.entry.volume or settings.VOLUME
+
+        if self.trade_service.has_exposure(symbol):
+            return
+
+        # Queued: the cycle does not wait for the fill
+        if buy_signal:
+            logger.info(f"🟢 BUY SIGNAL DETECTED for {symbol}")
+            self.trade_service.submit_order("BUY", symbol, volume)
+        elif sell_signal:
+            logger.info(f"🔴 SELL SIGNAL DETECTED for {symbol}")
+            self.trade_service.submit_order("SELL", symbol, volume)
+
+        if self.telegram is not None:
+            side = "🟢 BUY" if buy_signal else "🔴 SELL"
+            self.telegram.notify(f"{side} order sent: {symbol} {instrument.entry.timeframe}")
@@ -1,15 +1,25 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 
 class BotStatusResponse(BaseModel):
-    is_running: bool
+    isRunning: bool
     symbol: str  
+    strategy: str
+    activeOrders: int = 0
     
 class ActionResponse(BaseModel):
     status: str
     message: str
 
 
+class OrderRequest(BaseModel):
+    side: str = Field(..., pattern="^(BUY|SELL)$")
+    symbol: str
+    volume: float = Field(..., gt=0)
+    sl: float = 0.0
+    tp: float = 0.0
+
+
 class CandleResponse(BaseModel):
     time: int       # Timestamp (Unix)
     open: float
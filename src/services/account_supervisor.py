@@ -0,0 +1,278 @@
+import asyncio
+import itertools
+import multiprocessing
+import threading
+import time
+
+from src.config.settings import settings
+from src.services.account_worker import SharedBarBuffer, run_worker
+from src.services.mt5_client import MT5TimeoutError
+
+
+class WorkerUnavailableError(RuntimeError):
+    """Raised when the account worker is down (crashed, restarting or stopped)."""
+
+
+class WorkerCommandError(RuntimeError):
+    """Raised when a command failed inside the account worker."""
+
+
+class AccountWorkerHandle:
+    """
+    API-process side of one account worker: the process, its pipe, the
+    shared-memory bar buffer and the commands waiting for an answer.
+
+    A reader thread blocks on the pipe (works with every event loop, including the
+    Windows proactor) and resolves the futures on the loop. If the process dies,
+    every pending call fails with WorkerUnavailableError right away.
+    `target` is the process entry point (run_worker; tests pass one that installs
+    the fake terminal first).
+    """
+    def __init__(self, account, context, target=run_worker):
+        self.account = account
+        self.name = account.name
+        self.context = context
+        self.target = target
+
+        self.buffer = None
+        self.free_slots = None
+        self.process = None
+        self.conn = None
+        self.loop = None
+        self.pending = {}
+        self.ids = itertools.count()
+        self._send_lock = threading.Lock()
+
+        self.started_at = None
+        self.last_reply = None  # monotonic time of the last answer (any command)
+        self.restarts = 0
+        self.failures = 0  # Consecutive crashes (restart backoff)
+        self.last_exit = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    # --- Lifecycle ---
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        if self.buffer is None:
+            self.buffer = SharedBarBuffer(settings.WORKER_SHM_SLOTS, settings.WORKER_SHM_BARS)
+        # Fresh slot pool: nothing from the previous process is still being written
+        self.free_slots = asyncio.Queue()
+        for slot in range(self.buffer.slots):
+            self.free_slots.put_nowait(slot)
+
+        if self.conn is not None:
+            self._fail_pending(self.conn)
+            self.conn.close()
+
+        parent, child = self.context.Pipe()
+        self.process = self.context.Process(
+            target=self.target,
+            args=(self.account.model_dump(), child, self.buffer.name, self.buffer.slots, self.buffer.bars),
+            name=f"mt5-worker-{self.name}",
+            daemon=True,
+        )
+        self.process.start()
+        child.close()  # Only the worker holds this end: recv() sees EOF when it dies
+        self.conn = parent
+        self.started_at = self.last_reply = time.monotonic()
+        threading.Thread(target=self._read_forever, args=(parent,), name=f"mt5-pipe-{self.name}", daemon=True).start()
+
+    def silent_for(self) -> float:
+        """Seconds since the worker last answered anything (0 if not running)."""
+        return time.monotonic() - self.last_reply if self.alive else 0.0
+
+    def kill(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.kill()
+
+    async def stop(self, timeout: float = 5.0):
+        """Asks the worker to log out and exit, kills it after `timeout`."""
+        if self.alive:
+            try:
+                await self.call("shutdown", timeout=timeout)
+            except Exception:
+                pass
+            await asyncio.to_thread(self.process.join, timeout)
+            self.kill()
+        if self.conn is not None:
+            self.conn.close()
+        if self.buffer is not None:
+            self.buffer.close(unlink=True)
+            self.buffer = None
+
+    # --- Pipe ---
+
+    def _read_forever(self, conn):
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+            self.loop.call_soon_threadsafe(self._resolve, *message)
+        try:
+            self.loop.call_soon_threadsafe(self._fail_pending, conn)
+        except RuntimeError:
+            pass  # Event loop already closed (app shutdown)
+
+    def _resolve(self, request_id, ok, result):
+        self.last_reply = time.monotonic()
+        future = self.pending.pop(request_id, None)
+        if future is None or future.done():
+            return  # Caller timed out already
+        if ok:
+            future.set_result(result)
+        else:
+            future.set_exception(WorkerCommandError(result))
+
+    def _fail_pending(self, conn):
+        if conn is not self.conn:
+            return
+        pending, self.pending = self.pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(WorkerUnavailableError(f"Account worker {self.name} stopped"))
+
+    async def call(self, command: str, timeout: float = None, **kwargs):
+        """Sends one command and awaits its answer."""
+        if not self.alive:
+            raise WorkerUnavailableError(f"Account worker {self.name} is not running")
+
+        request_id = next(self.ids)
+        future = self.loop.create_future()
+        self.pending[request_id] = future
+        try:
+            with self._send_lock:
+                self.conn.send((request_id, command, kwargs))
+        except (OSError, ValueError) as e:
+            self.pending.pop(request_id, None)
+            raise WorkerUnavailableError(f"Account worker {self.name}: {e}") from None
+
+        timeout = timeout or settings.WORKER_CALL_TIMEOUT
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.pending.pop(request_id, None)
+            raise MT5TimeoutError(f"Account worker {self.name}: '{command}' took more than {timeout}s") from None
+
+    # --- Commands ---
+
+    async def get_rates(self, symbol: str, timeframe, num_candles: int = 100):
+        """
+        MT5 rates array of the account's terminal, copied through shared memory.
+        The worker runs commands in order, so a slot is never written while a reply
+        for it is still being read.
+        """
+        slot = await self.free_slots.get()
+        free_slots = self.free_slots
+        try:
+            reply = await self.call("rates", symbol=symbol, timeframe=timeframe, num_candles=num_candles, slot=slot)
+            if "shm_slot" in reply:
+                return self.buffer.read(reply["shm_slot"], reply["count"])
+            return reply.get("rates")
+        finally:
+            free_slots.put_nowait(slot)
+
+    async def send_order(self, side: str, symbol: str, volume: float, sl: float = 0.0, tp: float = 0.0):
+        return await self.call("order", side=side, symbol=symbol, volume=volume, sl=sl, tp=tp)
+
+    def info(self):
+        return {
+            "name": self.name,
+            "login": self.account.login,
+            "server": self.account.server,
+            "pid": self.process.pid if self.process else None,
+            "alive": self.alive,
+            "restarts": self.restarts,
+            "uptime": time.monotonic() - self.started_at if self.alive else 0.0,
+            "lastExitCode": self.last_exit,
+        }
+
+
+class AccountSupervisor:
+    """
+    Runs one worker process per configured account (settings.ACCOUNTS) and keeps
+    them alive:
+    1. Crash isolation: a terminal/worker crash only affects its own account.
+    2. Crashed workers are restarted with exponential backoff (up to WORKER_RESTART_MAX_DELAY).
+    3. Every WORKER_HEARTBEAT_INTERVAL a ping checks the worker still answers. The
+       worker runs commands in order, so a ping can wait behind rates / order calls:
+       only a worker that answered nothing for WORKER_CALL_TIMEOUT is hung, and is
+       killed and restarted.
+    The API routes account requests with get(name).
+    """
+    STABLE_AFTER = 60.0  # Seconds of uptime that reset the restart backoff
+
+    def __init__(self, accounts=None, target=run_worker):
+        self.accounts = settings.ACCOUNTS if accounts is None else accounts
+        # spawn: no inherited terminal/threads state, and the only method on Windows
+        self.context = multiprocessing.get_context("spawn")
+        self.workers = {
+            account.name: AccountWorkerHandle(account, self.context, target) for account in self.accounts
+        }
+        self._tasks = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.workers)
+
+    def get(self, name: str) -> AccountWorkerHandle:
+        """Worker of an account. Raises KeyError for unknown names."""
+        return self.workers[name]
+
+    def start(self):
+        for handle in self.workers.values():
+            if not handle.alive:
+                handle.start()
+            self._tasks.append(asyncio.create_task(self._supervise(handle)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        await asyncio.gather(*(handle.stop() for handle in self.workers.values()), return_exceptions=True)
+
+    def status(self):
+        return [handle.info() for handle in self.workers.values()]
+
+    async def _supervise(self, handle: AccountWorkerHandle):
+        interval = settings.WORKER_HEARTBEAT_INTERVAL
+        while True:
+            await asyncio.sleep(interval)
+
+            if handle.alive:
+                try:
+                    await handle.call("ping")  # WORKER_CALL_TIMEOUT: also covers the startup login
+                    if time.monotonic() - handle.started_at > self.STABLE_AFTER:
+                        handle.failures = 0
+                    continue
+                except MT5TimeoutError:
+                    if handle.silent_for() < settings.WORKER_CALL_TIMEOUT:
+                        continue  # Busy: the ping is queued behind commands that still get answers
+                    print(f"⚠️ Account worker {handle.name} does not answer, restarting it.")
+                    handle.kill()
+                except WorkerUnavailableError:
+                    pass  # Died during the ping: restarted below
+                except WorkerCommandError as e:
+                    print(f"⚠️ Account worker {handle.name} ping failed: {e}")
+                    continue
+
+            if handle.process is not None:
+                await asyncio.to_thread(handle.process.join, 5)
+                handle.kill()
+                handle.last_exit = handle.process.exitcode
+            delay = min(2 ** handle.failures, settings.WORKER_RESTART_MAX_DELAY)
+            handle.failures += 1
+            print(f"🔁 Account worker {handle.name} exited ({handle.last_exit}), restarting in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            try:
+                handle.start()
+                handle.restarts += 1
+            except Exception as e:
+                print(f"❌ Failed to restart account worker {handle.name}: {e}")
+
+
+supervisor = AccountSupervisor()
@@ -0,0 +1,163 @@
+"""
+Worker process of one MT5 account.
+
+The MetaTrader5 package binds one terminal per process, so every account of
+settings.ACCOUNTS gets its own process (started by AccountSupervisor) that owns
+an MT5Service + TradeService logged into that account. All its terminal calls run
+on the worker's main thread, one command at a time.
+
+Protocol over a multiprocessing Pipe (pickled tuples):
+    request:  (request_id, command, kwargs)
+    response: (request_id, ok, result)   ok=False -> result is the error message
+
+Bar arrays do not go through the pipe: the request names a free slot of the
+SharedBarBuffer, the worker copies the rates there and only answers the row count.
+"""
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.strategy.candles import RATES_DTYPE
+
+
+class SharedBarBuffer:
+    """
+    `slots` fixed arrays of `bars` MT5 rates rows in one SharedMemory block.
+    Created by the supervisor (it outlives worker restarts), attached by the worker.
+    """
+    def __init__(self, slots: int, bars: int, name: str = None):
+        self.slots = slots
+        self.bars = bars
+        size = max(1, slots * bars * RATES_DTYPE.itemsize)
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.array = np.ndarray((slots, bars), dtype=RATES_DTYPE, buffer=self.shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, slot: int, rates) -> bool:
+        """Copies `rates` into `slot`. False if they do not fit (send them through the pipe)."""
+        if len(rates) > self.bars:
+            return False
+        self.array[slot, :len(rates)] = rates
+        return True
+
+    def read(self, slot: int, count: int):
+        """Copy of the first `count` rows of `slot` (the slot is reused right after)."""
+        return self.array[slot, :count].copy()
+
+    def close(self, unlink: bool = False):
+        self.array = None  # Views must be released before the block is closed
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _result_dict(result):
+    """order_send result without the nested request struct (plain dict, picklable)."""
+    if result is None:
+        return None
+    return {key: value for key, value in result._asdict().items() if key != "request"}
+
+
+class AccountWorker:
+    """Command handlers of one account (runs inside the worker process)."""
+    def __init__(self, account, buffer: SharedBarBuffer):
+        from src.services.mt5_service import MT5Service
+        from src.services.trade_service import TradeService
+
+        self.account = account
+        self.buffer = buffer
+        self.mt5_service = MT5Service(account)
+        self.trade_service = TradeService(account.magic)
+        self.started_at = time.time()
+
+        self.commands = {
+            "ping": self.ping,
+            "status": self.status,
+            "symbols": self.symbols,
+            "rates": self.rates,
+            "order": self.order,
+            "positions": self.positions,
+        }
+
+    # --- Commands ---
+
+    def ping(self):
+        # Heartbeat: also the worker's health check / reconnect cadence
+        return {"pid": os.getpid(), "connected": self.mt5_service.connection.check()}
+
+    def status(self):
+        import MetaTrader5 as mt5
+
+        info = mt5.account_info() if self.mt5_service.connected else None
+        return {
+            "name": self.account.name,
+            "login": self.mt5_service.login,
+            "server": self.mt5_service.server,
+            "pid": os.getpid(),
+            "connected": self.mt5_service.connected,
+            "balance": info.balance if info else None,
+            "equity": info.equity if info else None,
+            "activeOrders": self.trade_service.position_book.active_orders(),
+            "executions": self.trade_service.execution_summary(),
+            "uptime": time.time() - self.started_at,
+        }
+
+    def symbols(self):
+        return self.mt5_service.get_available_symbols()
+
+    def rates(self, symbol: str, timeframe, num_candles: int = 100, slot: int = None):
+        rates = self.mt5_service.get_historical_data(symbol, timeframe, num_candles)
+        if rates is None:
+            return {"count": 0}
+        if slot is not None and self.buffer.write(slot, rates):
+            return {"shm_slot": slot, "count": len(rates)}
+        return {"count": len(rates), "rates": np.asarray(rates, dtype=RATES_DTYPE)}
+
+    def order(self, side: str, symbol: str, volume: float, sl: float = 0.0, tp: float = 0.0):
+        return _result_dict(self.trade_service.send_market_order(symbol, side, volume, sl, tp))
+
+    def positions(self):
+        self.trade_service.position_book.reconcile()
+        return self.trade_service.position_book.snapshot()
+
+    # --- Loop ---
+
+    def serve(self, conn):
+        """Answers commands until the pipe closes or 'shutdown' arrives."""
+        self.mt5_service.connection.connect()
+        try:
+            while True:
+                try:
+                    request_id, command, kwargs = conn.recv()
+                except (EOFError, OSError):
+                    break  # Supervisor is gone
+                if command == "shutdown":
+                    conn.send((request_id, True, None))
+                    break
+
+                handler = self.commands.get(command)
+                try:
+                    if handler is None:
+                        raise ValueError(f"Unknown worker command '{command}'")
+                    reply = (request_id, True, handler(**kwargs))
+                except Exception as e:
+                    reply = (request_id, False, f"{type(e).__name__}: {e}")
+                conn.send(reply)
+        finally:
+            self.mt5_service.shutdown()
+            self.buffer.close()
+
+
+def run_worker(account_data: dict, conn, shm_name: str, slots: int, bars: int):
+    """Process entry point (spawn-safe: everything is rebuilt from plain arguments)."""
+    from src.config.settings import AccountConfig
+
+    account = AccountConfig(**account_data)
+    print(f"🧩 Worker {account.name} started (pid {os.getpid()}, login {account.login})")
+    worker = AccountWorker(account, SharedBarBuffer(slots, bars, name=shm_name))
+    worker.serve(conn)
@@ -0,0 +1,179 @@
+import datetime
+import os
+
+import numpy as np
+
+from src.strategy.candles import RATES_DTYPE
+
+
+def _timeframe_seconds(timeframe) -> int:
+    # Same decoding as src.utils.get_timeframe_seconds, kept local so the store
+    # can be used by offline tooling without the MetaTrader5 package.
+    timeframe = int(timeframe)
+    if timeframe & 0xC000 == 0xC000:
+        return 30 * 86400 * (timeframe & 0x3FFF)
+    if timeframe & 0x8000:
+        return 7 * 86400 * (timeframe & 0x3FFF)
+    if timeframe & 0x4000:
+        return 3600 * (timeframe & 0x3FFF)
+    return 60 * timeframe
+
+
+def to_rates_dtype(rates):
+    """Copies any MT5-like rates array into RATES_DTYPE (missing fields stay 0)."""
+    rates = np.asarray(rates)
+    if rates.dtype == RATES_DTYPE:
+        return rates
+    out = np.zeros(len(rates), dtype=RATES_DTYPE)
+    for name in RATES_DTYPE.names:
+        if name in rates.dtype.names:
+            out[name] = rates[name]
+    return out
+
+
+class BarStore:
+    """
+    Append-only on-disk bar history, one file per (symbol, timeframe).
+
+    Files are raw arrays of RATES_DTYPE records (the MT5 rates layout), sorted by
+    time. Reads go through np.memmap, so last_n() / range() return zero-copy
+    views and months of bars are never loaded into RAM as a whole.
+    The last stored bar may still be forming: appending a bar with the same time
+    overwrites it in place.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self._maps = {}
+
+    def path(self, symbol: str, timeframe) -> str:
+        return os.path.join(self.root, symbol, f"{int(timeframe)}.bars")
+
+    # --- Reads ---
+
+    def bars(self, symbol: str, timeframe):
+        """Memory-mapped view of the whole history (empty array if none)."""
+        path = self.path(symbol, timeframe)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        count = size // RATES_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=RATES_DTYPE)
+
+        cached = self._maps.get(path)
+        if cached is None or len(cached) != count:
+            cached = np.memmap(path, dtype=RATES_DTYPE, mode="r", shape=(count,))
+            self._maps[path] = cached
+        return cached
+
+    def count(self, symbol: str, timeframe) -> int:
+        return len(self.bars(symbol, timeframe))
+
+    def last_time(self, symbol: str, timeframe):
+        bars = self.bars(symbol, timeframe)
+        return int(bars['time'][-1]) if len(bars) else None
+
+    def last_n(self, symbol: str, timeframe, count: int):
+        """The newest `count` bars (zero-copy view)."""
+        bars = self.bars(symbol, timeframe)
+        return bars[max(0, len(bars) - count):]
+
+    def range(self, symbol: str, timeframe, start: int = None, end: int = None):
+        """Bars with start <= time <= end (Unix seconds, zero-copy view)."""
+        bars = self.bars(symbol, timeframe)
+        times = bars['time']
+        lo = 0 if start is None else int(times.searchsorted(start, side="left"))
+        hi = len(bars) if end is None else int(times.searchsorted(end, side="right"))
+        return bars[lo:hi]
+
+    def find_gaps(self, symbol: str, timeframe, start: int = None, end: int = None, skip_weekends: bool = True):
+        """
+        Returns [(last_time_before_gap, first_time_after_gap, missing_bars)] for every
+        hole larger than one bar. Friday -> Sunday/Monday closes are skipped by default.
+        """
+        bars = self.range(symbol, timeframe, start, end)
+        if len(bars) < 2:
+            return []
+
+        seconds = _timeframe_seconds(timeframe)
+        times = np.asarray(bars['time'])
+        deltas = np.diff(times)
+        holes = np.flatnonzero(deltas > seconds)
+
+        gaps = []
+        for i in holes.tolist():
+            before, after = int(times[i]), int(times[i + 1])
+            if skip_weekends and self._is_weekend_close(before, after):
+                continue
+            gaps.append((before, after, (after - before) // seconds - 1))
+        return gaps
+
+    @staticmethod
+    def _is_weekend_close(before: int, after: int) -> bool:
+        if after - before > 3 * 86400:
+            return False
+        weekday = datetime.datetime.fromtimestamp(before, datetime.timezone.utc).weekday()
+        return weekday in (4, 5)  # Friday / Saturday bar, market reopens Sunday/Monday
+
+    # --- Writes ---
+
+    def append(self, symbol: str, timeframe, rates) -> int:
+        """
+        Appends bars newer than the last stored one. A bar with the same time as the
+        last stored bar overwrites it. Returns the number of bars written.
+        """
+        if rates is None or len(rates) == 0:
+            return 0
+
+        rates = to_rates_dtype(rates)
+        path = self.path(symbol, timeframe)
+        last_time = self.last_time(symbol, timeframe)
+
+        if last_time is not None:
+            rates = rates[rates['time'] >= last_time]
+            if len(rates) == 0:
+                return 0
+
+        # Writes start right after the last whole record: a torn record left by a
+        # crash is cut off instead of shifting every later bar (like TickStore)
+        offset = self.count(symbol, timeframe) * RATES_DTYPE.itemsize
+        written = len(rates)
+        if last_time is not None and int(rates['time'][0]) == last_time:
+            offset -= RATES_DTYPE.itemsize  # Forming bar: overwritten in place
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.seek(offset)
+            f.write(np.ascontiguousarray(rates).tobytes())
+            f.truncate()
+
+        return written
+
+    def backfill(self, symbol: str, timeframe, fetch_from_pos, max_bars: int = 50000, chunk: int = 1000) -> int:
+        """
+        Fills the store up to the present with `fetch_from_pos(symbol, timeframe, pos, count)`
+        (mt5.copy_rates_from_pos). Fetches chunks backwards from the newest bar until the
+        last stored bar is reached, so a reconnect only pulls what was missed.
+        An empty store is seeded with up to `max_bars` bars.
+        """
+        last_time = self.last_time(symbol, timeframe)
+        if last_time is None:
+            rates = fetch_from_pos(symbol, timeframe, 0, max_bars)
+            return self.append(symbol, timeframe, rates)
+
+        chunks = []
+        pos = 0
+        while pos < max_bars:
+            rates = fetch_from_pos(symbol, timeframe, pos, chunk)
+            if rates is None or len(rates) == 0:
+                break
+            chunks.append(rates)
+            if int(rates['time'][0]) <= last_time:
+                break
+            pos += len(rates)
+
+        if not chunks:
+            return 0
+        # A bar closing between two fetches shifts the positions: the chunks then
+        # overlap. np.unique keeps the first copy of a time, from the later fetch.
+        rates = np.concatenate(chunks[::-1])
+        _, first = np.unique(rates['time'], return_index=True)
+        return self.append(symbol, timeframe, rates[first])
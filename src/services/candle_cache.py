@@ -0,0 +1,285 @@
+import time
+
+import numpy as np
+import MetaTrader5 as mt5
+
+from src.config.settings import settings
+from src.strategy.candles import SMA_PERIOD, rolling_sma
+from src.strategy.resample import is_resampled, resample
+from src.utils import get_timeframe_seconds
+
+
+class CandleSeries:
+    """
+    Preallocated ring buffer of MT5 bars for one (symbol, timeframe).
+
+    Every bar is written twice (at `pos` and `pos + capacity`), so the last
+    `size` bars are always one contiguous slice and can be handed to NumPy
+    as a view without copying or reordering.
+    """
+    def __init__(self, capacity: int, dtype):
+        self.capacity = capacity
+        self.rates = np.zeros(capacity * 2, dtype=dtype)
+        self.sma = np.full(capacity * 2, np.nan)
+        self.start = 0
+        self.size = 0
+
+    @property
+    def last_time(self):
+        if self.size == 0:
+            return None
+        return int(self.rates['time'][self.start + self.size - 1])
+
+    def window(self, count: int):
+        """Returns (rates, sma) views of the last `count` bars, oldest first."""
+        count = min(count, self.size)
+        end = self.start + self.size
+        return self.rates[end - count:end], self.sma[end - count:end]
+
+    def load(self, rates):
+        """Replaces the buffer content with a full history fetch."""
+        rates = rates[-self.capacity:]
+        size = len(rates)
+        sma = rolling_sma(np.asarray(rates['close'], dtype=np.float64), SMA_PERIOD)
+
+        self.start = 0
+        self.size = size
+        self.rates[:size] = rates
+        self.rates[self.capacity:self.capacity + size] = rates
+        self.sma[:size] = sma
+        self.sma[self.capacity:self.capacity + size] = sma
+
+    def merge(self, rates):
+        """
+        Merges bars returned by a tail fetch: the bar with the same time as the
+        last stored one is overwritten (still forming), newer ones are appended.
+        """
+        last_time = self.last_time
+        new = rates[rates['time'] >= last_time]
+        if len(new) == 0:
+            return 0
+
+        changed = 0
+        if int(new['time'][0]) == last_time:
+            self._write(self.size - 1, new[0])
+            new = new[1:]
+            changed += 1
+
+        for i in range(len(new)):
+            self._push(new[i])
+        return changed + len(new)
+
+    def _push(self, bar):
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+        self._write(self.size - 1, bar)
+
+    def _write(self, offset: int, bar):
+        """Writes one bar (both copies) and refreshes its SMA value."""
+        pos = (self.start + offset) % self.capacity
+        self.rates[pos] = bar
+        self.rates[pos + self.capacity] = bar
+
+        # SMA of the bar: sequential sum of the last SMA_PERIOD closes,
+        # same summation order as the candle engine.
+        sma_value = np.nan
+        if offset >= SMA_PERIOD - 1:
+            end = self.start + offset + 1
+            closes = self.rates['close'][end - SMA_PERIOD:end]
+            total = 0.0
+            for c in closes.tolist():
+                total += c
+            sma_value = total / SMA_PERIOD
+
+        self.sma[pos] = sma_value
+        self.sma[pos + self.capacity] = sma_value
+
+
+class CandleCache:
+    """
+    Keeps one CandleSeries per (symbol, timeframe) in front of MT5Service.
+    The first call fetches the whole window (warmup). After that only the
+    still-forming bar and the bars newer than the last stored timestamp are
+    requested from the terminal. With a BarStore the warmup is served from disk
+    and only the bars missing since the last stored one are fetched.
+
+    With RESAMPLE_FROM_M1, timeframes from M2 to D1 are only fetched for their warmup:
+    afterwards their new bars are built from the symbol's M1 series (one M1 tail fetch
+    per symbol every RESAMPLE_REFRESH_INTERVAL at most), so one fetch serves every
+    timeframe and all of them show the same instant.
+    """
+    TAIL_FETCH = 2  # forming bar + the bar that just closed
+
+    def __init__(self, store=None, resample_from_m1: bool = None):
+        self.series = {}
+        # Optional BarStore: warmups read from disk first and fetched bars are persisted
+        self.store = store
+        self.resample_from_m1 = settings.RESAMPLE_FROM_M1 if resample_from_m1 is None else resample_from_m1
+        self.session_offset = int(settings.SESSION_OFFSET_HOURS * 3600)
+        self._m1_checked = {}  # symbol -> monotonic time of the last M1 refresh
+        self.stats = {"warmups": 0, "store_loads": 0, "refreshes": 0, "resampled": 0, "bars_fetched": 0}
+
+    def get_window(self, symbol: str, timeframe, num_candles: int):
+        """
+        Refreshes the series and returns (rates, sma) for the last `num_candles` bars.
+        The SMA of the first SMA_PERIOD - 1 bars of the window is NaN, exactly as if
+        the window had been fetched and computed from scratch.
+        Returns (None, None) if MT5 has no data.
+        """
+        series = self.refresh(symbol, timeframe, num_candles)
+        if series is None or series.size == 0:
+            return None, None
+
+        rates, sma = series.window(num_candles)
+        sma = sma.copy()
+        sma[:SMA_PERIOD - 1] = np.nan
+        return rates, sma
+
+    def get_rates(self, symbol: str, timeframe, num_candles: int):
+        """Returns a copy of the last `num_candles` raw bars (or None)."""
+        rates, _ = self.get_window(symbol, timeframe, num_candles)
+        return None if rates is None else rates.copy()
+
+    def last_time(self, symbol: str, timeframe):
+        """Time of the newest cached bar, without touching the terminal."""
+        series = self.series.get((symbol, timeframe))
+        return None if series is None else series.last_time
+
+    def invalidate(self, symbol: str = None, timeframe=None):
+        """Drops cached series (all of them, or one symbol/timeframe)."""
+        if symbol is None:
+            self.series.clear()
+            self._m1_checked.clear()
+            return
+        self._m1_checked.pop(symbol, None)
+        for key in list(self.series):
+            if key[0] == symbol and (timeframe is None or key[1] == timeframe):
+                del self.series[key]
+
+    def refresh(self, symbol: str, timeframe, num_candles: int):
+        key = (symbol, timeframe)
+        series = self.series.get(key)
+
+        if series is None or series.size == 0 or num_candles > series.capacity:
+            return self._warmup(key, num_candles)
+        if self._resampled(timeframe):
+            return self._catch_up_from_m1(key, series)
+        return self._catch_up(key, series)
+
+    def _resampled(self, timeframe) -> bool:
+        return self.resample_from_m1 and is_resampled(get_timeframe_seconds(timeframe))
+
+    def _m1_series(self, symbol: str):
+        """M1 series of the symbol, refreshed at most every RESAMPLE_REFRESH_INTERVAL."""
+        key = (symbol, mt5.TIMEFRAME_M1)
+        series = self.series.get(key)
+        now = time.monotonic()
+        if series is not None and now - self._m1_checked.get(symbol, 0.0) < settings.RESAMPLE_REFRESH_INTERVAL:
+            return series
+
+        capacity = max(series.capacity if series is not None else 0, settings.RESAMPLE_M1_BARS)
+        series = self.refresh(symbol, mt5.TIMEFRAME_M1, capacity)
+        self._m1_checked[symbol] = now
+        return series
+
+    def _catch_up_from_m1(self, key, series):
+        """
+        Rebuilds the forming bar and appends the new ones from the M1 bars since its
+        start. Falls back to a direct fetch if the M1 series does not reach back that far.
+        """
+        symbol, timeframe = key
+        m1 = self._m1_series(symbol)
+        if m1 is None or m1.size == 0:
+            return self._catch_up(key, series)
+
+        rates, _ = m1.window(m1.size)
+        since = series.last_time
+        if int(rates['time'][0]) > since:
+            return self._catch_up(key, series)
+
+        first = int(rates['time'].searchsorted(since, side="left"))
+        bars = resample(rates[first:], get_timeframe_seconds(timeframe), self.session_offset)
+        series.merge(bars)
+        self._persist(symbol, timeframe, bars)
+        self.stats["resampled"] += 1
+        return series
+
+    def _catch_up(self, key, series):
+        """Fetches the forming bar + anything newer than the series and merges it."""
+        symbol, timeframe = key
+        tail = self._fetch(symbol, timeframe, self.TAIL_FETCH)
+        if tail is None:
+            return series
+
+        # More than one bar closed since the last call: widen the fetch once
+        if int(tail['time'][0]) > series.last_time:
+            missing = self._estimate_missing(tail, series, timeframe)
+            if missing >= series.capacity:
+                return self._warmup(key, series.capacity, use_store=False)
+            tail = self._fetch(symbol, timeframe, missing + self.TAIL_FETCH)
+            if tail is None:
+                return series
+            if int(tail['time'][0]) > series.last_time:
+                return self._warmup(key, series.capacity, use_store=False)
+
+        series.merge(tail)
+        self._persist(symbol, timeframe, tail)
+        self.stats["refreshes"] += 1
+        return series
+
+    def _warmup(self, key, capacity: int, use_store: bool = True):
+        symbol, timeframe = key
+
+        if use_store and self.store is not None:
+            stored = self.store.last_n(symbol, timeframe, capacity)
+            if len(stored) == capacity:
+                series = CandleSeries(capacity, stored.dtype)
+                series.load(stored)
+                self.series[key] = series
+                self.stats["store_loads"] += 1
+                return self._catch_up(key, series)
+
+        if self._resampled(timeframe) and self.session_offset:
+            # Broker bars follow the server day: shifted sessions are built from M1 history
+            # (capped: the terminal does not serve more than its max bars in chart)
+            seconds = get_timeframe_seconds(timeframe)
+            count = min((capacity + 1) * seconds // 60, settings.RESAMPLE_M1_WARMUP_MAX)
+            rates = self._fetch(symbol, mt5.TIMEFRAME_M1, count)
+            if rates is not None:
+                rates = resample(rates, seconds, self.session_offset)[-capacity:]
+                if len(rates) < capacity:
+                    print(f"⚠️ {symbol}: only {len(rates)} of {capacity} bars could be built "
+                          f"from {count} M1 bars (RESAMPLE_M1_WARMUP_MAX)")
+        else:
+            rates = self._fetch(symbol, timeframe, capacity)
+        if rates is None:
+            return None
+
+        series = CandleSeries(capacity, rates.dtype)
+        series.load(rates)
+        self.series[key] = series
+        self._persist(symbol, timeframe, rates)
+        self.stats["warmups"] += 1
+        return series
+
+    def _persist(self, symbol: str, timeframe, rates):
+        if self.store is None:
+            return
+        try:
+            self.store.append(symbol, timeframe, rates)
+        except OSError as e:
+            print(f"⚠️ Could not write bars of {symbol} to the bar store: {e}")
+
+    def _fetch(self, symbol: str, timeframe, count: int):
+        rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
+        if rates is None or len(rates) == 0:
+            return None
+        self.stats["bars_fetched"] += len(rates)
+        return rates
+
+    @staticmethod
+    def _estimate_missing(tail, series, timeframe):
+        seconds = get_timeframe_seconds(timeframe)
+        return (int(tail['time'][-1]) - series.last_time) // seconds + 1
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import logging
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CandleChannel:
+    """One upstream poll per (symbol, timeframe), fanned out to every subscriber."""
+    def __init__(self, hub, symbol: str, timeframe):
+        self.hub = hub
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.subscribers = set()
+        self.candles = None
+        self.task = None
+
+    def snapshot_message(self):
+        return {
+            "type": "snapshot",
+            "symbol": self.symbol,
+            "candles": self.candles or [],
+        }
+
+    async def run(self):
+        """Polls MT5 while there are subscribers and broadcasts the deltas."""
+        error_delay = self.hub.poll_interval
+        while self.subscribers:
+            try:
+                candles = await self.hub.mt5_service.get_candles_async(
+                    symbol=self.symbol,
+                    timeframe=self.timeframe,
+                    num_candles=self.hub.num_candles
+                )
+                for message in self.diff(candles):
+                    self.broadcast(message)
+                error_delay = self.hub.poll_interval
+                await asyncio.sleep(self.hub.poll_interval)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Stream poll failed for {self.symbol}: {e}")
+                await asyncio.sleep(error_delay)
+                error_delay = min(error_delay * 2, 30)
+
+    def diff(self, candles):
+        """
+        Compares the new window with the last one and returns the messages to send:
+        - "patch": closed bars whose color/pattern changed (the VSA threshold and the
+          V-Shape filter are re-evaluated over the whole window)
+        - "update": the last bar changed
+        - "append": a new bar opened
+        Only the changed fields (plus time) are sent. A full "snapshot" is only sent
+        on the first poll or when the windows can no longer be aligned.
+        """
+        previous = self.candles
+        self.candles = candles
+
+        if not candles:
+            return []
+        if not previous:
+            return [self.snapshot_message()]
+
+        last_time = previous[-1]["time"]
+        old_index = {c["time"]: c for c in previous}
+        patches, updates, appends = [], [], []
+
+        for candle in candles:
+            if candle["time"] > last_time:
+                appends.append({"type": "append", "candle": candle})
+                continue
+
+            old = old_index.get(candle["time"])
+            if old is None:
+                return [self.snapshot_message()]
+            if old == candle:
+                continue
+
+            changed = {k: v for k, v in candle.items() if old.get(k) != v}
+            changed["time"] = candle["time"]
+            if candle["time"] == last_time:
+                updates.append({"type": "update", "candle": changed})
+            else:
+                patches.append(changed)
+
+        messages = [{"type": "patch", "candles": patches}] if patches else []
+        return messages + updates + appends
+
+    def broadcast(self, message):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and resync it with a snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self.snapshot_message())
+
+
+class CandleStreamHub:
+    """
+    Keeps one CandleChannel per (symbol, timeframe). Clients subscribe with
+    subscribe()/unsubscribe() and read JSON-ready messages from their queue:
+    one snapshot on subscribe, then only patch/update/append deltas.
+    """
+    def __init__(self, mt5_service, poll_interval: float = None, num_candles: int = 100, queue_size: int = 100):
+        self.mt5_service = mt5_service
+        self.poll_interval = poll_interval or settings.STREAM_POLL_INTERVAL
+        self.num_candles = num_candles
+        self.queue_size = queue_size
+        self.channels = {}
+
+    def subscribe(self, symbol: str, timeframe):
+        key = (symbol, timeframe)
+        channel = self.channels.get(key)
+        if channel is None:
+            channel = CandleChannel(self, symbol, timeframe)
+            self.channels[key] = channel
+
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        if channel.candles:
+            queue.put_nowait(channel.snapshot_message())
+        channel.subscribers.add(queue)
+
+        if channel.task is None or channel.task.done():
+            channel.task = asyncio.create_task(channel.run())
+        return queue
+
+    def unsubscribe(self, symbol: str, timeframe, queue):
+        key = (symbol, timeframe)
+        channel = self.channels.get(key)
+        if channel is None:
+            return
+
+        channel.subscribers.discard(queue)
+        if not channel.subscribers:
+            if channel.task is not None:
+                channel.task.cancel()
+            del self.channels[key]
+
+    @staticmethod
+    def encode(message) -> str:
+        """Compact JSON for the wire."""
+        return json.dumps(message, separators=(",", ":"))
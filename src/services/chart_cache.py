@@ -0,0 +1,126 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from src.config.settings import settings
+from src.services.metrics import CHART_DATA_CACHE_REQUESTS, registry
+from src.strategy.candles import compute_candle_columns
+
+
+class ChartEntry:
+    """
+    Analysed window of one chart request. `version` is the last bar (time + its
+    current OHLCV): the same version means the same columns. Responses built from
+    the columns (rows, columnar body + ETag...) are kept per format in `rendered`.
+    """
+    def __init__(self, columns, version):
+        self.columns = columns
+        self.version = version
+        self.checked_at = time.monotonic()
+        self.rendered = {}
+
+    @property
+    def last_time(self):
+        return None if self.version is None else self.version[0]
+
+    def render(self, key, build):
+        """build() once per entry and format, then served from memory."""
+        value = self.rendered.get(key)
+        if value is None:
+            value = self.rendered[key] = build()
+        return value
+
+
+def _version(rates):
+    if rates is None or len(rates) == 0:
+        return None
+    last = rates[-1]
+    return int(last["time"]), len(rates), last.tobytes()
+
+
+class ChartDataCache:
+    """
+    Result cache in front of /api/chart-data, keyed by (source, symbol, timeframe,
+    count, patterns):
+    1. An entry is served without touching the terminal for CHART_DATA_TTL seconds.
+    2. Single flight: one refresh per expired / missing key, however many requests
+       ask for it, so terminal calls follow the number of distinct instruments, not clients.
+    3. While it runs, an entry expired for less than CHART_DATA_STALE seconds is still
+       served (no request waits behind the MT5 queue); older or missing ones await it.
+    4. A refresh only fetches the bars; if the last bar did not change the entry is
+       revalidated and the analysis / serialization are not run again.
+    5. At most CHART_DATA_CACHE_SIZE entries, least recently used evicted first.
+    """
+    def __init__(self, ttl: float = None, stale: float = None, maxsize: int = None):
+        self.ttl = settings.CHART_DATA_TTL if ttl is None else ttl
+        self.stale = settings.CHART_DATA_STALE if stale is None else stale
+        self.maxsize = maxsize or settings.CHART_DATA_CACHE_SIZE
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.stats = {"hits": 0, "stale": 0, "misses": 0, "coalesced": 0, "revalidated": 0, "evictions": 0}
+        registry.gauge("chart_data_cache_entries", "Entries in the /chart-data cache", callback=lambda: len(self.entries))
+
+    async def get(self, fetch, symbol: str, timeframe: str, count: int, patterns: str, source: str = ""):
+        """
+        ChartEntry of the request. `fetch()` is awaited on a miss and returns the MT5
+        rates array (or None); its errors are raised to every waiting request.
+        """
+        key = (source, symbol, timeframe, count, patterns)
+        entry = self.entries.get(key)
+        age = time.monotonic() - entry.checked_at if entry is not None else None
+        if age is not None and age < self.ttl:
+            self.entries.move_to_end(key)
+            self._count("hits")
+            return entry
+
+        flight = self.inflight.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._refresh(key, entry, fetch, patterns))
+            self.inflight[key] = flight
+            flight.add_done_callback(lambda done: self._landed(key, done))
+            waiting = "misses"
+        else:
+            waiting = "coalesced"
+
+        if age is not None and age < self.ttl + self.stale:
+            self.entries.move_to_end(key)
+            self._count("stale")
+            return entry
+        self._count(waiting)
+        # shield: a client that disconnects does not cancel the refresh of the others
+        return await asyncio.shield(flight)
+
+    async def _refresh(self, key, entry, fetch, patterns: str):
+        rates = await fetch()
+        version = _version(rates)
+        if entry is not None and entry.version == version:
+            entry.checked_at = time.monotonic()
+            self._count("revalidated")
+        else:
+            columns = None
+            if version is not None:
+                columns = await asyncio.to_thread(compute_candle_columns, rates, None, patterns)
+            entry = ChartEntry(columns, version)
+
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self._count("evictions")
+        return entry
+
+    def _landed(self, key, flight):
+        if self.inflight.get(key) is flight:
+            del self.inflight[key]
+        if not flight.cancelled():
+            flight.exception()  # Retrieved here in case every waiter went away
+
+    def _count(self, outcome: str):
+        self.stats[outcome] += 1
+        CHART_DATA_CACHE_REQUESTS.inc(outcome=outcome)
+
+    def invalidate(self, symbol: str = None):
+        """Drops the entries of one symbol (or all of them)."""
+        for key in list(self.entries):
+            if symbol is None or key[1] == symbol:
+                del self.entries[key]
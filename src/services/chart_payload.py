@@ -0,0 +1,85 @@
+import hashlib
+import json
+
+import numpy as np
+
+from src.strategy.candles import PALETTE
+
+try:
+    import orjson  # Optional: serializes NumPy arrays natively
+except ImportError:
+    orjson = None
+
+
+def build_columnar_payload(symbol: str, timeframe: str, columns, digits: int = None):
+    """
+    Columnar chart payload built straight from compute_candle_columns():
+    parallel arrays for time/OHLC/volume, one palette index per candle instead of
+    three repeated color strings, the SMA from its first defined value on, and the
+    pattern hits as sparse candle indices (+1 / -1 side per hit in pattern_sides).
+    `digits` rounds prices to the symbol precision (shortest float repr on the wire).
+    """
+    if columns is None:
+        return {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "count": 0,
+            "palette": list(PALETTE),
+        }
+
+    sma = columns["sma"]
+    valid = np.flatnonzero(~np.isnan(sma))
+    sma_offset = int(valid[0]) if len(valid) else len(sma)
+
+    prices = {name: columns[name] for name in ("open", "high", "low", "close")}
+    prices["sma"] = sma[sma_offset:]
+    if digits is not None:
+        prices = {name: np.round(values, digits) for name, values in prices.items()}
+
+    return {
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "count": len(columns["time"]),
+        "time": columns["time"],
+        "open": prices["open"],
+        "high": prices["high"],
+        "low": prices["low"],
+        "close": prices["close"],
+        "tick_volume": columns["tick_volume"],
+        "palette": list(PALETTE),
+        "color": columns["color_idx"],
+        "sma_offset": sma_offset,
+        "sma": prices["sma"],
+        "patterns": columns["patterns"],
+        "pattern_sides": columns["pattern_sides"],
+    }
+
+
+def _to_builtin(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {k: _to_builtin(v) for k, v in value.items()}
+    return value
+
+
+def encode_payload(payload) -> bytes:
+    """JSON bytes of a payload holding NumPy arrays (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_to_builtin(payload), separators=(",", ":")).encode("utf-8")
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag of an encoded response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """True if the If-None-Match header covers `etag`."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
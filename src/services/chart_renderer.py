@@ -0,0 +1,151 @@
+import asyncio
+import datetime
+import io
+from collections import OrderedDict
+
+import numpy as np
+
+from src.config.settings import settings
+from src.strategy.candles import PALETTE, V_SHAPE
+from src.utils import get_mt5_timeframe
+
+BACKGROUND = '#131722'
+GRID_COLOR = '#2a2e39'
+TEXT_COLOR = '#d1d4dc'
+SMA_COLOR = '#f59e0b'
+
+MARGIN_TOP = 28
+MARGIN_BOTTOM = 22
+MARGIN_RIGHT = 70
+MARGIN_LEFT = 8
+
+
+def render_chart_png(columns, symbol: str, timeframe: str, width: int = 800, height: int = 450) -> bytes:
+    """
+    Draws candlesticks (VSA colors), the SMA and the V-Shape markers from
+    compute_candle_columns() output and returns a palette PNG (a few dozen KB).
+    Blocking: run it in a worker thread.
+    """
+    from PIL import Image, ImageDraw, ImageFont  # Only loaded once a chart is drawn
+
+    image = Image.new("RGB", (width, height), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+
+    count = 0 if columns is None else len(columns["time"])
+    title = f"{symbol} {timeframe}"
+    if count == 0:
+        draw.text((MARGIN_LEFT, 8), f"{title}  (no data)", fill=TEXT_COLOR, font=font)
+        return _encode(image)
+
+    open_, high = columns["open"], columns["high"]
+    low, close = columns["low"], columns["close"]
+    sma = columns["sma"]
+
+    # Price -> pixel scale (SMA included so the line never leaves the chart)
+    valid_sma = sma[~np.isnan(sma)]
+    top = float(max(high.max(), valid_sma.max() if len(valid_sma) else high.max()))
+    bottom = float(min(low.min(), valid_sma.min() if len(valid_sma) else low.min()))
+    pad = (top - bottom) * 0.05 or abs(top) * 0.001 or 1.0
+    top, bottom = top + pad, bottom - pad
+
+    plot_w = width - MARGIN_LEFT - MARGIN_RIGHT
+    plot_h = height - MARGIN_TOP - MARGIN_BOTTOM
+    step = plot_w / count
+    body_w = max(1.0, step * 0.7)
+
+    def y(price):
+        return MARGIN_TOP + (top - price) / (top - bottom) * plot_h
+
+    x_center = MARGIN_LEFT + step * (np.arange(count) + 0.5)
+
+    # Grid + price labels
+    digits = max(0, min(6, int(-np.floor(np.log10((top - bottom) / 5))) + 1))
+    for level in np.linspace(bottom + pad, top - pad, 5):
+        py = y(level)
+        draw.line([(MARGIN_LEFT, py), (width - MARGIN_RIGHT, py)], fill=GRID_COLOR)
+        draw.text((width - MARGIN_RIGHT + 4, py - 6), f"{level:.{digits}f}", fill=TEXT_COLOR, font=font)
+
+    # Candles
+    colors = columns["color_idx"]
+    for i in range(count):
+        color = PALETTE[colors[i]]
+        cx = x_center[i]
+        draw.line([(cx, y(high[i])), (cx, y(low[i]))], fill=color)
+        body_top, body_bottom = y(max(open_[i], close[i])), y(min(open_[i], close[i]))
+        draw.rectangle(
+            [cx - body_w / 2, body_top, cx + body_w / 2, max(body_bottom, body_top + 1)],
+            fill=color
+        )
+
+    # SMA
+    points = [(x_center[i], y(sma[i])) for i in np.flatnonzero(~np.isnan(sma))]
+    if len(points) > 1:
+        draw.line(points, fill=SMA_COLOR, width=2)
+
+    # V-Shape markers (triangle under the low)
+    marker = max(3.0, body_w / 2)
+    for i in columns["pattern_idx"]:
+        cx, base = x_center[i], y(low[i]) + 4
+        draw.polygon(
+            [(cx, base), (cx - marker, base + marker * 1.6), (cx + marker, base + marker * 1.6)],
+            fill=PALETTE[V_SHAPE]
+        )
+
+    # Title + time range
+    first = datetime.datetime.fromtimestamp(int(columns["time"][0]), datetime.timezone.utc)
+    last = datetime.datetime.fromtimestamp(int(columns["time"][-1]), datetime.timezone.utc)
+    draw.text((MARGIN_LEFT, 8), f"{title}  close {close[-1]:.{digits}f}", fill=TEXT_COLOR, font=font)
+    draw.text(
+        (MARGIN_LEFT, height - MARGIN_BOTTOM + 6),
+        f"{first:%Y-%m-%d %H:%M} -> {last:%Y-%m-%d %H:%M} UTC",
+        fill=TEXT_COLOR, font=font
+    )
+    return _encode(image)
+
+
+def _encode(image) -> bytes:
+    # Few distinct colors: an adaptive palette keeps the PNG small
+    bio = io.BytesIO()
+    image.quantize(colors=32).save(bio, "PNG", optimize=True)
+    return bio.getvalue()
+
+
+class ChartRenderer:
+    """
+    Headless chart images for alerts, drawn from MT5Service.get_candle_columns.
+
+    Renders are cached per (symbol, timeframe, candles, last bar time, size): the same
+    bar is only drawn once however many alerts ask for it. Drawing and PNG encoding
+    run in a worker thread.
+    """
+    def __init__(self, mt5_service, maxsize: int = None):
+        self.mt5_service = mt5_service
+        self.maxsize = maxsize or settings.CHART_CACHE_SIZE
+        self.cache = OrderedDict()
+        self.stats = {"hits": 0, "renders": 0}
+
+    async def render(self, symbol: str, timeframe: str, num_candles: int = 100,
+                     width: int = None, height: int = None):
+        """PNG bytes of the latest `num_candles` bars (None if there is no data)."""
+        width = width or settings.CHART_WIDTH
+        height = height or settings.CHART_HEIGHT
+        columns = await self.mt5_service.get_candle_columns_async(
+            symbol, get_mt5_timeframe(timeframe), num_candles
+        )
+        if columns is None:
+            return None
+
+        key = (symbol, timeframe, num_candles, int(columns["time"][-1]), width, height)
+        png = self.cache.get(key)
+        if png is not None:
+            self.cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return png
+
+        png = await asyncio.to_thread(render_chart_png, columns, symbol, timeframe, width, height)
+        self.stats["renders"] += 1
+        self.cache[key] = png
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+        return png
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import MetaTrader5 as mt5
+from src.config.settings import settings
+from src.services.mt5_client import mt5_client
+from src.utils import get_timeframe_seconds
+
+
+class AdaptiveBackoff:
+    """
+    Poll delay that stays at `base` while the market is active and grows by
+    `factor` up to `maximum` once nothing happened for `idle_after` seconds
+    (market closed, weekend, disconnected symbol).
+    """
+    def __init__(self, base: float, maximum: float, idle_after: float, factor: float = 1.5):
+        self.base = base
+        self.maximum = maximum
+        self.idle_after = idle_after
+        self.factor = factor
+        self.delay = base
+        self.last_activity = time.monotonic()
+
+    def reset(self):
+        self.delay = self.base
+        self.last_activity = time.monotonic()
+
+    def next_delay(self) -> float:
+        if time.monotonic() - self.last_activity < self.idle_after:
+            return self.base
+        self.delay = min(self.delay * self.factor, self.maximum)
+        return self.delay
+
+
+class MarketEvent:
+    """What changed for a symbol since the last poll."""
+    def __init__(self, symbol: str, tick, closed_timeframes):
+        self.symbol = symbol
+        self.tick = tick
+        self.time_msc = int(tick.time_msc)
+        self.closed_timeframes = closed_timeframes
+
+    def bar_closed(self, timeframe) -> bool:
+        return timeframe in self.closed_timeframes
+
+
+class MarketEventWatcher:
+    """
+    Detects new ticks (symbol_info_tick().time_msc changed) and bar closes (the tick
+    falls in a newer bar than the previous one) per symbol/timeframe, with a single
+    cheap symbol_info_tick call per poll instead of downloading bars.
+    """
+    def __init__(self, base_interval: float = None, max_interval: float = None, idle_after: float = None):
+        self.base_interval = base_interval or settings.TICK_POLL_INTERVAL
+        self.max_interval = max_interval or settings.IDLE_POLL_MAX_INTERVAL
+        self.idle_after = idle_after or settings.IDLE_AFTER_SECONDS
+        self.last_time_msc = {}
+        self.last_bar_open = {}
+        self.backoffs = {}
+
+    def poll(self, symbol: str, timeframes=()):
+        """Runs on the MT5 thread. Returns a MarketEvent, or None if nothing changed."""
+        tick = mt5.symbol_info_tick(symbol)
+        if tick is None:
+            return None
+
+        time_msc = int(tick.time_msc)
+        if self.last_time_msc.get(symbol) == time_msc:
+            return None
+        self.last_time_msc[symbol] = time_msc
+
+        tick_time = time_msc // 1000
+        closed = []
+        for timeframe in timeframes:
+            seconds = get_timeframe_seconds(timeframe)
+            bar_open = tick_time - tick_time % seconds
+            previous = self.last_bar_open.get((symbol, timeframe))
+            if previous is not None and bar_open > previous:
+                closed.append(timeframe)
+            self.last_bar_open[(symbol, timeframe)] = bar_open
+
+        return MarketEvent(symbol, tick, closed)
+
+    def backoff_for(self, symbol: str) -> AdaptiveBackoff:
+        backoff = self.backoffs.get(symbol)
+        if backoff is None:
+            backoff = AdaptiveBackoff(self.base_interval, self.max_interval, self.idle_after)
+            self.backoffs[symbol] = backoff
+        return backoff
+
+    async def wait(self, symbol: str, timeframes=(), is_running=lambda: True, max_wait: float = None):
+        """
+        Waits until the next tick of `symbol` and returns its MarketEvent.
+        Returns None if is_running() turned False or nothing happened for `max_wait`
+        seconds (lets the caller run its connection watchdog).
+        """
+        backoff = self.backoff_for(symbol)
+        started = time.monotonic()
+        while is_running():
+            event = await mt5_client.run(self.poll, symbol, timeframes)
+            if event is not None:
+                backoff.reset()
+                return event
+            if max_wait is not None and time.monotonic() - started >= max_wait:
+                return None
+            await asyncio.sleep(backoff.next_delay())
+        return None
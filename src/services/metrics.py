@@ -0,0 +1,291 @@
+import asyncio
+import bisect
+import threading
+import time
+
+from src.config.settings import settings
+
+# Seconds: 100 µs .. 30 s, roughly x2.5 per bucket
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count per label set."""
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = self.header()
+        with self._lock:
+            items = list(self.values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Last value per label set, or a callback read at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames=(), callback=None):
+        super().__init__(name, help_text, labelnames)
+        self.values = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels):
+        self.values[self._key(labels)] = value
+
+    def render(self):
+        lines = self.header()
+        if self.callback is not None:
+            lines.append(f"{self.name} {_format_value(self.callback())}")
+            return lines
+        for key, value in list(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram: observe() is one bisect + two additions under a lock,
+    cheap enough for every call in production.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+        self.series = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, **labels):
+        """Context manager timing its block: `with HISTOGRAM.time(stage="fetch"): ...`"""
+        return _Timer(self, labels)
+
+    def render(self):
+        lines = self.header()
+        with self._lock:
+            items = [(key, list(series)) for key, series in self.series.items()]
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Timer:
+    # Plain class instead of @contextmanager: no generator per timed block
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """All metrics of the process, rendered in the Prometheus text format."""
+    def __init__(self):
+        self.metrics = {}
+
+    def _register(self, metric):
+        """
+        Registering a name again returns the existing metric, so its samples are kept.
+        A new gauge callback replaces the old one (the newest owner reports), and
+        a name reused with another type or label set is a bug: ValueError.
+        """
+        existing = self.metrics.get(metric.name)
+        if existing is None:
+            self.metrics[metric.name] = metric
+            return metric
+        if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+            raise ValueError(
+                f"Metric '{metric.name}' already registered as {existing.kind} {existing.labelnames}"
+            )
+        if isinstance(metric, Gauge) and metric.callback is not None:
+            existing.callback = metric.callback
+        return existing
+
+    def counter(self, name: str, help_text: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames=(), callback=None) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames, callback))
+
+    def histogram(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# --- Shared metrics ---
+
+TICK_STAGE_SECONDS = registry.histogram(
+    "bot_tick_stage_seconds", "Duration of each TradingBot.tick stage", ("stage",)
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Time to the response start per endpoint", ("method", "route", "status")
+)
+MT5_CALL_SECONDS = registry.histogram(
+    "mt5_call_seconds", "Run time of calls on the MT5 worker thread", ("func",)
+)
+MT5_QUEUE_WAIT_SECONDS = registry.histogram(
+    "mt5_queue_wait_seconds", "Time MT5 calls waited in the worker queue"
+)
+MT5_CALLS = registry.counter(
+    "mt5_calls_total", "MT5 worker calls by outcome", ("func", "outcome")
+)
+TELEGRAM_REQUEST_SECONDS = registry.histogram(
+    "telegram_request_seconds", "Duration of Telegram API calls", ("method",)
+)
+TELEGRAM_MESSAGES = registry.counter(
+    "telegram_messages_total", "Telegram API calls by outcome", ("method", "outcome")
+)
+ORDER_FILL_SECONDS = registry.histogram(
+    "order_signal_to_fill_seconds", "Signal-to-fill latency of market orders", ("side",)
+)
+MT5_CONNECTION_EVENTS = registry.counter(
+    "mt5_connection_events_total", "MT5 connection manager events (lost, attempt, connected, not_ready)", ("event",)
+)
+CHART_DATA_CACHE_REQUESTS = registry.counter(
+    "chart_data_cache_requests_total", "/chart-data cache lookups by outcome", ("outcome",)
+)
+LOOP_LAG_SECONDS = registry.histogram(
+    "event_loop_lag_seconds", "Extra delay of a sleep on the event loop (blocking work)"
+)
+
+
+class LoopLagMonitor:
+    """Sleeps `interval` seconds in a loop and records how late it wakes up."""
+    def __init__(self, interval: float = None):
+        self.interval = interval or settings.LOOP_LAG_INTERVAL
+        self.last_lag = 0.0
+        self._task = None
+        registry.gauge("event_loop_lag_last_seconds", "Last measured event-loop lag", callback=lambda: self.last_lag)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, time.perf_counter() - started - self.interval)
+            LOOP_LAG_SECONDS.observe(self.last_lag)
+
+
+class HTTPMetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware overhead): times every HTTP request
+    until the response starts, labelled by route template, so streaming endpoints
+    (SSE) are measured by their time to first byte.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        recorded = False
+
+        def record(status):
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status,
+            )
+
+        async def send_wrapper(message):
+            nonlocal recorded
+            if message["type"] == "http.response.start" and not recorded:
+                recorded = True
+                record(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if not recorded:
+                record(500)
+            raise
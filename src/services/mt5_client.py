@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import MetaTrader5 as mt5
+from src.config.settings import settings
+from src.services.metrics import MT5_CALL_SECONDS, MT5_CALLS, MT5_QUEUE_WAIT_SECONDS, registry
+
+logger = logging.getLogger(__name__)
+
+
+class MT5QueueFullError(RuntimeError):
+    """Raised when the MT5 worker queue is full (backpressure)."""
+
+
+class MT5TimeoutError(TimeoutError):
+    """Raised when a MT5 call does not complete within its timeout."""
+
+
+class AsyncMT5Client:
+    """
+    Runs every MetaTrader5 call on one dedicated worker thread.
+
+    The MetaTrader5 package is not thread-safe, so instead of the default
+    executor pool all calls go through a bounded queue to a single thread
+    owned by this client. Coroutines await the result with a per-call timeout
+    and the event loop is never blocked by the terminal.
+
+    Note: a call that already started cannot be interrupted. On timeout or
+    cancellation the caller is released immediately; calls that are still
+    queued are skipped by the worker.
+    """
+    def __init__(self, max_queue: int = None, default_timeout: float = None):
+        self.max_queue = max_queue or settings.MT5_QUEUE_SIZE
+        self.default_timeout = default_timeout or settings.MT5_CALL_TIMEOUT
+
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self.metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "cancelled": 0,
+            "rejected": 0,
+            "max_queue_depth": 0,
+            "wait_seconds_total": 0.0,
+            "run_seconds_total": 0.0,
+        }
+        registry.gauge("mt5_queue_depth", "Calls waiting for the MT5 worker thread", callback=lambda: self.queue_depth)
+
+    # --- Lifecycle ---
+
+    def start(self):
+        """Starts the worker thread (called automatically on first submit)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._worker, name="mt5-worker", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stops the worker after the calls already queued.
+        Never blocks longer than `timeout`: if the worker is stuck in a terminal
+        call with a full queue, the pending calls are cancelled instead.
+        """
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            cancelled = self._cancel_pending()
+            logger.warning(f"MT5 worker busy with a full queue on stop: {cancelled} pending calls cancelled")
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass  # Refilled meanwhile; the daemon thread dies with the process
+
+        thread.join(max(0.0, deadline - time.monotonic()))
+        if thread.is_alive():
+            logger.warning(f"MT5 worker did not stop within {timeout:.1f}s")
+
+    def _cancel_pending(self) -> int:
+        """Drops every queued call, cancelling its future. Returns how many were dropped."""
+        cancelled = 0
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return cancelled
+            if job is not None and job[0].cancel():
+                cancelled += 1
+                self.metrics["cancelled"] += 1
+
+    @property
+    def is_worker_thread(self):
+        return threading.current_thread() is self._thread
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    # --- Submission ---
+
+    def submit(self, func, *args, **kwargs) -> Future:
+        """
+        Queues `func(*args, **kwargs)` for the worker thread.
+        Returns a concurrent.futures.Future. Raises MT5QueueFullError if the queue is full.
+        """
+        if self.is_worker_thread:
+            # Already on the MT5 thread (nested call): run inline to avoid a deadlock
+            future = Future()
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        self.start()
+        future = Future()
+        try:
+            self._queue.put_nowait((future, func, args, kwargs, time.perf_counter()))
+        except queue.Full:
+            self.metrics["rejected"] += 1
+            MT5_CALLS.inc(func=getattr(func, "__name__", "call"), outcome="rejected")
+            raise MT5QueueFullError(f"MT5 queue is full ({self.max_queue} pending calls)")
+
+        self.metrics["submitted"] += 1
+        depth = self._queue.qsize()
+        if depth > self.metrics["max_queue_depth"]:
+            self.metrics["max_queue_depth"] = depth
+        return future
+
+    async def run(self, func, *args, timeout: float = None, **kwargs):
+        """
+        Runs a callable on the MT5 thread and awaits its result.
+        Use it for service methods that make several terminal calls in a row.
+        """
+        future = self.submit(func, *args, **kwargs)
+        timeout = self.default_timeout if timeout is None else timeout
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            self.metrics["timeouts"] += 1
+            name = getattr(func, "__name__", repr(func))
+            MT5_CALLS.inc(func=name, outcome="timeout")
+            raise MT5TimeoutError(f"MT5 call '{name}' timed out after {timeout:.1f}s")
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    async def call(self, name: str, *args, timeout: float = None, **kwargs):
+        """Awaits a single MetaTrader5 function by name, e.g. call('positions_get', symbol=s)."""
+        return await self.run(getattr(mt5, name), *args, timeout=timeout, **kwargs)
+
+    def snapshot(self):
+        """Current metrics, including the live queue depth."""
+        return {**self.metrics, "queue_depth": self.queue_depth, "max_queue": self.max_queue}
+
+    # --- Worker ---
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+
+            future, func, args, kwargs, enqueued_at = job
+            if not future.set_running_or_notify_cancel():
+                # Caller timed out or was cancelled while the call was queued
+                self.metrics["cancelled"] += 1
+                continue
+
+            started_at = time.perf_counter()
+            self.metrics["wait_seconds_total"] += started_at - enqueued_at
+            MT5_QUEUE_WAIT_SECONDS.observe(started_at - enqueued_at)
+            name = getattr(func, "__name__", "call")
+            outcome = "ok"
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                outcome = "error"
+                self.metrics["failed"] += 1
+                future.set_exception(e)
+            else:
+                self.metrics["completed"] += 1
+                future.set_result(result)
+            finally:
+                elapsed = time.perf_counter() - started_at
+                self.metrics["run_seconds_total"] += elapsed
+                MT5_CALL_SECONDS.observe(elapsed, func=name)
+                MT5_CALLS.inc(func=name, outcome=outcome)
+
+
+# Shared instance: one MT5 thread per process
+mt5_client = AsyncMT5Client()
@@ -0,0 +1,154 @@
+import asyncio
+import random
+import time
+
+import MetaTrader5 as mt5
+
+from src.config.settings import settings
+from src.services.metrics import MT5_CONNECTION_EVENTS
+from src.services.mt5_client import mt5_client
+
+
+class ConnectionManager:
+    """
+    Connection state of one MT5Service, so the hot paths never probe the terminal:
+    1. ensure() is the per-call gate (MT5 thread): True right away while connected,
+       False right away while a failed reconnect is backing off ("not ready"),
+       otherwise one initialize + login attempt.
+    2. Failed attempts wait MT5_RECONNECT_BASE_DELAY * 2^n (capped at
+       MT5_RECONNECT_MAX_DELAY) with jitter, so an outage is not a reconnect storm
+       and several processes do not retry in lockstep.
+    3. check() runs terminal_info at most every MT5_HEALTH_CHECK_INTERVAL: start()
+       runs it in the background (event loop processes), the account workers on
+       their heartbeat ping.
+    4. MT5Service.initialize forgets the selected symbols on every connect, so they
+       are only re-selected after a reconnect. Callbacks registered with
+       on_reconnect() run (on the event loop) after a connection was restored.
+    """
+    def __init__(self, service, check_interval: float = None, base_delay: float = None, max_delay: float = None):
+        self.service = service
+        self.check_interval = settings.MT5_HEALTH_CHECK_INTERVAL if check_interval is None else check_interval
+        self.base_delay = settings.MT5_RECONNECT_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = settings.MT5_RECONNECT_MAX_DELAY if max_delay is None else max_delay
+
+        self.failures = 0          # Failed attempts since the last successful connect
+        self.next_attempt = 0.0    # monotonic time before which ensure() answers "not ready"
+        self.last_check = 0.0
+        self.generation = 0        # Successful connects so far
+        self.stats = {"checks": 0, "lost": 0, "attempts": 0, "connects": 0, "not_ready": 0}
+        self._callbacks = []
+        self._task = None
+
+    @property
+    def ready(self) -> bool:
+        return self.service.connected
+
+    def retry_in(self) -> float:
+        """Seconds until the next reconnect attempt is allowed (0 if now)."""
+        return max(0.0, self.next_attempt - time.monotonic())
+
+    def backoff(self, failures: int) -> float:
+        """Delay after `failures` failed attempts: exponential, capped, 50-100% jitter."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (failures - 1))
+        return random.uniform(delay / 2, delay)
+
+    # --- MT5 thread ---
+
+    def ensure(self) -> bool:
+        """Gate for terminal calls: never waits out the backoff."""
+        if self.service.connected:
+            return True
+        if time.monotonic() < self.next_attempt:
+            self.stats["not_ready"] += 1
+            MT5_CONNECTION_EVENTS.inc(event="not_ready")
+            return False
+        return self.connect()
+
+    def connect(self) -> bool:
+        """One initialize + login attempt; schedules the next one if it fails."""
+        self.stats["attempts"] += 1
+        MT5_CONNECTION_EVENTS.inc(event="attempt")
+        if self.service.initialize():
+            self.failures = 0
+            self.next_attempt = 0.0
+            self.last_check = time.monotonic()
+            self.generation += 1
+            self.stats["connects"] += 1
+            MT5_CONNECTION_EVENTS.inc(event="connected")
+            return True
+
+        self.failures += 1
+        delay = self.backoff(self.failures)
+        self.next_attempt = time.monotonic() + delay
+        print(f"⏳ MT5 reconnect attempt {self.failures} failed, next one in {delay:.1f}s")
+        return False
+
+    def check(self, force: bool = False) -> bool:
+        """
+        Health check: terminal_info when the last one is older than the interval.
+        A lost terminal is marked disconnected and reconnected right away (then
+        with backoff). Returns the connection state.
+        """
+        now = time.monotonic()
+        if self.service.connected and not force and now - self.last_check < self.check_interval:
+            return True
+
+        if self.service.connected:
+            self.last_check = now
+            self.stats["checks"] += 1
+            if mt5.terminal_info() is not None:
+                return True
+            print("⚠️ MT5 connection lost, reconnecting...")
+            self.service.connected = False
+            self.stats["lost"] += 1
+            MT5_CONNECTION_EVENTS.inc(event="lost")
+            self.next_attempt = 0.0
+        return self.ensure()
+
+    # --- Event loop ---
+
+    def on_reconnect(self, callback):
+        """Registers `async callback()` to run after a lost connection is restored."""
+        self._callbacks.append(callback)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def run(self):
+        seen = self.generation
+        while True:
+            try:
+                await mt5_client.run(self.check)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ MT5 health check failed: {e}")
+
+            if self.generation != seen:
+                if seen:  # The first connect is not a reconnect
+                    await self._notify()
+                seen = self.generation
+
+            delay = self.check_interval if self.ready else self.retry_in()
+            await asyncio.sleep(max(delay, 0.05))
+
+    async def _notify(self):
+        for callback in self._callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                print(f"⚠️ Reconnect callback failed: {e}")
+
+    def status(self):
+        return {
+            "connected": self.ready,
+            "failures": self.failures,
+            "retryIn": round(self.retry_in(), 2),
+            **self.stats,
+        }
@@ -1,38 +1,101 @@
+import os
 import MetaTrader5 as mt5
 from src.config.settings import settings
+from src.services.bar_store import BarStore
+from src.services.candle_cache import CandleCache
+from src.services.mt5_client import mt5_client
+from src.services.mt5_connection import ConnectionManager
+from src.services.symbol_catalog import SymbolCatalog
+from src.strategy.candles import build_candles, compute_candle_columns
+from src.strategy.patterns import DEFAULT_PATTERNS
 
 class MT5Service:
-    def __init__(self):
+    def __init__(self, account=None):
         # Initialize connection state to prevent AttributeErrors
         self.connected = False
 
+        # Credentials: an AccountConfig (multi-account workers) or the MT5_* settings
+        self.account = account
+        self.name = account.name if account else "default"
+        self.login = account.login if account else settings.MT5_LOGIN
+        self.password = account.password if account else settings.MT5_PASSWORD
+        self.server = account.server if account else settings.MT5_SERVER
+        self.path = (account.path if account else None) or settings.MT5_PATH
+
+        # Optional on-disk history (memory-mapped), fed by the candle cache (one folder per account)
+        store_dir = settings.BAR_STORE_DIR
+        if store_dir and account:
+            store_dir = os.path.join(store_dir, account.name)
+        self.bar_store = BarStore(store_dir) if store_dir else None
+
+        # Ring buffers per (symbol, timeframe): only new bars are fetched after warmup
+        self.candle_cache = CandleCache(store=self.bar_store)
+
+        # Cached symbols_get() + "already selected" set
+        self.symbol_catalog = SymbolCatalog()
+
+        # Health checks + reconnects with backoff (hot paths only read its state)
+        self.connection = ConnectionManager(self)
+
     def initialize(self):
         """
-        Initializes the connection to MetaTrader 5 using settings.
+        Initializes the connection to MetaTrader 5 using the account credentials
+        (the MT5_* settings unless an AccountConfig was given).
         Returns True if successful, False otherwise.
         """
         # Attempt to initialize with the specific path
-        if not mt5.initialize(path=settings.MT5_PATH):
+        if not mt5.initialize(path=self.path):
             print(f"❌ MT5 Initialization failed. Error: {mt5.last_error()}")
             self.connected = False
             return False
         
         # Ensure we are logged into the correct account
         authorized = mt5.login(
-            login=settings.MT5_LOGIN, 
-            password=settings.MT5_PASSWORD, 
-            server=settings.MT5_SERVER
+            login=self.login, 
+            password=self.password, 
+            server=self.server
         )
         
         if not authorized:
-            print(f"❌ Failed to login to account {settings.MT5_LOGIN}. Error: {mt5.last_error()}")
+            print(f"❌ Failed to login to account {self.login}. Error: {mt5.last_error()}")
             self.connected = False
             return False
             
         print("✅ MT5 Connected Successfully")
         self.connected = True
+        self.symbol_catalog.reset_selection()
+
+        # Fill the holes left while we were disconnected
+        self.backfill_bar_store()
         return True
 
+    def backfill_bar_store(self):
+        """Backfills the bar store for every series the cache is tracking."""
+        if self.bar_store is None:
+            return
+
+        for symbol, timeframe in list(self.candle_cache.series):
+            try:
+                written = self.bar_store.backfill(
+                    symbol, timeframe, mt5.copy_rates_from_pos,
+                    max_bars=settings.BAR_STORE_BACKFILL
+                )
+                if written:
+                    print(f"💾 Backfilled {written} bars of {symbol}")
+            except Exception as e:
+                print(f"⚠️ Backfill failed for {symbol}: {e}")
+
+    def get_stored_bars(self, symbol: str, timeframe, start: int = None, end: int = None, count: int = None):
+        """
+        Reads history from the local bar store without touching the terminal.
+        Returns a memory-mapped view (time range, or the last `count` bars).
+        """
+        if self.bar_store is None:
+            return None
+        if count is not None:
+            return self.bar_store.last_n(symbol, timeframe, count)
+        return self.bar_store.range(symbol, timeframe, start, end)
+
     def shutdown(self):
         """Closes the connection to MT5."""
         mt5.shutdown()
@@ -41,148 +104,121 @@ class MT5Service:
     def get_available_symbols(self):
         """
         Retrieves a list of all available symbol names from MT5.
+        Served from the symbol catalog (symbols_get() only when the snapshot is stale).
         Returns: list[str]
         """
-        if not self.connected:
-            if not self.initialize():
-                return []
-        
-        # Fetch all symbols from the broker
-        symbols_info = mt5.symbols_get()
-        
-        if symbols_info:
-            # Extract just the name using list comprehension
-            return [s.name for s in symbols_info]
+        if not self.connection.ensure():
+            return []
         
-        return []
+        self.symbol_catalog.ensure_fresh()
+        return list(self.symbol_catalog.index.names)
 
-    def get_candles(self, symbol: str, timeframe, num_candles: int = 100):
+    def refresh_symbol_catalog(self):
+        """Reloads the catalog if stale (MT5 thread). Returns the number of symbols."""
+        if not self.connection.ensure():
+            return 0
+
+        self.symbol_catalog.ensure_fresh()
+        return len(self.symbol_catalog.index.names)
+
+    def get_candles(self, symbol: str, timeframe, num_candles: int = 100, engine: str = "vectorized",
+                    patterns: str = DEFAULT_PATTERNS):
         """
         Fetches candles, applies VSA, and detects V-Shape Patterns.
         Filters:
         1. VSA Threshold: 1.5x Average Volume.
         2. V-Shape Cooldown: Must wait 3 candles between patterns.
         3. V-Shape Size: Candle must be larger than the average body size (no noise).
+
+        engine="vectorized" (default) runs the NumPy implementation, which scales to
+        100k bars. engine="loop" runs the original per-bar loop as a reference.
+        `patterns` selects the compiled detectors, e.g. "V_SHAPE(cooldown=5),ENGULFING".
         """
-        if not self.connected:
-            self.initialize()
+        if not self.connection.ensure():
+            return []
 
-        if not mt5.symbol_select(symbol, True):
+        if not self.symbol_catalog.ensure_selected(symbol):
             print(f"⚠️ Symbol {symbol} not found.")
             return []
         
-        rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, num_candles)
+        rates, sma = self.candle_cache.get_window(symbol, timeframe, num_candles)
         
         if rates is None or len(rates) == 0:
             return []
 
-        # 1. Calculate Average Volume (for VSA)
-        total_volume = sum(r['tick_volume'] for r in rates)
-        avg_volume = total_volume / len(rates)
-        flow_threshold = avg_volume * 1.5 
-
-
-        # 2. Calculate Average Body Size (for Volatility Filter)
-        # We need this to avoid marking tiny candles as patterns
-        total_body_size = sum(abs(r['open'] - r['close']) for r in rates)
-        avg_body_size = total_body_size / len(rates)
-        
-        data_list = []
-        
-        # Track the index of the last detected pattern to enforce the "3 candle rule"
-        last_pattern_index = -10 
-        
-        #sma varabiables
-        sma_period = 20
-        data_list = []
+        if engine == "loop":
+            return build_candles(rates, engine=engine)
+        return build_candles(rates, engine=engine, sma=sma, patterns=patterns)
 
-        for i in range(len(rates)):
-            rate = rates[i]
-            
-            close = float(rate['close'])
-            open_price = float(rate['open'])
-            high = float(rate['high'])
-            low = float(rate['low'])
-            volume = int(rate['tick_volume'])
-            
-            # --- Default Colors ---
-            color = '#22c55e' if close >= open_price else '#ef4444'
-            
-            # --- VSA Logic ---
-            if volume > flow_threshold:
-                if close >= open_price:
-                    color = '#00FF00' 
-                else:
-                    color = '#FF0040' 
+    def get_candle_columns(self, symbol: str, timeframe, num_candles: int = 100, patterns: str = DEFAULT_PATTERNS):
+        """
+        Same analysis as get_candles, returned as parallel NumPy columns
+        (see compute_candle_columns) for the columnar API format. None if no data.
+        """
+        if not self.connection.ensure():
+            return None
 
+        if not self.symbol_catalog.ensure_selected(symbol):
+            print(f"⚠️ Symbol {symbol} not found.")
+            return None
 
-            #--- SMA LOGIC ---
-           
+        rates, sma = self.candle_cache.get_window(symbol, timeframe, num_candles)
+        if rates is None or len(rates) == 0:
+            return None
 
-            sma_value = None
-            if i >= sma_period - 1:
-                # sum last 'sma_period' bid closed
-                subset = rates[i - (sma_period - 1) : i + 1]
-                sma_value = sum(r['close'] for r in subset) / sma_period
+        return compute_candle_columns(rates, sma=sma, patterns=patterns)
 
-            # --- V-SHAPE PATTERN LOGIC (Filtered) ---
-            pattern_name = None 
-            
-            # Rule 1: Must have a previous candle
-            # Rule 2: COOLDOWN - Ensure 3 candles passed since last pattern
-            if i > 0 and (i - last_pattern_index) >= 3:
-                
-                prev_rate = rates[i-1]
-                prev_open = float(prev_rate['open'])
-                prev_close = float(prev_rate['close'])
-                
-                # Check Direction: Red then Green
-                is_prev_bearish = prev_close < prev_open
-                is_curr_bullish = close > open_price
-                
-                if is_prev_bearish and is_curr_bullish:
-                    prev_body = prev_open - prev_close
-                    curr_body = close - open_price
-                    
-                    # Rule 3: VOLATILITY FILTER
-                    # The previous drop must be at least the size of an average candle.
-                    # This ignores tiny noise.
-                    if prev_body > avg_body_size:
-                        
-                        # Rule 4: Strong Recovery (>80%)
-                        if curr_body >= (prev_body * 0.8):
-                            pattern_name = "V_SHAPE"
-                            color = '#FF00FF' # Hot Pink
-                            
-                            # Update the tracker so we don't mark the next few candles
-                            last_pattern_index = i 
+    def get_historical_data(self, symbol: str, timeframe, num_candles: int = 100):
+        """
+        Returns the raw MT5 rates array (last `num_candles` bars) for the strategy layer.
+        Served from the candle cache, so repeated calls only fetch the newest bars.
+        """
+        if not self.connection.ensure():
+            return None
 
-            
+        if not self.symbol_catalog.ensure_selected(symbol):
+            print(f"⚠️ Symbol {symbol} not found.")
+            return None
 
-            data_list.append({
-                "time": int(rate['time']),
-                "open": open_price,
-                "high": high,
-                "low": low,
-                "close": close,
-                "tick_volume": volume,
-                "color": color,
-                "wickColor": color,
-                "borderColor": color,
-                "pattern": pattern_name,
-                "sma": sma_value 
-            })
-
-        return data_list
+        return self.candle_cache.get_rates(symbol, timeframe, num_candles)
         
     def get_symbol_price(self, symbol: str):
         """Gets the current Ask/Bid price for a symbol."""
-        if not self.connected:
-            self.initialize()
+        if not self.connection.ensure():
+            return None
 
-        if not mt5.symbol_select(symbol, True):
+        if not self.symbol_catalog.ensure_selected(symbol):
             print(f"⚠️ Symbol {symbol} not found or not visible.")
             return None
             
         tick = mt5.symbol_info_tick(symbol)
-        return tick
\ No newline at end of file
+        return tick
+
+    # --- Async facade (all terminal work runs on the MT5 worker thread) ---
+
+    async def initialize_async(self):
+        # Through the connection manager, so a failure also schedules the next attempt
+        return await mt5_client.run(self.connection.connect)
+
+    async def ensure_connected_async(self):
+        return await mt5_client.run(self.connection.ensure)
+
+    async def get_available_symbols_async(self):
+        return await mt5_client.run(self.get_available_symbols)
+
+    async def refresh_symbol_catalog_async(self):
+        return await mt5_client.run(self.refresh_symbol_catalog)
+
+    async def get_candles_async(self, symbol: str, timeframe, num_candles: int = 100, engine: str = "vectorized",
+                                patterns: str = DEFAULT_PATTERNS):
+        return await mt5_client.run(self.get_candles, symbol, timeframe, num_candles, engine, patterns)
+
+    async def get_candle_columns_async(self, symbol: str, timeframe, num_candles: int = 100,
+                                       patterns: str = DEFAULT_PATTERNS):
+        return await mt5_client.run(self.get_candle_columns, symbol, timeframe, num_candles, patterns)
+
+    async def get_historical_data_async(self, symbol: str, timeframe, num_candles: int = 100):
+        return await mt5_client.run(self.get_historical_data, symbol, timeframe, num_candles)
+
+    async def get_symbol_price_async(self, symbol: str):
+        return await mt5_client.run(self.get_symbol_price, symbol)
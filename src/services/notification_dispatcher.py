@@ -0,0 +1,230 @@
+import asyncio
+import random
+import time
+
+from src.config.settings import settings
+from src.services.metrics import TELEGRAM_MESSAGES, TELEGRAM_REQUEST_SECONDS
+
+# Telegram rejects longer texts
+MAX_MESSAGE_LENGTH = 4096
+
+
+class TokenBucket:
+    """`rate` sends per second on average, bursts of up to `capacity`."""
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Empties the bucket for `seconds` (server asked us to slow down)."""
+        self.tokens = -seconds * self.rate
+        self.updated = time.monotonic()
+
+
+def _retry_after_seconds(error) -> float:
+    # python-telegram-bot >= 22 may return a timedelta
+    value = error.retry_after
+    return value.total_seconds() if hasattr(value, "total_seconds") else float(value)
+
+
+def coalesce(texts):
+    """Joins a burst of alerts: repeated lines become 'text (xN)', chunks fit one message."""
+    lines = []
+    for text in texts:
+        if lines and lines[-1][0] == text:
+            lines[-1][1] += 1
+        else:
+            lines.append([text, 1])
+
+    chunks, current = [], ""
+    for text, count in lines:
+        line = text if count == 1 else f"{text} (x{count})"
+        candidate = f"{current}\n\n{line}" if current else line
+        if len(candidate) > MAX_MESSAGE_LENGTH and current:
+            chunks.append(current)
+            candidate = line
+        current = candidate[:MAX_MESSAGE_LENGTH]
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class NotificationDispatcher:
+    """
+    Background Telegram sender.
+
+    Producers call notify() / notify_photo() and never wait for Telegram:
+    1. Texts that arrive within `coalesce_seconds` are merged into one message.
+    2. Every API call takes a token from a bucket (stays under the chat rate limit).
+    3. RetryAfter (429) waits the time Telegram asks for; timeouts / network errors are
+       retried with exponential backoff; other errors (bad request, blocked) are dropped.
+    4. Photo producers (screenshot capture, chart rendering, encoding) run in a thread.
+
+    `bot` only needs async send_message / send_photo, so a local fake can be used.
+    """
+    def __init__(self, bot, chat_id, rate: float = None, burst: int = None,
+                 coalesce_seconds: float = None, max_retries: int = None, maxsize: int = None):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.bucket = TokenBucket(rate or settings.TELEGRAM_RATE_PER_SECOND, burst or settings.TELEGRAM_BURST)
+        self.coalesce_seconds = settings.TELEGRAM_COALESCE_SECONDS if coalesce_seconds is None else coalesce_seconds
+        self.max_retries = settings.TELEGRAM_MAX_RETRIES if max_retries is None else max_retries
+        self.maxsize = maxsize or settings.TELEGRAM_QUEUE_SIZE
+        self.queue = None
+        self._task = None
+        self.stats = {"queued": 0, "dropped": 0, "sent": 0, "coalesced": 0, "retries": 0, "failed": 0}
+
+    # --- Producers (non-blocking) ---
+
+    def notify(self, text: str) -> bool:
+        """Queues a text alert. Returns False if the queue is full (alert dropped)."""
+        return self._enqueue(("text", text, None))
+
+    def notify_photo(self, producer, caption: str = None) -> bool:
+        """
+        Queues a photo. `producer` is bytes, a blocking callable returning
+        bytes/BytesIO (called in a worker thread) or an async function (awaited).
+        A producer returning None skips the photo.
+        """
+        return self._enqueue(("photo", producer, caption))
+
+    def _enqueue(self, item) -> bool:
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    def _ensure_started(self):
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.maxsize)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def drain(self):
+        """Waits until everything queued so far was sent (or given up)."""
+        if self.queue is not None:
+            await self.queue.join()
+
+    # --- Consumer ---
+
+    async def _run(self):
+        pending = None
+        while True:
+            item = pending or await self.queue.get()
+            pending = None
+            kind, payload, caption = item
+            processed = 1
+
+            try:
+                if kind == "text":
+                    texts = [payload]
+                    # Collect the rest of the burst; a photo ends the batch
+                    deadline = time.monotonic() + self.coalesce_seconds
+                    while True:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        try:
+                            nxt = await asyncio.wait_for(self.queue.get(), remaining)
+                        except asyncio.TimeoutError:
+                            break
+                        if nxt[0] != "text":
+                            pending = nxt
+                            break
+                        texts.append(nxt[1])
+                        processed += 1
+
+                    self.stats["coalesced"] += len(texts) - 1
+                    for chunk in coalesce(texts):
+                        await self._send(self.bot.send_message, chat_id=self.chat_id, text=chunk)
+                else:
+                    await self._send_photo(payload, caption)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Notification dispatcher error: {e}")
+            finally:
+                for _ in range(processed):
+                    self.queue.task_done()
+
+    async def _send_photo(self, producer, caption):
+        if asyncio.iscoroutinefunction(producer):
+            photo = await producer()  # Already offloads its own blocking work
+        elif callable(producer):
+            photo = await asyncio.to_thread(producer)
+        else:
+            photo = producer
+        if photo is None:
+            return
+        await self._send(self.bot.send_photo, chat_id=self.chat_id, photo=photo, caption=caption)
+
+    async def _send(self, method, **kwargs):
+        """Rate-limited call with retries. Returns True if Telegram accepted it."""
+        from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut  # Loaded with the first alert
+
+        name = getattr(method, "__name__", "call")
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            backoff = 0.0
+            started = time.perf_counter()
+            try:
+                if hasattr(kwargs.get("photo"), "seek"):
+                    kwargs["photo"].seek(0)
+                await method(**kwargs)
+                self.stats["sent"] += 1
+                TELEGRAM_MESSAGES.inc(method=name, outcome="sent")
+                return True
+            except RetryAfter as e:
+                TELEGRAM_MESSAGES.inc(method=name, outcome="rate_limited")
+                wait = _retry_after_seconds(e)
+                self.bucket.pause(wait)
+                print(f"⏳ Telegram rate limit, retrying in {wait:.0f}s")
+            except BadRequest as e:
+                # A NetworkError subclass, but sending it again cannot succeed
+                self.stats["failed"] += 1
+                TELEGRAM_MESSAGES.inc(method=name, outcome="failed")
+                print(f"❌ Telegram rejected the notification: {e}")
+                return False
+            except (TimedOut, NetworkError) as e:
+                TELEGRAM_MESSAGES.inc(method=name, outcome="network_error")
+                backoff = min(2 ** attempt, 60) * (0.5 + random.random())
+                print(f"⚠️ Telegram {type(e).__name__}: {e}, retrying in {backoff:.1f}s")
+            except Exception as e:
+                self.stats["failed"] += 1
+                TELEGRAM_MESSAGES.inc(method=name, outcome="failed")
+                print(f"❌ Failed to send Telegram notification: {e}")
+                return False
+            finally:
+                TELEGRAM_REQUEST_SECONDS.observe(time.perf_counter() - started, method=name)
+
+            self.stats["retries"] += 1
+            if backoff:
+                await asyncio.sleep(backoff)
+
+        self.stats["failed"] += 1
+        print("❌ Telegram notification dropped after retries.")
+        return False
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+
+import MetaTrader5 as mt5
+from src.config.settings import settings
+from src.services.mt5_client import mt5_client
+
+
+def _position_entry(ticket, symbol, type_, volume, price, magic):
+    return {
+        "ticket": int(ticket),
+        "symbol": symbol,
+        "type": int(type_),
+        "volume": float(volume),
+        "price": float(price),
+        "magic": int(magic),
+    }
+
+
+class PositionBook:
+    """
+    In-memory view of the open positions and pending orders, keyed by (symbol, magic).
+
+    Writes happen on the MT5 thread: right after a successful order_send
+    (on_order_result) and when reconciling with positions_get/orders_get, so a
+    reconcile can never interleave with an order in flight. Reads never touch the
+    terminal (has_position is one dict lookup), so they are safe from the event loop.
+    """
+    def __init__(self, magic: int, reconcile_interval: float = None):
+        self.magic = magic
+        self.reconcile_interval = settings.POSITION_RECONCILE_INTERVAL if reconcile_interval is None else reconcile_interval
+        self.positions = {}  # (symbol, magic) -> {ticket: entry}
+        self.orders = {}     # (symbol, magic) -> {ticket: entry}
+        self.last_reconcile = 0.0
+        self.stats = {"reconciles": 0, "fills": 0, "drift": 0}
+        self._lock = threading.Lock()
+        self._reconcile_task = None
+
+    # --- Queries (no terminal access) ---
+
+    def has_position(self, symbol: str, magic: int = None) -> bool:
+        """True if `symbol` has an open position of `magic` (default: this bot)."""
+        key = (symbol, self.magic if magic is None else magic)
+        with self._lock:
+            return bool(self.positions.get(key))
+
+    def count(self, symbol: str = None, magic: int = None, pending: bool = False) -> int:
+        """Number of open positions (or pending orders) matching the filters."""
+        book = self.orders if pending else self.positions
+        with self._lock:
+            return sum(
+                len(tickets) for (s, m), tickets in book.items()
+                if (symbol is None or s == symbol) and (magic is None or m == magic)
+            )
+
+    def active_orders(self) -> int:
+        """Exposure of this bot: its positions + pending orders."""
+        return self.count(magic=self.magic) + self.count(magic=self.magic, pending=True)
+
+    def snapshot(self):
+        with self._lock:
+            return [entry for tickets in self.positions.values() for entry in tickets.values()]
+
+    # --- Updates (MT5 thread) ---
+
+    def on_order_result(self, request: dict, result):
+        """Applies a successful order_send without waiting for the next reconcile."""
+        symbol = request["symbol"]
+        magic = request.get("magic", self.magic)
+        key = (symbol, magic)
+
+        with self._lock:
+            if request.get("action") == mt5.TRADE_ACTION_PENDING:
+                entry = _position_entry(result.order, symbol, request["type"], result.volume, request["price"], magic)
+                self.orders.setdefault(key, {})[entry["ticket"]] = entry
+            elif request.get("position"):
+                # Closing (or reducing) an existing position
+                tickets = self.positions.get(key, {})
+                tickets.pop(int(request["position"]), None)
+                if not tickets:
+                    self.positions.pop(key, None)
+            else:
+                # Hedging accounts: the position ticket is the order ticket (reconcile fixes netting)
+                entry = _position_entry(result.order, symbol, request["type"], result.volume, result.price, magic)
+                self.positions.setdefault(key, {})[entry["ticket"]] = entry
+            self.stats["fills"] += 1
+
+    def reconcile(self):
+        """Rebuilds the book from the terminal. Returns False if MT5 did not answer."""
+        positions = mt5.positions_get()
+        orders = mt5.orders_get()
+        if positions is None or orders is None:
+            return False
+
+        fresh_positions = {}
+        for p in positions:
+            entry = _position_entry(p.ticket, p.symbol, p.type, p.volume, p.price_open, p.magic)
+            fresh_positions.setdefault((p.symbol, p.magic), {})[entry["ticket"]] = entry
+
+        fresh_orders = {}
+        for o in orders:
+            entry = _position_entry(o.ticket, o.symbol, o.type, o.volume_current, o.price_open, o.magic)
+            fresh_orders.setdefault((o.symbol, o.magic), {})[entry["ticket"]] = entry
+
+        with self._lock:
+            if self._tickets(self.positions) != self._tickets(fresh_positions):
+                # Closed by SL/TP, manually or by another program since the last look
+                self.stats["drift"] += 1
+            self.positions = fresh_positions
+            self.orders = fresh_orders
+            self.last_reconcile = time.monotonic()
+            self.stats["reconciles"] += 1
+        return True
+
+    @staticmethod
+    def _tickets(book):
+        return {ticket for tickets in book.values() for ticket in tickets}
+
+    # --- Event loop ---
+
+    async def reconcile_async(self):
+        return await mt5_client.run(self.reconcile)
+
+    def start_background_reconcile(self):
+        """Reconciles every `reconcile_interval` seconds (one task per book)."""
+        if self._reconcile_task is None or self._reconcile_task.done():
+            self._reconcile_task = asyncio.create_task(self._reconcile_forever())
+
+    def stop_background_reconcile(self):
+        if self._reconcile_task is not None:
+            self._reconcile_task.cancel()
+            self._reconcile_task = None
+
+    async def _reconcile_forever(self):
+        while True:
+            done = False
+            try:
+                done = await self.reconcile_async()
+            except Exception as e:
+                print(f"⚠️ Position reconcile failed: {e}")
+            # Terminal not connected yet (e.g. API startup): try again soon
+            await asyncio.sleep(self.reconcile_interval if done else min(self.reconcile_interval, 1.0))
@@ -0,0 +1,142 @@
+import asyncio
+import bisect
+import time
+
+import MetaTrader5 as mt5
+from src.config.settings import settings
+from src.services.mt5_client import mt5_client
+
+# SymbolInfo fields kept in the catalog
+META_FIELDS = (
+    "description",
+    "path",
+    "digits",
+    "point",
+    "trade_contract_size",
+    "volume_min",
+    "volume_max",
+    "volume_step",
+    "trade_mode",
+    "visible",
+)
+
+
+class SymbolIndex:
+    """Immutable snapshot of the broker symbols: sorted names + metadata."""
+    def __init__(self, infos=()):
+        self.meta = {}
+        for info in infos:
+            self.meta[info.name] = {"name": info.name, **{f: getattr(info, f, None) for f in META_FIELDS}}
+
+        self.names = sorted(self.meta)
+        # Lower-case keys sorted for case-insensitive prefix search with bisect
+        pairs = sorted((name.lower(), name) for name in self.names)
+        self.lower_keys = [p[0] for p in pairs]
+        self.lower_names = [p[1] for p in pairs]
+
+        # Lower-case "name description" for substring search
+        self.search_text = {
+            name: f"{name} {meta.get('description') or ''}".lower()
+            for name, meta in self.meta.items()
+        }
+
+
+class SymbolCatalog:
+    """
+    Cached view of mt5.symbols_get() with prefix/substring search and metadata.
+
+    The terminal is only asked again when the snapshot is older than the TTL.
+    Searches run on an immutable SymbolIndex, so they are safe to run on the event
+    loop while the MT5 thread builds a new one. It also remembers which symbols were
+    already added to Market Watch, so symbol_select is not repeated on every call.
+    """
+    def __init__(self, ttl: float = None):
+        self.ttl = settings.SYMBOL_CATALOG_TTL if ttl is None else ttl
+        self.index = SymbolIndex()
+        self.loaded_at = 0.0
+        self.selected = set()
+        self._refresh_task = None
+
+    # --- Refresh (MT5 thread) ---
+
+    @property
+    def is_stale(self):
+        return not self.index.names or (time.monotonic() - self.loaded_at) > self.ttl
+
+    def refresh(self):
+        """Reloads the snapshot from the terminal. Returns the number of symbols."""
+        infos = mt5.symbols_get()
+        if infos is None:
+            return len(self.index.names)
+
+        self.index = SymbolIndex(infos)
+        self.loaded_at = time.monotonic()
+        # Symbols that are visible in Market Watch are already selected
+        self.selected = {name for name, meta in self.index.meta.items() if meta.get("visible")}
+        return len(self.index.names)
+
+    def ensure_fresh(self):
+        if self.is_stale:
+            self.refresh()
+
+    def start_background_refresh(self):
+        """Keeps the snapshot fresh from the event loop (one task per catalog)."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_forever())
+
+    async def _refresh_forever(self):
+        while True:
+            await asyncio.sleep(self.ttl)
+            try:
+                await mt5_client.run(self.refresh)
+            except Exception as e:
+                print(f"⚠️ Symbol catalog refresh failed: {e}")
+
+    def ensure_selected(self, symbol: str) -> bool:
+        """mt5.symbol_select only the first time a symbol is used (after a (re)connect)."""
+        if symbol in self.selected:
+            return True
+        if not mt5.symbol_select(symbol, True):
+            return False
+        self.selected.add(symbol)
+        return True
+
+    def reset_selection(self):
+        """Forget the selected symbols (the terminal was restarted / reconnected)."""
+        self.selected = set()
+
+    # --- Queries (no terminal access) ---
+
+    def info(self, symbol: str):
+        return self.index.meta.get(symbol)
+
+    def search(self, query: str = None, prefix: str = None, path: str = None,
+               trade_mode: int = None, limit: int = None, offset: int = 0):
+        """
+        Returns (total, names) of the symbols matching all given filters:
+        - prefix: case-insensitive prefix (binary search on the sorted index)
+        - query: case-insensitive substring of the name or description
+        - path: prefix of the broker path, e.g. "Forex"
+        - trade_mode: SymbolInfo.trade_mode value
+        """
+        index = self.index
+
+        if prefix:
+            key = prefix.lower()
+            lo = bisect.bisect_left(index.lower_keys, key)
+            hi = bisect.bisect_left(index.lower_keys, key + "\uffff")
+            names = index.lower_names[lo:hi]
+        else:
+            names = index.names
+
+        if query:
+            q = query.lower()
+            names = [n for n in names if q in index.search_text[n]]
+        if path:
+            names = [n for n in names if (index.meta[n].get("path") or "").startswith(path)]
+        if trade_mode is not None:
+            names = [n for n in names if index.meta[n].get("trade_mode") == trade_mode]
+
+        total = len(names)
+        end = None if limit is None else offset + limit
+        return total, list(names[offset:end])
@@ -1,22 +1,65 @@
-import pyautogui
+import asyncio
+import functools
 import io
-from telegram import Bot
 from src.config.settings import settings
+from src.services.notification_dispatcher import NotificationDispatcher
 
 class TelegramService:
-    def __init__(self):
+    def __init__(self, bot=None, chart_renderer=None):
         self.token = settings.TELEGRAM_TOKEN
         self.chat_id = settings.TELEGRAM_CHAT_ID
-        self.bot = None
+        self._bot = bot
+        # Headless chart images (ChartRenderer); screenshots need a GUI session
+        self.chart_renderer = chart_renderer
+        self._dispatcher = None
 
-        if self.token:
-            self.bot = Bot(token=self.token)
+    @property
+    def bot(self):
+        """telegram.Bot, created (and python-telegram-bot imported) on first use."""
+        if self._bot is None and self.token:
+            from telegram import Bot
+
+            self._bot = Bot(token=self.token)
+        return self._bot
+
+    @property
+    def dispatcher(self):
+        """Background sender (coalescing, rate limit, retries) used by notify*()."""
+        if self._dispatcher is None and self.bot is not None:
+            self._dispatcher = NotificationDispatcher(self.bot, self.chat_id)
+        return self._dispatcher
+
+    @property
+    def configured(self) -> bool:
+        return bool((self._bot or self.token) and self.chat_id)
+
+    def notify(self, message: str) -> bool:
+        """
+        Queues a text alert and returns immediately (never waits for Telegram).
+        Bursts are merged into one message by the dispatcher.
+        """
+        if not self.configured:
+            return False
+        return self.dispatcher.notify(message)
+
+    def notify_screenshot(self, caption: str = "Chart Screenshot") -> bool:
+        """Queues a screenshot: capture + PNG encoding run in a worker thread."""
+        if not self.configured:
+            return False
+        return self.dispatcher.notify_photo(self.capture_screenshot, caption)
+
+    def notify_chart(self, symbol: str, timeframe: str, caption: str = None, num_candles: int = 100) -> bool:
+        """Queues a rendered chart of the latest bars (drawn off the event loop)."""
+        if not self.configured or self.chart_renderer is None:
+            return False
+        producer = functools.partial(self.chart_renderer.render, symbol, timeframe, num_candles)
+        return self.dispatcher.notify_photo(producer, caption or f"{symbol} {timeframe}")
 
     async def send_message(self, message: str):
         """
         Sends a simple text message to the configured chat asynchronously.
         """
-        if not self.bot or not self.chat_id:
+        if not self.configured:
             print("⚠️ Telegram credentials not configured.")
             return
 
@@ -26,28 +69,63 @@ class TelegramService:
         except Exception as e:
             print(f"❌ Failed to send Telegram message: {e}")
 
+    @staticmethod
+    def capture_screenshot():
+        """
+        Captures the entire screen into an in-memory PNG (BytesIO).
+        Blocking: call it from a worker thread.
+        """
+        import pyautogui  # Needs a GUI session, only loaded when a screenshot is taken
+
+        # 1. Take Screenshot
+        screenshot = pyautogui.screenshot()
+
+        # 2. Save to in-memory bytes buffer (avoids saving files to disk)
+        bio = io.BytesIO()
+        bio.name = 'screenshot.png'
+        screenshot.save(bio, 'PNG')
+        bio.seek(0) # Reset pointer to start of file
+        return bio
+
     async def send_screenshot(self, caption: str = "Chart Screenshot"):
         """
         Captures the entire screen and sends it as a photo to Telegram asynchronously.
-        Uses in-memory buffer (BytesIO) to avoid saving files to disk.
+        Capture and encoding run in a worker thread so the event loop is not blocked.
         """
-        if not self.bot or not self.chat_id:
+        if not self.configured:
             print("⚠️ Telegram credentials not configured.")
             return
 
         try:
-            # 1. Take Screenshot (Synchronous operation)
-            screenshot = pyautogui.screenshot()
-            
-            # 2. Save to in-memory bytes buffer (fast)
-            bio = io.BytesIO()
-            bio.name = 'screenshot.png'
-            screenshot.save(bio, 'PNG')
-            bio.seek(0) # Reset pointer to start of file
+            bio = await asyncio.to_thread(self.capture_screenshot)
 
             # 3. Send Photo Asynchronously
             await self.bot.send_photo(chat_id=self.chat_id, photo=bio, caption=caption)
             print("✅ Telegram screenshot sent successfully.")
 
         except Exception as e:
-            print(f"❌ Failed to send screenshot: {e}")
\ No newline at end of file
+            print(f"❌ Failed to send screenshot: {e}")
+
+    async def send_chart(self, symbol: str, timeframe: str, caption: str = None, num_candles: int = 100):
+        """
+        Renders the chart of the latest bars and sends it right away.
+        Much smaller and faster than a screenshot, and works on headless servers.
+        """
+        if not self.configured or self.chart_renderer is None:
+            print("⚠️ Telegram credentials or chart renderer not configured.")
+            return
+
+        try:
+            png = await self.chart_renderer.render(symbol, timeframe, num_candles)
+            if png is None:
+                print(f"⚠️ No data to render the {symbol} chart.")
+                return
+            await self.bot.send_photo(chat_id=self.chat_id, photo=png, caption=caption or f"{symbol} {timeframe}")
+            print("✅ Telegram chart sent successfully.")
+
+        except Exception as e:
+            print(f"❌ Failed to send chart: {e}")
+
+    def stop(self):
+        if self._dispatcher is not None:
+            self._dispatcher.stop()
@@ -1,72 +1,319 @@
+import asyncio
+import time
+from collections import deque
+
 import MetaTrader5 as mt5
 from src.config.settings import settings
+from src.services.metrics import ORDER_FILL_SECONDS
+from src.services.mt5_client import mt5_client
+from src.services.position_book import PositionBook
+
+# Retcodes worth one more try with a fresh price
+RETRY_RETCODES = (
+    mt5.TRADE_RETCODE_REQUOTE,        # 10004
+    mt5.TRADE_RETCODE_PRICE_CHANGED,  # 10020
+    mt5.TRADE_RETCODE_PRICE_OFF,      # 10021
+)
+
+FILLING_MODES = {
+    "FOK": mt5.ORDER_FILLING_FOK,
+    "IOC": mt5.ORDER_FILLING_IOC,
+    "RETURN": mt5.ORDER_FILLING_RETURN,
+}
+
+# SymbolInfo.filling_mode flags (SYMBOL_FILLING_FOK / SYMBOL_FILLING_IOC)
+SYMBOL_FILLING_FOK = 1
+SYMBOL_FILLING_IOC = 2
+
+
+class SymbolSpecs:
+    """Trading specs of a symbol, read once from symbol_info()."""
+    def __init__(self, info):
+        self.symbol = info.name
+        self.digits = info.digits
+        self.point = info.point
+        self.volume_min = info.volume_min
+        self.volume_max = info.volume_max
+        self.volume_step = info.volume_step
+        self.stops_level = info.trade_stops_level
+        self.filling_flags = info.filling_mode
+
+    def filling(self, preferred: str = "AUTO"):
+        """ORDER_FILLING_* to use: the configured one, or the best the symbol allows."""
+        preferred = preferred.upper()
+        if preferred in FILLING_MODES:
+            return FILLING_MODES[preferred]
+        if self.filling_flags & SYMBOL_FILLING_IOC:
+            return mt5.ORDER_FILLING_IOC
+        if self.filling_flags & SYMBOL_FILLING_FOK:
+            return mt5.ORDER_FILLING_FOK
+        return mt5.ORDER_FILLING_RETURN
+
+    def normalize_volume(self, volume: float) -> float:
+        """Rounds to the volume step and clamps to [volume_min, volume_max]."""
+        if self.volume_step > 0:
+            volume = round(volume / self.volume_step) * self.volume_step
+        volume = min(max(volume, self.volume_min), self.volume_max)
+        return round(volume, 8)
+
+    def stops_valid(self, side: str, price: float, sl: float, tp: float) -> bool:
+        """SL/TP at least stops_level points away from the entry price (0 = not set)."""
+        min_distance = self.stops_level * self.point
+        direction = 1 if side == "BUY" else -1
+        if sl and direction * (price - sl) < min_distance:
+            return False
+        if tp and direction * (tp - price) < min_distance:
+            return False
+        return True
+
+
+class OrderPipeline:
+    """
+    Async order submission queue.
+
+    The trading loop enqueues an order and moves on; one consumer sends the orders
+    on the MT5 thread in FIFO order. Symbols with an order in the queue count as
+    exposed, so a signal repeated before the fill does not open a second position.
+    """
+    def __init__(self, trade_service, maxsize: int = None):
+        self.trade_service = trade_service
+        self.maxsize = maxsize or settings.ORDER_QUEUE_SIZE
+        self.queue = None
+        self.in_flight = {}
+        self._task = None
+
+    def _ensure_started(self):
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.maxsize)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._consume())
+
+    def submit(self, side: str, symbol: str, volume: float, sl: float = 0.0, tp: float = 0.0):
+        """Enqueues a market order. Returns a Future with the order result (None if the queue is full)."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((side, symbol, volume, sl, tp, time.perf_counter(), future))
+        except asyncio.QueueFull:
+            print(f"❌ Order queue full, {side} {symbol} dropped.")
+            return None
+        self.in_flight[symbol] = self.in_flight.get(symbol, 0) + 1
+        return future
+
+    def is_in_flight(self, symbol: str) -> bool:
+        return self.in_flight.get(symbol, 0) > 0
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            side, symbol, volume, sl, tp, signal_time, future = await self.queue.get()
+            result = None
+            try:
+                # The symbol stays in flight until the MT5 job itself ends: an order_send
+                # still running after the timeout may fill, a second order must wait
+                job = mt5_client.submit(
+                    self.trade_service.send_market_order, symbol, side, volume, sl, tp, signal_time
+                )
+            except Exception as e:
+                print(f"❌ {side} {symbol} Order Failed: {type(e).__name__} {e}")
+                self._release(symbol)
+            else:
+                job.add_done_callback(lambda _, s=symbol: self._release_threadsafe(loop, s))
+                try:
+                    result = await asyncio.wait_for(asyncio.wrap_future(job), mt5_client.default_timeout)
+                except asyncio.TimeoutError:
+                    print(f"⏳ {side} {symbol} order still running after {mt5_client.default_timeout:.1f}s, symbol kept in flight")
+                except Exception as e:
+                    print(f"❌ {side} {symbol} Order Failed: {type(e).__name__} {e}")
+            finally:
+                self.queue.task_done()
+            if not future.done():
+                future.set_result(result)
+
+    def _release(self, symbol: str):
+        self.in_flight[symbol] -= 1
+
+    def _release_threadsafe(self, loop, symbol: str):
+        # Done-callback of the MT5 job: runs on the MT5 thread (or inline if already done)
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(self._release, symbol)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
 
 class TradeService:
-    def __init__(self):
-        self.magic_number = 123456 # Unique ID for this bot's orders
+    def __init__(self, magic_number: int = None):
+        self.magic_number = magic_number or 123456 # Unique ID for this bot's orders
+        # Open positions / pending orders, updated on every fill (no positions_get per signal)
+        self.position_book = PositionBook(self.magic_number)
+        self.pipeline = OrderPipeline(self)
+        self.specs = {}  # symbol -> SymbolSpecs
+
+        # Per-order execution reports (signal-to-fill latency, slippage)
+        self.executions = deque(maxlen=settings.EXECUTION_HISTORY)
+        self.stats = {"sent": 0, "filled": 0, "rejected": 0, "retries": 0}
+
+    def get_specs(self, symbol: str):
+        """Cached SymbolSpecs (None if the symbol is unknown)."""
+        specs = self.specs.get(symbol)
+        if specs is None:
+            info = mt5.symbol_info(symbol)
+            if info is None:
+                return None
+            specs = SymbolSpecs(info)
+            self.specs[symbol] = specs
+        return specs
+
+    def reset_specs(self):
+        """Forget the cached specs (e.g. after reconnecting to another server)."""
+        self.specs = {}
+
+    def has_exposure(self, symbol: str) -> bool:
+        """Open position in the book, or an order for the symbol still in the queue."""
+        return self.position_book.has_position(symbol) or self.pipeline.is_in_flight(symbol)
 
     def open_buy(self, symbol: str, volume: float, sl: float = 0.0, tp: float = 0.0):
         """
         Opens a Market BUY Order.
         """
-        # 1. Prepare the request structure
-        tick = mt5.symbol_info_tick(symbol)
-        if tick is None:
-            print("❌ Error: Could not get price for Buy order.")
-            return None
-
-        request = {
-            "action": mt5.TRADE_ACTION_DEAL,
-            "symbol": symbol,
-            "volume": volume,
-            "type": mt5.ORDER_TYPE_BUY,
-            "price": tick.ask,
-            "sl": sl,
-            "tp": tp,
-            "deviation": 20, # Max slippage allowed (points)
-            "magic": self.magic_number,
-            "comment": "Python Bot Buy",
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
-        }
-
-        # 2. Send the order
-        result = mt5.order_send(request)
-        return self._process_result(result, "BUY")
+        return self.send_market_order(symbol, "BUY", volume, sl, tp)
 
     def open_sell(self, symbol: str, volume: float, sl: float = 0.0, tp: float = 0.0):
         """
         Opens a Market SELL Order.
         """
-        tick = mt5.symbol_info_tick(symbol)
-        if tick is None:
-            print("❌ Error: Could not get price for Sell order.")
+        return self.send_market_order(symbol, "SELL", volume, sl, tp)
+
+    def send_market_order(self, symbol: str, side: str, volume: float, sl: float = 0.0,
+                          tp: float = 0.0, signal_time: float = None):
+        """
+        Runs on the MT5 thread.
+        1. Cached specs -> filling mode, volume step, stops level.
+        2. order_check pre-validation (first attempt).
+        3. order_send, retried with a fresh price on requote / price changed.
+        4. Position book + execution report.
+        """
+        signal_time = signal_time or time.perf_counter()
+        specs = self.get_specs(symbol)
+        if specs is None:
+            print(f"❌ Error: Unknown symbol {symbol} for {side} order.")
             return None
 
-        request = {
-            "action": mt5.TRADE_ACTION_DEAL,
-            "symbol": symbol,
-            "volume": volume,
-            "type": mt5.ORDER_TYPE_SELL,
-            "price": tick.bid,
-            "sl": sl,
-            "tp": tp,
-            "deviation": 20,
-            "magic": self.magic_number,
-            "comment": "Python Bot Sell",
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
-        }
+        order_type = mt5.ORDER_TYPE_BUY if side == "BUY" else mt5.ORDER_TYPE_SELL
+        volume = specs.normalize_volume(volume)
+        request = result = None
+
+        for attempt in range(1 + settings.ORDER_MAX_RETRIES):
+            # 1. Prepare the request structure (fresh price on every attempt)
+            tick = mt5.symbol_info_tick(symbol)
+            if tick is None:
+                print(f"❌ Error: Could not get price for {side} order.")
+                return None
+
+            price = tick.ask if side == "BUY" else tick.bid
+            if not specs.stops_valid(side, price, sl, tp):
+                print(f"❌ {side} Order Failed: SL/TP closer than {specs.stops_level} points.")
+                return None
+
+            request = {
+                "action": mt5.TRADE_ACTION_DEAL,
+                "symbol": symbol,
+                "volume": volume,
+                "type": order_type,
+                "price": price,
+                "sl": sl,
+                "tp": tp,
+                "deviation": settings.ORDER_DEVIATION, # Max slippage allowed (points)
+                "magic": self.magic_number,
+                "comment": f"Python Bot {side.capitalize()}",
+                "type_time": mt5.ORDER_TIME_GTC,
+                "type_filling": specs.filling(settings.ORDER_FILLING),
+            }
 
-        result = mt5.order_send(request)
-        return self._process_result(result, "SELL")
+            # 2. Validate without sending (margin, volume, stops, filling)
+            if attempt == 0 and settings.ORDER_CHECK:
+                check = mt5.order_check(request)
+                if check is None or check.retcode not in (0, mt5.TRADE_RETCODE_DONE):
+                    self.stats["rejected"] += 1
+                    reason = mt5.last_error() if check is None else f"{check.retcode} {check.comment}"
+                    print(f"❌ {side} Order rejected by order_check: {reason}")
+                    return None
+
+            # 3. Send the order
+            self.stats["sent"] += 1
+            result = mt5.order_send(request)
+            if result is None or result.retcode not in RETRY_RETCODES or attempt == settings.ORDER_MAX_RETRIES:
+                break
+            self.stats["retries"] += 1
+            print(f"🔁 {side} {symbol}: retcode {result.retcode}, retrying with a fresh price")
+
+        result = self._process_result(result, side, request)
+        if result is not None:
+            self._record_execution(specs, side, request, result, signal_time)
+        return result
+
+    def submit_order(self, side: str, symbol: str, volume: float, sl: float = 0.0, tp: float = 0.0):
+        """Non-blocking: queues the order and returns a Future with its result."""
+        return self.pipeline.submit(side, symbol, volume, sl, tp)
+
+    async def open_buy_async(self, symbol: str, volume: float, sl: float = 0.0, tp: float = 0.0):
+        """Awaitable open_buy: goes through the order queue and the MT5 worker thread."""
+        future = self.submit_order("BUY", symbol, volume, sl, tp)
+        return await future if future is not None else None
+
+    async def open_sell_async(self, symbol: str, volume: float, sl: float = 0.0, tp: float = 0.0):
+        """Awaitable open_sell: goes through the order queue and the MT5 worker thread."""
+        future = self.submit_order("SELL", symbol, volume, sl, tp)
+        return await future if future is not None else None
+
+    def _process_result(self, result, order_type, request):
+        """Internal helper to print result status and update the position book."""
+        if result is None:
+            self.stats["rejected"] += 1
+            print(f"❌ {order_type} Order Failed. order_send returned None: {mt5.last_error()}")
+            return None
 
-    def _process_result(self, result, order_type):
-        """Internal helper to print result status."""
         if result.retcode != mt5.TRADE_RETCODE_DONE:
+            self.stats["rejected"] += 1
             print(f"❌ {order_type} Order Failed. Error Code: {result.retcode}")
             print(f"   Description: {result.comment}")
             return None
-        
+
         print(f"✅ {order_type} Executed Successfully! Ticket: {result.order}")
-        return result
\ No newline at end of file
+        self.stats["filled"] += 1
+        self.position_book.on_order_result(request, result)
+        return result
+
+    def _record_execution(self, specs: SymbolSpecs, side: str, request: dict, result, signal_time: float):
+        """Signal-to-fill latency and slippage in points (positive = worse than requested)."""
+        requested = request["price"]
+        filled = result.price or requested
+        direction = 1 if side == "BUY" else -1
+        latency = time.perf_counter() - signal_time
+        ORDER_FILL_SECONDS.observe(latency, side=side)
+        self.executions.append({
+            "symbol": request["symbol"],
+            "side": side,
+            "ticket": result.order,
+            "requested_price": requested,
+            "fill_price": filled,
+            "slippage_points": round(direction * (filled - requested) / specs.point, 1),
+            "latency_ms": latency * 1000,
+        })
+
+    def execution_summary(self):
+        """Aggregates of the recent executions."""
+        latencies = sorted(e["latency_ms"] for e in self.executions)
+        slippage = [e["slippage_points"] for e in self.executions]
+        if not latencies:
+            return {"orders": 0, **self.stats}
+        return {
+            "orders": len(latencies),
+            "latency_ms_avg": sum(latencies) / len(latencies),
+            "latency_ms_p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            "slippage_points_avg": sum(slippage) / len(slippage),
+            **self.stats,
+        }
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+from src.config.settings import settings, WatchlistEntry
+from src.utils import get_mt5_timeframe
+
+
+class StartupWarmup:
+    """
+    Startup work done in the background, so the API answers as soon as it is up:
+    1. Connects to MT5 (retried with backoff until the terminal answers).
+    2. Loads the symbol catalog.
+    3. Prefetches the bars of every watchlist instrument into the candle cache.
+    4. Compiles the pattern kernels (in a thread, in parallel with 1-3).
+    status() feeds /api/ready: ready once connected and every step finished
+    (a symbol missing on the broker is reported, it does not block readiness).
+    With STARTUP_WARMUP=false the steps are "skipped" and readiness follows the
+    MT5 connection (made by the connection manager).
+    """
+    STEPS = ("mt5", "symbols", "history", "patterns")
+
+    def __init__(self, mt5_service, entries=None):
+        self.mt5_service = mt5_service
+        self.entries = entries or settings.WATCHLIST or [
+            WatchlistEntry(symbol=settings.SYMBOL, timeframe=settings.TIMEFRAME)
+        ]
+        self.steps = {step: "pending" for step in self.STEPS}
+        self.started_at = None
+        self.ready_after = None
+        self._task = None
+
+    @property
+    def ready(self) -> bool:
+        if self.steps["mt5"] == "skipped":
+            return self.mt5_service.connection.ready
+        return self.steps["mt5"] == "done" and "pending" not in self.steps.values()
+
+    def skip(self):
+        """Warmup disabled: nothing is prefetched, the API is ready once MT5 is connected."""
+        self.steps = {step: "skipped" for step in self.STEPS}
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self.started_at = time.perf_counter()
+            self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def run(self):
+        patterns = asyncio.create_task(self._compile_patterns())
+
+        # 1. Terminal connection (the terminal may still be starting): the connection
+        #    manager spaces the attempts (jittered exponential backoff)
+        while not await self._connect():
+            await asyncio.sleep(self.mt5_service.connection.retry_in())
+
+        # 2. Symbol catalog
+        try:
+            await self.mt5_service.refresh_symbol_catalog_async()
+            self.steps["symbols"] = "done"
+        except Exception as e:
+            self.steps["symbols"] = f"failed: {e}"
+
+        # 3. History of the watchlist (a failing symbol does not block the others)
+        failed = []
+        for entry in self.entries:
+            try:
+                rates = await self.mt5_service.get_historical_data_async(
+                    entry.symbol, get_mt5_timeframe(entry.timeframe), max(entry.num_candles, 100)
+                )
+                if rates is None:
+                    failed.append(entry.symbol)
+            except Exception as e:
+                print(f"⚠️ Warmup of {entry.symbol} failed: {e}")
+                failed.append(entry.symbol)
+        self.steps["history"] = "done" if not failed else f"failed: {', '.join(failed)}"
+
+        await patterns
+        if self.ready:
+            self.ready_after = time.perf_counter() - self.started_at
+            print(f"✅ Warmup finished in {self.ready_after:.2f}s")
+
+    async def _connect(self) -> bool:
+        try:
+            connected = await self.mt5_service.ensure_connected_async()
+        except Exception as e:
+            connected = False
+            self.steps["mt5"] = f"failed: {e}"
+        else:
+            self.steps["mt5"] = "done" if connected else "failed: terminal not connected"
+        return connected
+
+    async def _compile_patterns(self):
+        from src.strategy.patterns import warmup
+
+        try:
+            await asyncio.to_thread(warmup)
+            self.steps["patterns"] = "done"
+        except Exception as e:
+            self.steps["patterns"] = f"failed: {e}"
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "steps": dict(self.steps),
+            "uptime": time.perf_counter() - self.started_at if self.started_at else 0.0,
+            "readyAfter": self.ready_after,
+        }
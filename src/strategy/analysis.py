@@ -1,9 +1,16 @@
 import pandas as pd
 import pandas_ta as ta
 
+from src.strategy.indicators import IndicatorEngine
+
 class MarketAnalyzer:
-    def __init__(self):
-        pass
+    def __init__(self, rsi_length: int = 14, rsi_oversold: float = 30, rsi_overbought: float = 70):
+        self.rsi_length = rsi_length
+        self.rsi_oversold = rsi_oversold
+        self.rsi_overbought = rsi_overbought
+
+        # Streaming indicator state per instrument key, e.g. (symbol, timeframe)
+        self.engines = {}
 
     def prepare_data(self, rates_frame):
         """
@@ -18,8 +25,8 @@ class MarketAnalyzer:
         
         # --- PANDAS_TA CALCULATIONS ---
         
-        # 1. RSI (Relative Strength Index) - 14 periods
-        df['RSI'] = df.ta.rsi(length=14)
+        # 1. RSI (Relative Strength Index) - 14 periods by default
+        df['RSI'] = df.ta.rsi(length=self.rsi_length)
 
         # 2. EMAs (Exponential Moving Averages)
         df['EMA_20'] = df.ta.ema(length=20)
@@ -38,34 +45,69 @@ class MarketAnalyzer:
 
         return df
 
+    def update_indicators(self, key, rates):
+        """
+        Incremental alternative to prepare_data(): feeds only the new/updated bars
+        into the instrument's IndicatorEngine (O(1) per bar) and returns the latest
+        values (same names as the DataFrame columns), or None while warming up.
+        """
+        engine = self.engines.get(key)
+        if engine is None:
+            engine = IndicatorEngine(rsi_length=self.rsi_length)
+            self.engines[key] = engine
+
+        engine.feed(rates)
+        return engine.latest() if engine.ready else None
+
+    @staticmethod
+    def _last_values(data):
+        """Last row of a prepared DataFrame, or the dict returned by update_indicators()."""
+        if data is None:
+            return None
+        if isinstance(data, dict):
+            return data
+        if data.empty:
+            return None
+        return data.iloc[-1]
+
     def check_buy_signal(self, df):
         """
         Simple Logic: If RSI < 30 (Oversold) -> Buy Signal
+        (threshold configurable with rsi_oversold)
         """
-        if df is None or df.empty:
-            return False
-
         # Get the last closed candle (most recent completed data)
-        last_candle = df.iloc[-1]
+        last_candle = self._last_values(df)
+        if last_candle is None:
+            return False
         current_rsi = last_candle['RSI']
         
         # Debug print (optional)
         # print(f"📊 Technical Analysis -> Current RSI: {current_rsi:.2f}")
 
-        if current_rsi < 30:
+        if current_rsi < self.rsi_oversold:
             return True
         return False
 
     def check_sell_signal(self, df):
         """
         Simple Logic: If RSI > 70 (Overbought) -> Sell Signal
+        (threshold configurable with rsi_overbought)
         """
-        if df is None or df.empty:
+        last_candle = self._last_values(df)
+        if last_candle is None:
             return False
-
-        last_candle = df.iloc[-1]
         current_rsi = last_candle['RSI']
 
-        if current_rsi > 70:
+        if current_rsi > self.rsi_overbought:
             return True
-        return False
\ No newline at end of file
+        return False
+
+
+def analyze_rates(rates, params: dict = None):
+    """
+    Runs prepare_data + both signal checks and returns (buy_signal, sell_signal).
+    Module-level so it can be sent to a process pool (rates and params pickle cheaply).
+    """
+    analyzer = MarketAnalyzer(**(params or {}))
+    df = analyzer.prepare_data(rates)
+    return bool(analyzer.check_buy_signal(df)), bool(analyzer.check_sell_signal(df))
@@ -0,0 +1,322 @@
+import numpy as np
+
+from src.strategy.patterns import (
+    DEFAULT_PATTERNS,
+    PATTERNS,
+    V_SHAPE_COOLDOWN,
+    V_SHAPE_RECOVERY,
+    VSA_VOLUME_MULTIPLIER,
+    detect_patterns,
+    parse_patterns,
+)
+
+# Layout of the structured array returned by mt5.copy_rates_from_pos
+RATES_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('tick_volume', '<u8'),
+    ('spread', '<i4'),
+    ('real_volume', '<u8'),
+])
+
+# --- Strategy Constants ---
+# VSA_VOLUME_MULTIPLIER / V_SHAPE_RECOVERY / V_SHAPE_COOLDOWN are the pattern defaults
+SMA_PERIOD = 20
+
+# --- Colors ---
+# The index of each color is what the vectorized engine stores per candle.
+BULL_COLOR = '#22c55e'
+BEAR_COLOR = '#ef4444'
+VSA_BULL_COLOR = '#00FF00'
+VSA_BEAR_COLOR = '#FF0040'
+V_SHAPE_COLOR = '#FF00FF'  # Hot Pink
+
+PALETTE = (BULL_COLOR, BEAR_COLOR, VSA_BULL_COLOR, VSA_BEAR_COLOR, V_SHAPE_COLOR)
+BULL, BEAR, VSA_BULL, VSA_BEAR, V_SHAPE = range(len(PALETTE))
+
+ENGINES = ("vectorized", "loop")
+
+
+def build_candles(rates, engine: str = "vectorized", sma=None, patterns: str = DEFAULT_PATTERNS):
+    """
+    Applies VSA coloring, the SMA and V-Shape detection to a MT5 rates array.
+    engine="vectorized" is the NumPy implementation, engine="loop" keeps the
+    original per-bar loop available as a reference.
+    `sma` optionally passes an already computed SMA column (e.g. from CandleCache).
+    `patterns` selects the detectors (see src/strategy/patterns.py, vectorized only).
+    """
+    if rates is None or len(rates) == 0:
+        return []
+
+    if engine == "loop":
+        return build_candles_loop(rates)
+    if engine == "vectorized":
+        return columns_to_candles(compute_candle_columns(rates, sma=sma, patterns=patterns))
+
+    raise ValueError(f"Unknown candle engine '{engine}'. Use one of {ENGINES}.")
+
+
+def compute_candle_columns(rates, sma=None, patterns: str = DEFAULT_PATTERNS):
+    """
+    Vectorized version of the VSA / SMA / V-Shape logic.
+    Works directly on the structured array returned by copy_rates_from_pos and
+    returns parallel NumPy columns instead of one dict per candle.
+    If `sma` is given it is used as is instead of being recomputed.
+
+    `patterns` picks the compiled detectors to run, with optional parameters,
+    e.g. "VSA_CLIMAX(multiplier=2),V_SHAPE,ENGULFING". VSA_CLIMAX colors the
+    candles, V_SHAPE colors and marks them, the others are only marked.
+
+    The sums are accumulated in the same order as the reference loop so, with the
+    default patterns, the output is bit-for-bit identical to build_candles_loop().
+    """
+    requested = parse_patterns(patterns)
+    n = len(rates)
+    open_ = np.ascontiguousarray(rates['open'], dtype=np.float64)
+    high = np.ascontiguousarray(rates['high'], dtype=np.float64)
+    low = np.ascontiguousarray(rates['low'], dtype=np.float64)
+    close = np.ascontiguousarray(rates['close'], dtype=np.float64)
+    volume = np.ascontiguousarray(rates['tick_volume'])
+
+    # 1. Average Volume (VSA threshold base)
+    avg_volume = volume.sum() / n
+
+    # 2. Average Body Size (cumsum keeps the sequential summation order of the loop)
+    body = np.abs(open_ - close)
+    avg_body_size = np.cumsum(body)[-1] / n
+
+    # 3. Pattern detectors (one compiled pass each, sharing the averages above)
+    hits = detect_patterns(open_, high, low, close, volume, requested, avg_body_size, avg_volume)
+
+    # 4. Default + VSA colors
+    color_idx = np.where(close >= open_, BULL, BEAR).astype(np.uint8)
+    if "VSA_CLIMAX" in hits:
+        climax_idx, sides = hits["VSA_CLIMAX"]
+        color_idx[climax_idx] = np.where(sides > 0, VSA_BULL, VSA_BEAR)
+
+    # 5. SMA - one shifted add per period instead of one slice per candle
+    if sma is None:
+        sma = rolling_sma(close, SMA_PERIOD)
+
+    # 6. V-Shape
+    pattern_idx = hits["V_SHAPE"][0] if "V_SHAPE" in hits else np.empty(0, dtype=np.int64)
+    color_idx[pattern_idx] = V_SHAPE
+
+    return {
+        "time": np.ascontiguousarray(rates['time'], dtype=np.int64),
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "tick_volume": volume,
+        "color_idx": color_idx,
+        "sma": sma,
+        "pattern_idx": pattern_idx,
+        "patterns": {name: idx for name, (idx, _) in hits.items()},
+        "pattern_sides": {name: sides for name, (_, sides) in hits.items()},
+    }
+
+
+def rolling_sma(close, period: int = SMA_PERIOD):
+    """
+    Simple Moving Average over `close`. The first `period - 1` values are NaN.
+    Adds the `period` shifted views one after the other, which matches the
+    summation order of sum(subset) in the reference loop.
+    """
+    n = len(close)
+    sma = np.full(n, np.nan)
+    if n < period:
+        return sma
+
+    width = n - period + 1
+    acc = np.zeros(width)
+    for k in range(period):
+        acc += close[k:k + width]
+
+    sma[period - 1:] = acc / period
+    return sma
+
+
+def detect_v_shape(open_, close, avg_body_size, recovery: float = V_SHAPE_RECOVERY, cooldown: int = V_SHAPE_COOLDOWN):
+    """
+    Returns the indices of the candles that complete a V-Shape:
+    red candle larger than the average body followed by a green candle that
+    recovers at least `recovery` of it, respecting `cooldown`.
+    `avg_body_size` is a scalar (window average) or one value per candle from
+    index 1 on (trailing average, used by the backtester).
+    """
+    if len(close) < 2:
+        return np.empty(0, dtype=np.int64)
+
+    prev_open, prev_close = open_[:-1], close[:-1]
+    curr_open, curr_close = open_[1:], close[1:]
+
+    prev_body = prev_open - prev_close
+    curr_body = curr_close - curr_open
+
+    candidates = (
+        (prev_close < prev_open)
+        & (curr_close > curr_open)
+        & (prev_body > avg_body_size)
+        & (curr_body >= prev_body * recovery)
+    )
+    candidate_idx = np.flatnonzero(candidates) + 1
+
+    # Cooldown depends on the previous accepted hit, but hits are sparse
+    accepted = []
+    last_pattern_index = -10
+    for i in candidate_idx.tolist():
+        if i - last_pattern_index >= cooldown:
+            accepted.append(i)
+            last_pattern_index = i
+
+    return np.asarray(accepted, dtype=np.int64)
+
+
+def columns_to_candles(columns):
+    """Converts the vectorized columns into the list of dicts the API returns."""
+    n = len(columns["time"])
+    colors = np.asarray(PALETTE, dtype=object)[columns["color_idx"]].tolist()
+
+    sma = columns["sma"]
+    valid = ~np.isnan(sma)
+    sma_list = [None] * n
+    for i, value in zip(np.flatnonzero(valid).tolist(), sma[valid].tolist()):
+        sma_list[i] = value
+
+    # Label = first requested marker pattern of the candle (VSA is shown by the color)
+    patterns = [None] * n
+    for name, idx in reversed(list(columns["patterns"].items())):
+        if PATTERNS[name].marker:
+            for i in idx.tolist():
+                patterns[i] = name
+
+    return [
+        {
+            "time": t,
+            "open": o,
+            "high": h,
+            "low": l,
+            "close": c,
+            "tick_volume": v,
+            "color": color,
+            "wickColor": color,
+            "borderColor": color,
+            "pattern": pattern,
+            "sma": s,
+        }
+        for t, o, h, l, c, v, color, pattern, s in zip(
+            columns["time"].tolist(),
+            columns["open"].tolist(),
+            columns["high"].tolist(),
+            columns["low"].tolist(),
+            columns["close"].tolist(),
+            columns["tick_volume"].tolist(),
+            colors,
+            patterns,
+            sma_list,
+        )
+    ]
+
+
+def build_candles_loop(rates):
+    """
+    Reference implementation (original per-bar loop).
+    Filters:
+    1. VSA Threshold: 1.5x Average Volume.
+    2. V-Shape Cooldown: Must wait 3 candles between patterns.
+    3. V-Shape Size: Candle must be larger than the average body size (no noise).
+    """
+    # 1. Calculate Average Volume (for VSA)
+    total_volume = sum(r['tick_volume'] for r in rates)
+    avg_volume = total_volume / len(rates)
+    flow_threshold = avg_volume * VSA_VOLUME_MULTIPLIER
+
+    # 2. Calculate Average Body Size (for Volatility Filter)
+    # We need this to avoid marking tiny candles as patterns
+    total_body_size = sum(abs(r['open'] - r['close']) for r in rates)
+    avg_body_size = total_body_size / len(rates)
+
+    # Track the index of the last detected pattern to enforce the "3 candle rule"
+    last_pattern_index = -10
+
+    #sma varabiables
+    sma_period = SMA_PERIOD
+    data_list = []
+
+    for i in range(len(rates)):
+        rate = rates[i]
+
+        close = float(rate['close'])
+        open_price = float(rate['open'])
+        high = float(rate['high'])
+        low = float(rate['low'])
+        volume = int(rate['tick_volume'])
+
+        # --- Default Colors ---
+        color = BULL_COLOR if close >= open_price else BEAR_COLOR
+
+        # --- VSA Logic ---
+        if volume > flow_threshold:
+            if close >= open_price:
+                color = VSA_BULL_COLOR
+            else:
+                color = VSA_BEAR_COLOR
+
+        #--- SMA LOGIC ---
+        sma_value = None
+        if i >= sma_period - 1:
+            # sum last 'sma_period' bid closed
+            subset = rates[i - (sma_period - 1) : i + 1]
+            sma_value = sum(r['close'] for r in subset) / sma_period
+
+        # --- V-SHAPE PATTERN LOGIC (Filtered) ---
+        pattern_name = None
+
+        # Rule 1: Must have a previous candle
+        # Rule 2: COOLDOWN - Ensure 3 candles passed since last pattern
+        if i > 0 and (i - last_pattern_index) >= V_SHAPE_COOLDOWN:
+
+            prev_rate = rates[i-1]
+            prev_open = float(prev_rate['open'])
+            prev_close = float(prev_rate['close'])
+
+            # Check Direction: Red then Green
+            is_prev_bearish = prev_close < prev_open
+            is_curr_bullish = close > open_price
+
+            if is_prev_bearish and is_curr_bullish:
+                prev_body = prev_open - prev_close
+                curr_body = close - open_price
+
+                # Rule 3: VOLATILITY FILTER
+                # The previous drop must be at least the size of an average candle.
+                # This ignores tiny noise.
+                if prev_body > avg_body_size:
+
+                    # Rule 4: Strong Recovery (>80%)
+                    if curr_body >= (prev_body * V_SHAPE_RECOVERY):
+                        pattern_name = "V_SHAPE"
+                        color = V_SHAPE_COLOR
+
+                        # Update the tracker so we don't mark the next few candles
+                        last_pattern_index = i
+
+        data_list.append({
+            "time": int(rate['time']),
+            "open": open_price,
+            "high": high,
+            "low": low,
+            "close": close,
+            "tick_volume": volume,
+            "color": color,
+            "wickColor": color,
+            "borderColor": color,
+            "pattern": pattern_name,
+            "sma": sma_value
+        })
+
+    return data_list
@@ -0,0 +1,224 @@
+import math
+from collections import deque
+
+
+class StreamingIndicator:
+    """
+    Base class for O(1) indicators fed bar by bar.
+
+    The state of the closed bars is kept in `committed`. update(x) recomputes the
+    value for the forming bar from that state (so a bar can be updated any number
+    of times) and close_bar() makes the last update permanent.
+    """
+    def __init__(self):
+        self.committed = self.initial_state()
+        self.current = self.committed
+
+    def initial_state(self):
+        raise NotImplementedError
+
+    def advance(self, state, x):
+        raise NotImplementedError
+
+    def value_of(self, state):
+        raise NotImplementedError
+
+    def update(self, x: float):
+        self.current = self.advance(self.committed, x)
+        return self.value
+
+    def close_bar(self):
+        self.committed = self.current
+
+    @property
+    def value(self):
+        return self.value_of(self.current)
+
+
+class WilderRSI(StreamingIndicator):
+    """
+    RSI with Wilder smoothing, matching pandas_ta.rsi: gains and losses are
+    averaged with ewm(alpha=1/length, adjust=True, min_periods=length), which is
+    kept as running numerator/denominator sums.
+    State: (prev_close, count, gain_num, loss_num, weight)
+    """
+    def __init__(self, length: int = 14):
+        self.length = length
+        self.decay = 1.0 - 1.0 / length
+        super().__init__()
+
+    def initial_state(self):
+        return (None, 0, 0.0, 0.0, 0.0)
+
+    def advance(self, state, x):
+        prev_close, count, gain_num, loss_num, weight = state
+        if prev_close is None:
+            return (x, 0, 0.0, 0.0, 0.0)
+
+        change = x - prev_close
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        return (
+            x,
+            count + 1,
+            self.decay * gain_num + gain,
+            self.decay * loss_num + loss,
+            self.decay * weight + 1.0,
+        )
+
+    def value_of(self, state):
+        _, count, gain_num, loss_num, weight = state
+        if count < self.length:
+            return None
+        avg_gain = gain_num / weight
+        avg_loss = loss_num / weight
+        if avg_gain + avg_loss == 0:
+            return None
+        return 100.0 * avg_gain / (avg_gain + avg_loss)
+
+
+class EMA(StreamingIndicator):
+    """
+    EMA matching pandas_ta.ema (sma=True): seeded with the SMA of the first
+    `length` values, then ewm(span=length, adjust=False).
+    State: (count, seed_sum, ema)
+    """
+    def __init__(self, length: int):
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        super().__init__()
+
+    def initial_state(self):
+        return (0, 0.0, None)
+
+    def advance(self, state, x):
+        count, seed_sum, ema = state
+        count += 1
+        if count < self.length:
+            return (count, seed_sum + x, None)
+        if count == self.length:
+            return (count, seed_sum + x, (seed_sum + x) / self.length)
+        return (count, seed_sum, self.alpha * x + (1.0 - self.alpha) * ema)
+
+    def value_of(self, state):
+        return state[2]
+
+
+class RollingStats:
+    """
+    Rolling mean / population variance (ddof=0, as pandas_ta.bbands) over the
+    last `length` values, with running sums. The sums are rebuilt from the window
+    every RESYNC closed bars so floating point drift cannot accumulate.
+    """
+    RESYNC = 1000
+
+    def __init__(self, length: int = 20):
+        self.length = length
+        self.window = deque(maxlen=length)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.closed_bars = 0
+        self.current = None
+
+    def update(self, x: float):
+        total, total_sq, n = self.total + x, self.total_sq + x * x, len(self.window) + 1
+        if len(self.window) == self.length:
+            oldest = self.window[0]
+            total -= oldest
+            total_sq -= oldest * oldest
+            n = self.length
+        self.current = (x, total, total_sq, n)
+        return self.current
+
+    def close_bar(self):
+        if self.current is None:
+            return
+        x, self.total, self.total_sq, _ = self.current
+        self.window.append(x)
+
+        self.closed_bars += 1
+        if self.closed_bars % self.RESYNC == 0:
+            self.total = math.fsum(self.window)
+            self.total_sq = math.fsum(v * v for v in self.window)
+
+    @property
+    def mean(self):
+        if self.current is None or self.current[3] < self.length:
+            return None
+        return self.current[1] / self.length
+
+    @property
+    def std(self):
+        mean = self.mean
+        if mean is None:
+            return None
+        variance = self.current[2] / self.length - mean * mean
+        return math.sqrt(variance) if variance > 0 else 0.0
+
+
+class IndicatorEngine:
+    """
+    Incremental RSI / EMA / Bollinger state for ONE instrument.
+
+    feed(rates) only processes the bars at or after the last seen bar time, so a
+    call with a 100-bar window where only the forming bar moved costs O(1).
+    latest() exposes the same names MarketAnalyzer.prepare_data creates
+    (RSI, EMA_20, EMA_50, BBL/BBM/BBU_20_2.0) for the signal checks.
+    """
+    def __init__(self, rsi_length: int = 14, ema_lengths=(20, 50), bb_length: int = 20, bb_std: float = 2.0):
+        self.rsi = WilderRSI(rsi_length)
+        self.emas = {length: EMA(length) for length in ema_lengths}
+        self.bb = RollingStats(bb_length)
+        self.bb_std = bb_std
+        self.bb_suffix = f"{bb_length}_{float(bb_std)}"
+        self.last_time = None
+
+    def on_bar(self, bar_time: int, close: float):
+        """Feeds one bar. Same time as the last one = forming bar update, newer = bar close + new bar."""
+        if self.last_time is not None:
+            if bar_time < self.last_time:
+                return
+            if bar_time > self.last_time:
+                self._close_bar()
+
+        self.rsi.update(close)
+        for ema in self.emas.values():
+            ema.update(close)
+        self.bb.update(close)
+        self.last_time = bar_time
+
+    def feed(self, rates):
+        """Feeds a MT5 rates array (only the bars not processed yet)."""
+        if rates is None or len(rates) == 0:
+            return self.latest()
+
+        times = rates['time']
+        start = 0
+        if self.last_time is not None:
+            # First bar at or after the last processed one (the forming bar)
+            start = int(times.searchsorted(self.last_time))
+
+        for t, c in zip(times[start:].tolist(), rates['close'][start:].tolist()):
+            self.on_bar(t, c)
+        return self.latest()
+
+    def _close_bar(self):
+        self.rsi.close_bar()
+        for ema in self.emas.values():
+            ema.close_bar()
+        self.bb.close_bar()
+
+    @property
+    def ready(self):
+        values = self.latest()
+        return all(v is not None for v in values.values())
+
+    def latest(self):
+        mean, std = self.bb.mean, self.bb.std
+        values = {"RSI": self.rsi.value}
+        for length, ema in self.emas.items():
+            values[f"EMA_{length}"] = ema.value
+        values[f"BBL_{self.bb_suffix}"] = None if mean is None else mean - self.bb_std * std
+        values[f"BBM_{self.bb_suffix}"] = mean
+        values[f"BBU_{self.bb_suffix}"] = None if mean is None else mean + self.bb_std * std
+        return values
@@ -0,0 +1,242 @@
+"""
+Candle pattern detectors.
+
+Every pattern is a kernel compiled with Numba that makes one pass over the OHLCV
+arrays and writes a signal per candle: +1 bullish, -1 bearish, 0 no pattern
+(non-directional patterns use the candle direction). All kernels share one signature:
+
+    kernel(open_, high, low, close, volume, avg_body, avg_volume, params, out)
+
+`avg_body` / `avg_volume` are the window averages, computed once per request and
+shared by every detector; `params` is a float64 array in the order the pattern
+declared them. Only the requested detectors run, each one is a single compiled loop,
+so adding patterns to the registry costs nothing until a request asks for them.
+
+Without numba the same kernels run as plain Python (correct, much slower).
+"""
+import functools
+import re
+import threading
+
+import numpy as np
+
+
+@functools.lru_cache(maxsize=None)
+def _compiler():
+    """
+    numba.njit, imported on the first detection (numba adds ~0.2s to the import
+    of the API otherwise). Falls back to plain Python when numba is missing.
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        return lambda func: func
+    return njit(cache=True, nogil=True)
+
+
+# --- Defaults of the original chart rules ---
+VSA_VOLUME_MULTIPLIER = 1.5   # Volume above 1.5x the average marks institutional flow
+V_SHAPE_RECOVERY = 0.8        # Current body must recover at least 80% of the previous drop
+V_SHAPE_COOLDOWN = 3          # Candles that must pass between two V-Shape patterns
+
+
+class Pattern:
+    """A registered detector: compiled kernel + ordered parameters with defaults."""
+    def __init__(self, name: str, function, params, description: str, marker: bool):
+        self.name = name
+        self.function = function
+        self._kernel = None
+        self._lock = threading.Lock()
+        self.param_names = tuple(params)
+        self.defaults = np.array([float(value) for value in params.values()], dtype=np.float64)
+        self.description = description
+        # marker=False: shown as a candle color (VSA), not as a "pattern" label
+        self.marker = marker
+
+    @property
+    def kernel(self):
+        """Compiled kernel (compiled once, on first use or by warmup())."""
+        if self._kernel is None:
+            with self._lock:
+                if self._kernel is None:
+                    self._kernel = _compiler()(self.function)
+        return self._kernel
+
+    def resolve(self, overrides=None):
+        """Parameter array with `overrides` ({name: value}) applied on the defaults."""
+        values = self.defaults.copy()
+        for key, value in (overrides or {}).items():
+            if key not in self.param_names:
+                raise ValueError(
+                    f"Unknown parameter '{key}' for pattern {self.name}. Use one of {self.param_names}."
+                )
+            values[self.param_names.index(key)] = float(value)
+        return values
+
+
+PATTERNS = {}
+
+
+def register_pattern(name: str, params=None, description: str = "", marker: bool = True):
+    """Decorator: adds `kernel` to PATTERNS (compiled with Numba on first use, cached on disk)."""
+    def register(kernel):
+        PATTERNS[name] = Pattern(name, kernel, params or {}, description, marker)
+        return kernel
+    return register
+
+
+# --- Kernels ---
+
+@register_pattern(
+    "VSA_CLIMAX", {"multiplier": VSA_VOLUME_MULTIPLIER},
+    "Volume above `multiplier` x the window average (institutional flow)", marker=False,
+)
+def _vsa_climax(open_, high, low, close, volume, avg_body, avg_volume, params, out):
+    threshold = avg_volume * params[0]
+    for i in range(len(close)):
+        if volume[i] > threshold:
+            out[i] = 1 if close[i] >= open_[i] else -1
+
+
+@register_pattern(
+    "V_SHAPE", {"recovery": V_SHAPE_RECOVERY, "cooldown": V_SHAPE_COOLDOWN},
+    "Red candle above the average body, then a green one recovering `recovery` of it",
+)
+def _v_shape(open_, high, low, close, volume, avg_body, avg_volume, params, out):
+    recovery = params[0]
+    cooldown = params[1]
+    last_pattern_index = -10
+    for i in range(1, len(close)):
+        if i - last_pattern_index < cooldown:
+            continue
+        prev_body = open_[i - 1] - close[i - 1]
+        curr_body = close[i] - open_[i]
+        if prev_body > 0 and curr_body > 0 and prev_body > avg_body and curr_body >= prev_body * recovery:
+            out[i] = 1
+            last_pattern_index = i
+
+
+@register_pattern(
+    "ENGULFING", {"min_ratio": 1.0},
+    "Body covers the opposite-colored previous body and is `min_ratio` x its size",
+)
+def _engulfing(open_, high, low, close, volume, avg_body, avg_volume, params, out):
+    min_ratio = params[0]
+    for i in range(1, len(close)):
+        prev_body = close[i - 1] - open_[i - 1]
+        curr_body = close[i] - open_[i]
+        if prev_body < 0 < curr_body:
+            if open_[i] <= close[i - 1] and close[i] >= open_[i - 1] and curr_body >= -prev_body * min_ratio:
+                out[i] = 1
+        elif prev_body > 0 > curr_body:
+            if open_[i] >= close[i - 1] and close[i] <= open_[i - 1] and -curr_body >= prev_body * min_ratio:
+                out[i] = -1
+
+
+@register_pattern(
+    "PIN_BAR", {"nose": 0.6, "max_body": 0.3},
+    "One wick is `nose` of a candle larger than the average body, body <= `max_body` of it",
+)
+def _pin_bar(open_, high, low, close, volume, avg_body, avg_volume, params, out):
+    nose = params[0]
+    max_body = params[1]
+    for i in range(len(close)):
+        size = high[i] - low[i]
+        if size <= avg_body:
+            continue
+        body_top = max(open_[i], close[i])
+        body_bottom = min(open_[i], close[i])
+        if body_top - body_bottom > max_body * size:
+            continue
+        if body_bottom - low[i] >= nose * size:
+            out[i] = 1
+        elif high[i] - body_top >= nose * size:
+            out[i] = -1
+
+
+@register_pattern(
+    "INSIDE_BAR", {},
+    "High and low inside the previous candle's range",
+)
+def _inside_bar(open_, high, low, close, volume, avg_body, avg_volume, params, out):
+    for i in range(1, len(close)):
+        if high[i] < high[i - 1] and low[i] > low[i - 1]:
+            out[i] = 1 if close[i] >= open_[i] else -1
+
+
+@register_pattern(
+    "DOJI", {"max_body": 0.1},
+    "Body at most `max_body` of the candle range",
+)
+def _doji(open_, high, low, close, volume, avg_body, avg_volume, params, out):
+    max_body = params[0]
+    for i in range(len(close)):
+        size = high[i] - low[i]
+        if size > 0 and abs(close[i] - open_[i]) <= max_body * size:
+            out[i] = 1 if close[i] >= open_[i] else -1
+
+
+# --- Requests ---
+
+DEFAULT_PATTERNS = "VSA_CLIMAX,V_SHAPE"
+
+_SPEC_ITEM = re.compile(r"\s*([A-Za-z_]+)\s*(?:\(([^)]*)\))?\s*(?:,|$)")
+
+
+@functools.lru_cache(maxsize=128)
+def parse_patterns(spec: str = DEFAULT_PATTERNS):
+    """
+    Parses a request like "V_SHAPE(recovery=0.7,cooldown=5),ENGULFING,VSA_CLIMAX(multiplier=2)"
+    into ((Pattern, params array), ...) in request order. Raises ValueError on
+    unknown patterns / parameters. Cached: repeated requests are not parsed again.
+    """
+    requested = []
+    position = 0
+    spec = spec or ""
+    while position < len(spec.rstrip()):
+        match = _SPEC_ITEM.match(spec, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Invalid pattern list near '{spec[position:]}'.")
+        position = match.end()
+
+        name = match.group(1).upper()
+        pattern = PATTERNS.get(name)
+        if pattern is None:
+            raise ValueError(f"Unknown pattern '{name}'. Use one of {tuple(PATTERNS)}.")
+
+        overrides = {}
+        for item in filter(None, (part.strip() for part in (match.group(2) or "").split(","))):
+            key, sep, value = item.partition("=")
+            try:
+                if not sep:
+                    raise ValueError
+                overrides[key.strip()] = float(value)
+            except ValueError:
+                raise ValueError(f"Invalid value for {name} parameter '{item}'.") from None
+        requested.append((pattern, pattern.resolve(overrides)))
+    return tuple(requested)
+
+
+def detect_patterns(open_, high, low, close, volume, requested, avg_body: float, avg_volume: float):
+    """
+    Runs the requested detectors (parse_patterns output) over contiguous float64
+    OHLC arrays and the volume array.
+    Returns {name: (indices, sides)}: the candles with a hit and their +1 / -1 signal.
+    """
+    hits = {}
+    n = len(close)
+    for pattern, params in requested:
+        out = np.zeros(n, dtype=np.int8)
+        pattern.kernel(open_, high, low, close, volume, avg_body, avg_volume, params, out)
+        idx = np.flatnonzero(out)
+        hits[pattern.name] = (idx, out[idx])
+    return hits
+
+
+def warmup():
+    """Compiles every kernel now (first use would otherwise pay the JIT cost)."""
+    prices = np.linspace(1.0, 2.0, 8)
+    volume = np.arange(8, dtype=np.uint64)
+    for pattern in PATTERNS.values():
+        out = np.zeros(8, dtype=np.int8)
+        pattern.kernel(prices, prices + 0.1, prices - 0.1, prices[::-1].copy(), volume, 0.1, 3.5, pattern.defaults, out)
@@ -0,0 +1,72 @@
+"""
+Vectorized OHLCV resampling: M1 bars (or ticks) -> any timeframe up to D1.
+
+A bar of `seconds` starts at t - (t - offset) % seconds. `offset` moves the day
+boundary (and the H4/H8/H12 grid with it) for feeds whose bar times are not the
+broker's session time, e.g. UTC bars of a broker whose day starts at the New York
+close: offset = -2h. Timeframes of one hour or less are not affected by whole-hour
+offsets.
+"""
+import numpy as np
+
+
+def bucket_start(times, seconds: int, offset: int = 0):
+    """Start time of the `seconds` bar containing each time (Unix seconds)."""
+    return times - (times - offset) % seconds
+
+
+def _groups(times, seconds: int, offset: int):
+    buckets = bucket_start(times, seconds, offset)
+    starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+    ends = np.append(starts[1:], len(times))
+    return buckets[starts], starts, ends
+
+
+def resample(rates, seconds: int, offset: int = 0):
+    """
+    Aggregates sorted finer bars (MT5 rates layout) into `seconds` bars:
+    first open, max high, min low, last close, summed volumes, lowest spread.
+    The last output bar is partial if the input ends inside it (forming bar).
+    """
+    if len(rates) == 0:
+        return np.empty(0, dtype=rates.dtype)
+
+    times, starts, ends = _groups(np.asarray(rates['time']), seconds, offset)
+    out = np.zeros(len(starts), dtype=rates.dtype)
+    out['time'] = times
+    out['open'] = rates['open'][starts]
+    out['high'] = np.maximum.reduceat(rates['high'], starts)
+    out['low'] = np.minimum.reduceat(rates['low'], starts)
+    out['close'] = rates['close'][ends - 1]
+    out['tick_volume'] = np.add.reduceat(rates['tick_volume'], starts)
+    out['spread'] = np.minimum.reduceat(rates['spread'], starts)
+    out['real_volume'] = np.add.reduceat(rates['real_volume'], starts)
+    return out
+
+
+def ticks_to_bars(ticks, seconds: int, point: float, dtype, offset: int = 0):
+    """
+    Bars of `seconds` from sorted MT5 ticks (bid prices, like the terminal's charts).
+    tick_volume is the tick count, spread the last (ask - bid) in points.
+    Returns (bars, starts): `starts[i]` is the index of the first tick of bar i.
+    """
+    if len(ticks) == 0:
+        return np.empty(0, dtype=dtype), np.empty(0, dtype=np.int64)
+
+    times, starts, ends = _groups(np.asarray(ticks['time']), seconds, offset)
+    bid = ticks['bid']
+    bars = np.zeros(len(starts), dtype=dtype)
+    bars['time'] = times
+    bars['open'] = bid[starts]
+    bars['high'] = np.maximum.reduceat(bid, starts)
+    bars['low'] = np.minimum.reduceat(bid, starts)
+    bars['close'] = bid[ends - 1]
+    bars['tick_volume'] = ends - starts
+    bars['spread'] = np.rint((ticks['ask'][ends - 1] - bid[ends - 1]) / point)
+    bars['real_volume'] = np.add.reduceat(ticks['volume'], starts)
+    return bars, starts
+
+
+def is_resampled(seconds: int) -> bool:
+    """Timeframes built from M1: above one minute, up to one day (W1/MN1 stay native)."""
+    return 60 < seconds <= 86400
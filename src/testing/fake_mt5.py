@@ -0,0 +1,581 @@
+"""
+Drop-in stand-in for the MetaTrader5 package (tests, benchmarks, Linux/macOS dev).
+
+    from src.testing import fake_mt5
+    fake_mt5.install(latency=0.002)   # before importing any src module that uses mt5
+
+Everything is deterministic: rates are a seeded random walk per (symbol, timeframe)
+(timeframes are independent walks, ticks follow M1, one tick per second), the clock
+only moves with advance(), and orders fill at the current tick.
+Every API call sleeps `latency` seconds to simulate terminal IPC.
+
+configure(market=...) replaces the random walk with recorded data (see
+src/ticks/replay.py): ticks and bars then come from the market at the current clock.
+"""
+import datetime
+import sys
+import time
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+# --- Constants (same values as the real package) ---
+
+TIMEFRAME_M1 = 1
+TIMEFRAME_M2 = 2
+TIMEFRAME_M3 = 3
+TIMEFRAME_M4 = 4
+TIMEFRAME_M5 = 5
+TIMEFRAME_M6 = 6
+TIMEFRAME_M10 = 10
+TIMEFRAME_M12 = 12
+TIMEFRAME_M15 = 15
+TIMEFRAME_M20 = 20
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 0x4000 | 1
+TIMEFRAME_H2 = 0x4000 | 2
+TIMEFRAME_H3 = 0x4000 | 3
+TIMEFRAME_H4 = 0x4000 | 4
+TIMEFRAME_H6 = 0x4000 | 6
+TIMEFRAME_H8 = 0x4000 | 8
+TIMEFRAME_H12 = 0x4000 | 12
+TIMEFRAME_D1 = 0x4000 | 24
+TIMEFRAME_W1 = 0x8000 | 1
+TIMEFRAME_MN1 = 0xC000 | 1
+
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+ORDER_TYPE_BUY_LIMIT = 2
+ORDER_TYPE_SELL_LIMIT = 3
+ORDER_TYPE_BUY_STOP = 4
+ORDER_TYPE_SELL_STOP = 5
+
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+
+TRADE_ACTION_DEAL = 1
+TRADE_ACTION_PENDING = 5
+TRADE_ACTION_SLTP = 6
+TRADE_ACTION_MODIFY = 7
+TRADE_ACTION_REMOVE = 8
+TRADE_ACTION_CLOSE_BY = 10
+
+ORDER_FILLING_FOK = 0
+ORDER_FILLING_IOC = 1
+ORDER_FILLING_RETURN = 2
+
+ORDER_TIME_GTC = 0
+ORDER_TIME_DAY = 1
+
+SYMBOL_FILLING_FOK = 1
+SYMBOL_FILLING_IOC = 2
+
+SYMBOL_TRADE_MODE_DISABLED = 0
+SYMBOL_TRADE_MODE_FULL = 4
+
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_REJECT = 10006
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_DONE_PARTIAL = 10010
+TRADE_RETCODE_ERROR = 10011
+TRADE_RETCODE_INVALID = 10013
+TRADE_RETCODE_INVALID_VOLUME = 10014
+TRADE_RETCODE_INVALID_PRICE = 10015
+TRADE_RETCODE_INVALID_STOPS = 10016
+TRADE_RETCODE_NO_MONEY = 10019
+TRADE_RETCODE_PRICE_CHANGED = 10020
+TRADE_RETCODE_PRICE_OFF = 10021
+TRADE_RETCODE_CONNECTION = 10031
+
+COPY_TICKS_ALL = -1
+COPY_TICKS_INFO = 1
+COPY_TICKS_TRADE = 2
+
+TICK_FLAG_BID = 2
+TICK_FLAG_ASK = 4
+TICK_FLAG_LAST = 8
+TICK_FLAG_VOLUME = 16
+TICK_FLAG_BUY = 32
+TICK_FLAG_SELL = 64
+
+RES_S_OK = 1
+RES_E_INTERNAL_FAIL = -10001
+
+RATES_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('tick_volume', '<u8'),
+    ('spread', '<i4'),
+    ('real_volume', '<u8'),
+])
+
+TICKS_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('last', '<f8'),
+    ('volume', '<u8'),
+    ('time_msc', '<i8'),
+    ('flags', '<u4'),
+    ('volume_real', '<f8'),
+])
+
+# --- Result types (namedtuples with the fields of the real ones) ---
+
+SymbolInfo = namedtuple("SymbolInfo", [
+    "name", "description", "path", "digits", "point", "trade_contract_size",
+    "volume_min", "volume_max", "volume_step", "trade_mode", "visible",
+    "trade_stops_level", "filling_mode", "spread", "bid", "ask",
+])
+Tick = namedtuple("Tick", ["time", "bid", "ask", "last", "volume", "time_msc", "flags", "volume_real"])
+TerminalInfo = namedtuple("TerminalInfo", ["connected", "trade_allowed", "name", "build", "ping_last"])
+AccountInfo = namedtuple("AccountInfo", ["login", "server", "balance", "equity", "margin", "margin_free", "currency"])
+TradePosition = namedtuple("TradePosition", [
+    "ticket", "time", "time_msc", "type", "magic", "volume", "price_open", "sl", "tp",
+    "price_current", "profit", "symbol", "comment",
+])
+TradeOrder = namedtuple("TradeOrder", [
+    "ticket", "time_setup", "type", "magic", "volume_initial", "volume_current",
+    "price_open", "sl", "tp", "symbol", "comment",
+])
+OrderSendResult = namedtuple("OrderSendResult", [
+    "retcode", "deal", "order", "volume", "price", "bid", "ask", "comment", "request_id",
+    "retcode_external", "request",
+])
+OrderCheckResult = namedtuple("OrderCheckResult", [
+    "retcode", "balance", "equity", "profit", "margin", "margin_free", "margin_level",
+    "comment", "request",
+])
+
+DEFAULT_SYMBOLS = ("EURUSDm", "GBPUSDm", "USDJPYm", "AUDUSDm", "USDCADm", "USDCHFm", "XAUUSDm", "BTCUSDm")
+DEFAULT_NOW = 1_700_000_000  # Tue 2023-11-14 22:13:20 UTC
+CHUNK = 4096
+
+
+def _timeframe_seconds(timeframe) -> int:
+    timeframe = int(timeframe)
+    if timeframe & 0xC000 == 0xC000:
+        return 30 * 86400 * (timeframe & 0x3FFF)
+    if timeframe & 0x8000:
+        return 7 * 86400 * (timeframe & 0x3FFF)
+    if timeframe & 0x4000:
+        return 3600 * (timeframe & 0x3FFF)
+    return 60 * timeframe
+
+
+def _base_price(symbol: str):
+    """(price, digits, point) that look like the instrument."""
+    name = symbol.upper()
+    if name.startswith("XAU"):
+        return 2000.0, 2, 0.01
+    if name.startswith("BTC"):
+        return 40000.0, 2, 0.01
+    if "JPY" in name:
+        return 150.0, 3, 0.001
+    return 1.1, 5, 0.00001
+
+
+class _Series:
+    """Seeded random walk of one (symbol, timeframe), extended in fixed chunks on demand."""
+    def __init__(self, symbol: str, timeframe, start_time: int):
+        self.seconds = _timeframe_seconds(timeframe)
+        self.start_time = start_time - start_time % self.seconds
+        self.price, _, self.point = _base_price(symbol)
+        seed = zlib.crc32(f"{symbol}:{int(timeframe)}".encode())
+        self.rng = np.random.default_rng(seed)
+        self.bars = np.empty(0, dtype=RATES_DTYPE)
+        self.last_close = self.price
+
+    def ensure(self, count: int):
+        while len(self.bars) < count:
+            self._extend()
+
+    def _extend(self):
+        n = CHUNK
+        volatility = self.price * 0.0004 * np.sqrt(self.seconds / 60)
+        moves = self.rng.normal(0.0, volatility, n)
+        close = self.last_close + np.cumsum(moves)
+        close = np.maximum(close, self.price * 0.05)
+        open_ = np.concatenate(([self.last_close], close[:-1]))
+        wick = np.abs(self.rng.normal(0.0, volatility * 0.5, (2, n)))
+
+        chunk = np.zeros(n, dtype=RATES_DTYPE)
+        first = len(self.bars)
+        chunk['time'] = self.start_time + self.seconds * np.arange(first, first + n, dtype=np.int64)
+        chunk['open'] = open_
+        chunk['close'] = close
+        chunk['high'] = np.maximum(open_, close) + wick[0]
+        chunk['low'] = np.minimum(open_, close) - wick[1]
+        chunk['tick_volume'] = self.rng.integers(20, 2000, n)
+        chunk['spread'] = self.rng.integers(5, 25, n)
+
+        self.last_close = float(close[-1])
+        self.bars = np.concatenate((self.bars, chunk))
+
+
+class FakeTerminal:
+    """State behind the module-level API. Reset with configure()."""
+    def __init__(self, latency: float = 0.0, now: int = DEFAULT_NOW, history: int = 100_000,
+                 symbols=DEFAULT_SYMBOLS, extra_symbols: int = 0, requote_every: int = 0,
+                 balance: float = 10_000.0, market=None):
+        self.latency = latency
+        # Recorded market (ReplayMarket): tick()/rates()/ticks() read it instead of the walk
+        self.market = market
+        self.now = float(now)
+        self.history = history
+        self.requote_every = requote_every
+        self.balance = balance
+
+        self.connected = False
+        self.down_until = 0.0  # time.monotonic() before which initialize() fails (outage)
+        self.error = (RES_S_OK, "Success")
+        self.series = {}
+        self.positions = {}
+        self.orders = {}
+        self.next_ticket = 100_000
+        self.sent = 0
+        self.calls = {}
+
+        names = list(symbols) + [f"SYN{i:05d}" for i in range(extra_symbols)]
+        self.symbols = {}
+        for i, name in enumerate(names):
+            price, digits, point = _base_price(name)
+            self.symbols[name] = SymbolInfo(
+                name=name, description=f"{name} synthetic", path=f"Fake\\{name[:3]}",
+                digits=digits, point=point, trade_contract_size=100000.0,
+                volume_min=0.01, volume_max=100.0, volume_step=0.01,
+                trade_mode=SYMBOL_TRADE_MODE_FULL, visible=i < len(symbols),
+                trade_stops_level=10, filling_mode=SYMBOL_FILLING_FOK | SYMBOL_FILLING_IOC,
+                spread=10, bid=price, ask=price + 10 * point,
+            )
+        self.selected = {name for name, info in self.symbols.items() if info.visible}
+
+    # --- Helpers ---
+
+    def call(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_series(self, symbol: str, timeframe) -> _Series:
+        key = (symbol, int(timeframe))
+        series = self.series.get(key)
+        if series is None:
+            seconds = _timeframe_seconds(timeframe)
+            bars = min(self.history, int(self.now) // seconds - 1)
+            series = _Series(symbol, timeframe, int(self.now) - bars * seconds)
+            self.series[key] = series
+        return series
+
+    def rates(self, symbol: str, timeframe, pos: int, count: int):
+        """Bars up to the one containing `now`; the last one is still forming."""
+        if self.market is not None:
+            return self.market.rates(symbol, timeframe, pos, count, self.now)
+        series = self.get_series(symbol, timeframe)
+        current = int((self.now - series.start_time) // series.seconds)
+        series.ensure(current + 1)
+
+        end = current + 1 - pos
+        start = max(0, end - count)
+        if end <= 0:
+            return np.empty(0, dtype=RATES_DTYPE)
+        bars = series.bars[start:end].copy()
+
+        if pos == 0:
+            # Forming bar: only the part of its move that already happened
+            progress = (self.now - bars['time'][-1]) / series.seconds
+            last = bars[-1]
+            close = last['open'] + (last['close'] - last['open']) * progress
+            bars['close'][-1] = close
+            bars['high'][-1] = max(last['open'], close) + (last['high'] - max(last['open'], last['close'])) * progress
+            bars['low'][-1] = min(last['open'], close) - (min(last['open'], last['close']) - last['low']) * progress
+            bars['tick_volume'][-1] = max(1, int(last['tick_volume'] * progress))
+        return bars
+
+    def tick(self, symbol: str):
+        """Last tick at `now` (None if the recorded market has none yet)."""
+        if self.market is not None:
+            return self.market.tick(symbol, self.now)
+        info = self.symbols[symbol]
+        bar = self.rates(symbol, TIMEFRAME_M1, 0, 1)[-1]
+        bid = round(float(bar['close']), info.digits)
+        ask = round(bid + int(bar['spread']) * info.point, info.digits)
+        time_msc = int(self.now * 1000)
+        return Tick(int(self.now), bid, ask, 0.0, 0, time_msc, TICK_FLAG_BID | TICK_FLAG_ASK, 0.0)
+
+    def ticks(self, symbol: str, start_msc: int, end_msc: int, count: int = None):
+        """
+        Ticks with start_msc <= time_msc <= min(end_msc, now), oldest first, at most
+        `count`. The walk has one tick per whole second, priced like tick() at that time.
+        """
+        end_msc = min(end_msc, int(self.now * 1000))
+        if self.market is not None:
+            return self.market.ticks(symbol, start_msc, end_msc, count)
+
+        first = -(-start_msc // 1000)
+        last = end_msc // 1000
+        if count is not None:
+            last = min(last, first + count - 1)
+        if last < first:
+            return np.empty(0, dtype=TICKS_DTYPE)
+
+        info = self.symbols[symbol]
+        series = self.get_series(symbol, TIMEFRAME_M1)
+        times = np.arange(first, last + 1, dtype=np.int64)
+        index = (times - series.start_time) // series.seconds
+        series.ensure(int(index[-1]) + 1)
+        bars = series.bars[index]
+        progress = (times - bars['time']) / series.seconds
+
+        ticks = np.zeros(len(times), dtype=TICKS_DTYPE)
+        ticks['time'] = times
+        ticks['time_msc'] = times * 1000
+        ticks['bid'] = np.round(bars['open'] + (bars['close'] - bars['open']) * progress, info.digits)
+        ticks['ask'] = np.round(ticks['bid'] + bars['spread'] * info.point, info.digits)
+        ticks['flags'] = TICK_FLAG_BID | TICK_FLAG_ASK
+        return ticks
+
+
+terminal = FakeTerminal()
+
+
+def configure(**kwargs) -> FakeTerminal:
+    """Resets the fake terminal (see FakeTerminal for the options) and returns it."""
+    global terminal
+    terminal = FakeTerminal(**kwargs)
+    return terminal
+
+
+def install(**kwargs) -> FakeTerminal:
+    """Registers this module as `MetaTrader5` in sys.modules (call before importing src)."""
+    sys.modules["MetaTrader5"] = sys.modules[__name__]
+    return configure(**kwargs) if kwargs else terminal
+
+
+def advance(seconds: float):
+    """Moves the clock forward: new ticks, the forming bar grows, new bars appear."""
+    terminal.now += seconds
+
+
+def set_latency(latency: float):
+    terminal.latency = latency
+
+
+def disconnect(down_for: float = 0.0):
+    """
+    Simulates a lost terminal: terminal_info() returns None until initialize(),
+    which fails for the next `down_for` (wall-clock) seconds.
+    """
+    terminal.connected = False
+    terminal.down_until = time.monotonic() + down_for
+    terminal.error = (RES_E_INTERNAL_FAIL, "IPC recv failed")
+
+
+# --- Connection ---
+
+def initialize(path=None, **kwargs):
+    terminal.call("initialize")
+    if time.monotonic() < terminal.down_until:
+        terminal.error = (RES_E_INTERNAL_FAIL, "IPC initialize failed")
+        return False
+    terminal.connected = True
+    terminal.error = (RES_S_OK, "Success")
+    return True
+
+
+def login(login=None, password=None, server=None, **kwargs):
+    terminal.call("login")
+    return terminal.connected
+
+
+def shutdown():
+    terminal.call("shutdown")
+    terminal.connected = False
+    return True
+
+
+def last_error():
+    return terminal.error
+
+
+def terminal_info():
+    terminal.call("terminal_info")
+    if not terminal.connected:
+        return None
+    return TerminalInfo(True, True, "FakeTerminal", 4000, 1000)
+
+
+def account_info():
+    terminal.call("account_info")
+    return AccountInfo(1, "Fake-Server", terminal.balance, terminal.balance, 0.0, terminal.balance, "USD")
+
+
+# --- Symbols / market data ---
+
+def symbols_get(group=None):
+    terminal.call("symbols_get")
+    if not terminal.connected:
+        return None
+    return tuple(terminal.symbols.values())
+
+
+def symbols_total():
+    return len(terminal.symbols)
+
+
+def symbol_info(symbol):
+    terminal.call("symbol_info")
+    return terminal.symbols.get(symbol)
+
+
+def symbol_select(symbol, enable=True):
+    terminal.call("symbol_select")
+    if symbol not in terminal.symbols:
+        return False
+    if enable:
+        terminal.selected.add(symbol)
+    else:
+        terminal.selected.discard(symbol)
+    return True
+
+
+def symbol_info_tick(symbol):
+    terminal.call("symbol_info_tick")
+    if not terminal.connected or symbol not in terminal.symbols:
+        return None
+    return terminal.tick(symbol)
+
+
+def copy_rates_from_pos(symbol, timeframe, start_pos, count):
+    terminal.call("copy_rates_from_pos")
+    if not terminal.connected or symbol not in terminal.symbols:
+        return None
+    return terminal.rates(symbol, timeframe, int(start_pos), int(count))
+
+
+def _to_msc(value) -> int:
+    """datetime (naive = UTC, like the real package) or Unix seconds -> milliseconds."""
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return int(value.timestamp() * 1000)
+    return int(value) * 1000
+
+
+def copy_ticks_from(symbol, date_from, count, flags):
+    terminal.call("copy_ticks_from")
+    if not terminal.connected or symbol not in terminal.symbols:
+        return None
+    return terminal.ticks(symbol, _to_msc(date_from), int(terminal.now * 1000), int(count))
+
+
+def copy_ticks_range(symbol, date_from, date_to, flags):
+    terminal.call("copy_ticks_range")
+    if not terminal.connected or symbol not in terminal.symbols:
+        return None
+    return terminal.ticks(symbol, _to_msc(date_from), _to_msc(date_to))
+
+
+# --- Trading ---
+
+def positions_get(symbol=None, ticket=None, group=None):
+    terminal.call("positions_get")
+    if not terminal.connected:
+        return None
+    return tuple(
+        p for p in terminal.positions.values()
+        if (symbol is None or p.symbol == symbol) and (ticket is None or p.ticket == ticket)
+    )
+
+
+def positions_total():
+    return len(terminal.positions)
+
+
+def orders_get(symbol=None, ticket=None, group=None):
+    terminal.call("orders_get")
+    if not terminal.connected:
+        return None
+    return tuple(
+        o for o in terminal.orders.values()
+        if (symbol is None or o.symbol == symbol) and (ticket is None or o.ticket == ticket)
+    )
+
+
+def orders_total():
+    return len(terminal.orders)
+
+
+def order_check(request):
+    terminal.call("order_check")
+    retcode, comment = _validate(request)
+    return OrderCheckResult(
+        0 if retcode == TRADE_RETCODE_DONE else retcode, terminal.balance, terminal.balance,
+        0.0, 0.0, terminal.balance, 0.0, comment, request,
+    )
+
+
+def order_send(request):
+    terminal.call("order_send")
+    if not terminal.connected:
+        terminal.error = (RES_E_INTERNAL_FAIL, "IPC send failed")
+        return None
+
+    terminal.sent += 1
+    retcode, comment = _validate(request)
+    tick = terminal.tick(request["symbol"]) if request.get("symbol") in terminal.symbols else None
+
+    if retcode == TRADE_RETCODE_DONE and terminal.requote_every and terminal.sent % terminal.requote_every == 0:
+        retcode, comment = TRADE_RETCODE_REQUOTE, "Requote"
+    if retcode != TRADE_RETCODE_DONE:
+        return OrderSendResult(retcode, 0, 0, 0.0, 0.0, tick.bid if tick else 0.0,
+                               tick.ask if tick else 0.0, comment, terminal.sent, 0, request)
+
+    terminal.next_ticket += 1
+    ticket = terminal.next_ticket
+    symbol = request["symbol"]
+    action = request["action"]
+
+    if action == TRADE_ACTION_PENDING:
+        terminal.orders[ticket] = TradeOrder(
+            ticket, int(terminal.now), request["type"], request.get("magic", 0), request["volume"],
+            request["volume"], request["price"], request.get("sl", 0.0), request.get("tp", 0.0),
+            symbol, request.get("comment", ""),
+        )
+        price = request["price"]
+    elif request.get("position"):
+        terminal.positions.pop(int(request["position"]), None)
+        price = tick.bid if request["type"] == ORDER_TYPE_SELL else tick.ask
+    else:
+        price = tick.ask if request["type"] == ORDER_TYPE_BUY else tick.bid
+        terminal.positions[ticket] = TradePosition(
+            ticket, int(terminal.now), int(terminal.now * 1000), request["type"],
+            request.get("magic", 0), request["volume"], price, request.get("sl", 0.0),
+            request.get("tp", 0.0), price, 0.0, symbol, request.get("comment", ""),
+        )
+
+    return OrderSendResult(TRADE_RETCODE_DONE, ticket, ticket, request["volume"], price,
+                           tick.bid, tick.ask, "Request executed", terminal.sent, 0, request)
+
+
+def _validate(request):
+    """(retcode, comment) the server would answer."""
+    info = terminal.symbols.get(request.get("symbol"))
+    if info is None:
+        return TRADE_RETCODE_INVALID, "Invalid request"
+    volume = request.get("volume", 0.0)
+    if volume < info.volume_min or volume > info.volume_max:
+        return TRADE_RETCODE_INVALID_VOLUME, "Invalid volume"
+    if terminal.market is not None and terminal.tick(info.name) is None:
+        return TRADE_RETCODE_PRICE_OFF, "No prices"  # Replay has not reached the symbol's first tick
+    if request.get("action") == TRADE_ACTION_DEAL and not request.get("position"):
+        price = request.get("price", 0.0)
+        tick = terminal.tick(info.name)
+        market = tick.ask if request.get("type") == ORDER_TYPE_BUY else tick.bid
+        if price and abs(price - market) > request.get("deviation", 0) * info.point:
+            return TRADE_RETCODE_REQUOTE, "Requote"
+    return TRADE_RETCODE_DONE, "Done"
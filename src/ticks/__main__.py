@@ -0,0 +1,187 @@
+"""
+Tick recording and replay.
+
+    python -m src.ticks record --dir ticks --symbols EURUSDm,XAUUSDm    # from the MT5 terminal
+    python -m src.ticks record --dir ticks --fake --duration 86400 --interval 60
+    python -m src.ticks info --dir ticks
+    python -m src.ticks replay --dir ticks --speed 0 --bot               # TradingBot.tick on every tick
+    python -m src.ticks replay --dir ticks --speed 10 --serve            # API on a 10x recorded market
+
+`record --fake` records the fake terminal's synthetic market with a simulated clock
+(no waiting). `replay` always runs on the fake terminal: no terminal is needed and
+Telegram is disabled.
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import statistics
+import time
+
+
+def _use_fake_terminal(**kwargs):
+    # Must run before any src module reads the settings or imports MetaTrader5
+    for name, value in (("MT5_LOGIN", "1"), ("MT5_PASSWORD", "replay"), ("MT5_SERVER", "Fake-Server")):
+        os.environ.setdefault(name, value)
+    os.environ["TELEGRAM_TOKEN"] = ""  # Never send alerts for a recorded market
+
+    from src.testing import fake_mt5
+    fake_mt5.install(**kwargs)
+    return fake_mt5
+
+
+def _symbols(value: str):
+    return [name.strip() for name in value.split(",") if name.strip()] if value else None
+
+
+def _format_msc(value) -> str:
+    if value is None:
+        return "-"
+    return datetime.datetime.fromtimestamp(value / 1000, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+# --- record ---
+
+async def record(args):
+    if args.fake:
+        fake_mt5 = _use_fake_terminal()
+        fake_mt5.initialize()
+
+    from src.services.mt5_service import MT5Service
+    from src.ticks.recorder import TickRecorder
+    from src.ticks.store import TickStore
+
+    recorder = TickRecorder(TickStore(args.dir), _symbols(args.symbols), args.interval)
+    if not args.fake and not await MT5Service().initialize_async():
+        print("❌ Could not connect to MT5.")
+        return
+
+    started = time.perf_counter()
+    try:
+        if args.fake:
+            # Simulated clock: one poll per `interval` of market time, no waiting
+            for _ in range(int(args.duration / recorder.interval)):
+                fake_mt5.advance(recorder.interval)
+                await recorder.poll()
+        else:
+            recorder.start()
+            await asyncio.sleep(args.duration or float("inf"))
+    finally:
+        await recorder.stop()
+        print(f"💾 {recorder.stats['written']} ticks written in {time.perf_counter() - started:.1f}s {recorder.stats}")
+
+
+# --- info ---
+
+def info(args):
+    from src.ticks.store import TickStore
+
+    store = TickStore(args.dir)
+    symbols = _symbols(args.symbols) or store.symbols()
+    if not symbols:
+        print(f"No ticks recorded in {args.dir}")
+    for symbol in symbols:
+        s = store.summary(symbol)
+        print(f"📼 {symbol:<12} {s['ticks']:>10} ticks  {s['files']:>4} files  {s['chunks']:>6} chunks  "
+              f"{s['bytes'] / 1e6:>8.2f} MB ({s['bytes_per_tick']} B/tick)  "
+              f"{_format_msc(s['first_msc'])} -> {_format_msc(s['last_msc'])}")
+
+
+# --- replay ---
+
+async def replay(args):
+    fake_mt5 = _use_fake_terminal()
+
+    from src.services.bar_store import BarStore
+    from src.ticks.replay import ReplayEngine, ReplayMarket
+    from src.ticks.store import TickStore
+
+    history_dir = args.history if args.history is not None else os.environ.get("BAR_STORE_DIR", "")
+    market = ReplayMarket(
+        TickStore(args.dir), _symbols(args.symbols),
+        history=BarStore(history_dir) if history_dir else None,
+    )
+    fake_mt5.configure(symbols=market.symbols, market=market, now=market.start_msc / 1000)
+    print(f"▶️ Replaying {', '.join(market.symbols)}: {_format_msc(market.start_msc)} -> "
+          f"{_format_msc(market.end_msc)} at {'max' if not args.speed else f'{args.speed:g}x'} speed")
+
+    on_step = None
+    durations = []
+    bot = None
+    if args.bot:
+        from src.main_logic import TradingBot
+
+        bot = TradingBot()
+        await bot.mt5_service.initialize_async()
+
+        async def on_step(_time_msc):
+            started = time.perf_counter()
+            await bot.tick()
+            durations.append(time.perf_counter() - started)
+
+    server = None
+    if args.serve:
+        import uvicorn
+        from src.config.settings import settings
+        from src.main import app
+
+        server = uvicorn.Server(uvicorn.Config(app, host=settings.API_HOST, port=args.port, log_level="warning"))
+        serving = asyncio.create_task(server.serve())
+        print(f"🌐 API on http://{settings.API_HOST}:{args.port}/api")
+
+    try:
+        stats = await ReplayEngine(market, speed=args.speed).run(on_step, steps=args.steps)
+    finally:
+        if bot is not None:
+            bot.trade_service.pipeline.stop()
+        if server is not None:
+            server.should_exit = True
+            await serving
+
+    print(f"⏹️ {stats['steps']} steps, {stats['market_seconds']:.0f}s of market in {stats['wall_seconds']:.2f}s "
+          f"({stats['speedup']}x, max lag {stats['max_lag']}s)")
+    if durations:
+        ms = sorted(d * 1000 for d in durations)
+        print(f"🤖 TradingBot.tick: median {statistics.median(ms):.3f} ms  "
+              f"p95 {ms[min(len(ms) - 1, int(len(ms) * 0.95))]:.3f} ms  max {ms[-1]:.3f} ms  "
+              f"positions {len(fake_mt5.terminal.positions)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record MT5 ticks and replay them through the fake terminal")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rec = commands.add_parser("record", help="Record ticks into a tick store")
+    rec.add_argument("--dir", default=os.environ.get("TICK_STORE_DIR") or "ticks")
+    rec.add_argument("--symbols", default="", help="Comma-separated (default: WATCHLIST or SYMBOL)")
+    rec.add_argument("--duration", type=float, default=0.0, help="Seconds to record (0 = until Ctrl+C)")
+    rec.add_argument("--interval", type=float, default=None, help="Seconds between polls (default: TICK_RECORD_INTERVAL)")
+    rec.add_argument("--fake", action="store_true", help="Record the synthetic market of the fake terminal")
+
+    inf = commands.add_parser("info", help="Summary of a tick store")
+    inf.add_argument("--dir", default=os.environ.get("TICK_STORE_DIR") or "ticks")
+    inf.add_argument("--symbols", default="")
+
+    rep = commands.add_parser("replay", help="Replay recorded ticks through the fake terminal")
+    rep.add_argument("--dir", default=os.environ.get("TICK_STORE_DIR") or "ticks")
+    rep.add_argument("--symbols", default="", help="Comma-separated (default: every recorded symbol)")
+    rep.add_argument("--speed", type=float, default=1.0, help="1 = real time, N = N x faster, 0 = as fast as possible")
+    rep.add_argument("--steps", type=int, default=None, help="Stop after this many tick times")
+    rep.add_argument("--history", default=None, help="BarStore folder with the bars before the recording")
+    rep.add_argument("--bot", action="store_true", help="Run TradingBot.tick (SYMBOL) after every step")
+    rep.add_argument("--serve", action="store_true", help="Serve the API during the replay")
+    rep.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        if args.fake and not args.duration:
+            parser.error("record --fake needs --duration (simulated seconds)")
+        asyncio.run(record(args))
+    elif args.command == "info":
+        info(args)
+    else:
+        asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    main()
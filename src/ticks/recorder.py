@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+
+import MetaTrader5 as mt5
+import numpy as np
+
+from src.config.settings import settings
+from src.services.mt5_client import mt5_client
+from src.ticks.store import TickStore, to_ticks_dtype
+
+
+class TickRecorder:
+    """
+    Streams the ticks of the watchlist into a TickStore:
+    1. Every TICK_RECORD_INTERVAL seconds, copy_ticks_from(last recorded second) per
+       symbol on the MT5 thread, page after page of TICK_RECORD_BATCH until caught up.
+       Ticks already recorded (same second / same millisecond) are dropped.
+    2. New ticks are buffered in memory and written as one compressed chunk per symbol
+       every TICK_FLUSH_INTERVAL seconds or TICK_FLUSH_TICKS ticks (disk in a thread).
+    3. A restart resumes after the last stored tick; a fresh store starts at the
+       current tick.
+    """
+    def __init__(self, store: TickStore = None, symbols=None, interval: float = None):
+        self.store = store or TickStore(settings.TICK_STORE_DIR)
+        symbols = symbols or [entry.symbol for entry in settings.WATCHLIST] or [settings.SYMBOL]
+        self.symbols = list(dict.fromkeys(symbols))
+        self.interval = settings.TICK_RECORD_INTERVAL if interval is None else interval
+
+        self.cursors = {}  # symbol -> (last recorded time_msc, ticks recorded at that millisecond)
+        self.buffers = {symbol: [] for symbol in self.symbols}
+        self.buffered = 0
+        self.last_flush = time.monotonic()
+        self.stats = {"polls": 0, "ticks": 0, "written": 0, "flushes": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._task = None
+
+    # --- Lifecycle ---
+
+    def start(self):
+        if self._task is None or self._task.done():
+            print(f"🎙️ Recording ticks of {', '.join(self.symbols)} into {self.store.root}")
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stops polling and writes what is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+    async def run(self):
+        while True:
+            try:
+                await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"⚠️ Tick recording failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    # --- Polling ---
+
+    async def poll(self):
+        """One pass over the symbols; flushes when the buffer is big or old enough."""
+        for symbol in self.symbols:
+            await self._poll_symbol(symbol)
+        self.stats["polls"] += 1
+
+        if self.buffered >= settings.TICK_FLUSH_TICKS or time.monotonic() - self.last_flush >= settings.TICK_FLUSH_INTERVAL:
+            await asyncio.to_thread(self.flush)
+
+    async def _poll_symbol(self, symbol: str):
+        if symbol not in self.cursors:
+            cursor = await asyncio.to_thread(self._stored_cursor, symbol)
+            if cursor is None:
+                tick = await mt5_client.call("symbol_info_tick", symbol)
+                if tick is None:
+                    return  # Unknown symbol or no quotes yet: retried on the next poll
+                cursor = (int(tick.time_msc), 0)
+            self.cursors[symbol] = cursor
+
+        batch = settings.TICK_RECORD_BATCH
+        while True:
+            last_msc, _ = self.cursors[symbol]
+            ticks = await mt5_client.call("copy_ticks_from", symbol, last_msc // 1000, batch, mt5.COPY_TICKS_ALL)
+            if ticks is None or len(ticks) == 0:
+                return
+
+            new = self._after_cursor(symbol, ticks)
+            if len(new):
+                with self._lock:
+                    self.buffers[symbol].append(to_ticks_dtype(new).copy())
+                    self.buffered += len(new)
+                self.stats["ticks"] += len(new)
+            if len(ticks) < batch or len(new) == 0:
+                return
+
+    def _stored_cursor(self, symbol: str):
+        ticks = self.store.last_chunk(symbol)
+        if len(ticks) == 0:
+            return None
+        last_msc = int(ticks['time_msc'][-1])
+        return last_msc, int(np.count_nonzero(ticks['time_msc'] == last_msc))
+
+    def _after_cursor(self, symbol: str, ticks):
+        """
+        Drops the ticks already recorded and moves the cursor. copy_ticks_from works in
+        whole seconds and several ticks can share a millisecond, so the cursor also
+        counts the ticks recorded at its millisecond.
+        """
+        last_msc, seen = self.cursors[symbol]
+        times = ticks['time_msc']
+        first_same = int(times.searchsorted(last_msc, side="left"))
+        after_same = int(times.searchsorted(last_msc, side="right"))
+        new = ticks[min(first_same + seen, after_same):]
+        if len(new) == 0:
+            return new
+
+        # Pages are contiguous from a whole second: this one holds every recorded tick of its last ms
+        newest = int(times[-1])
+        self.cursors[symbol] = (newest, int(np.count_nonzero(times == newest)))
+        return new
+
+    # --- Writes ---
+
+    def flush(self):
+        """Writes the buffered ticks, one chunk per symbol (and UTC day)."""
+        with self._flush_lock:  # A stop() flush may overlap the last background one
+            with self._lock:  # Only swaps the buffers: the loop never waits for the disk
+                buffers = {symbol: parts for symbol, parts in self.buffers.items() if parts}
+                self.buffers = {symbol: [] for symbol in self.symbols}
+                self.buffered = 0
+                self.last_flush = time.monotonic()
+
+            for symbol, parts in buffers.items():
+                self.stats["written"] += self.store.append(symbol, np.concatenate(parts))
+            if buffers:
+                self.stats["flushes"] += 1
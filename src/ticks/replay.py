@@ -0,0 +1,219 @@
+"""
+Replay of recorded ticks through the fake MetaTrader5 terminal.
+
+    from src.testing import fake_mt5
+    from src.ticks.replay import ReplayEngine, ReplayMarket
+    from src.ticks.store import TickStore
+
+    market = ReplayMarket(TickStore("ticks"))
+    fake_mt5.install(symbols=market.symbols, market=market)
+    await ReplayEngine(market, speed=10).run()
+
+While the engine moves the fake clock from tick to tick, symbol_info_tick,
+copy_ticks_* and copy_rates_from_pos answer from the recording (bars are built from
+the ticks, the current one still forming), so TradingBot.tick, the scheduler and the
+chart endpoints run unchanged on the recorded market.
+"""
+import asyncio
+import time
+
+import numpy as np
+
+from src.strategy.candles import RATES_DTYPE
+from src.strategy.resample import ticks_to_bars
+from src.ticks.store import TICKS_DTYPE
+
+
+def _timeframe_seconds(timeframe) -> int:
+    # Same decoding as src.utils.get_timeframe_seconds (no MetaTrader5 import needed here)
+    timeframe = int(timeframe)
+    if timeframe & 0xC000 == 0xC000:
+        return 30 * 86400 * (timeframe & 0x3FFF)
+    if timeframe & 0x8000:
+        return 7 * 86400 * (timeframe & 0x3FFF)
+    if timeframe & 0x4000:
+        return 3600 * (timeframe & 0x3FFF)
+    return 60 * timeframe
+
+
+class _BarSeries:
+    """
+    Bars of one (symbol, timeframe) built once from all the recorded ticks, plus the
+    index of the first tick of each bar, so the bars visible at any clock are a
+    prefix of `bars` and only the forming bar is rebuilt per call.
+    Older bars of a BarStore (history before the recording) come first.
+    """
+    def __init__(self, ticks, seconds: int, point: float, history=None):
+        self.ticks = ticks
+        self.seconds = seconds
+        self.point = point
+
+        bars, starts = ticks_to_bars(ticks, seconds, point, RATES_DTYPE)
+
+        if history is not None and len(history):
+            first = bars['time'][0] if len(bars) else np.iinfo(np.int64).max
+            history = np.asarray(history[history['time'] < first], dtype=RATES_DTYPE)
+        else:
+            history = np.empty(0, dtype=RATES_DTYPE)
+
+        self.offset = len(history)
+        self.bars = np.concatenate((history, bars))
+        self.starts = starts
+
+    def rates(self, visible: int, pos: int, count: int):
+        """Last `count` bars (skipping `pos`) when the first `visible` ticks happened."""
+        if visible == 0:
+            closed, forming = self.offset, None
+        else:
+            k = int(self.starts.searchsorted(visible - 1, side="right")) - 1  # Bar of the last visible tick
+            closed = self.offset + k
+            forming = self._forming(int(self.starts[k]), visible, self.bars[closed])
+
+        total = closed + (forming is not None)
+        end = total - pos
+        start = max(0, end - count)
+        if end <= 0:
+            return np.empty(0, dtype=RATES_DTYPE)
+
+        out = self.bars[start:min(end, closed)].copy()
+        if forming is not None and end == total:
+            out = np.append(out, forming)
+        return out
+
+    def _forming(self, first: int, visible: int, template):
+        ticks = self.ticks[first:visible]
+        bid = ticks['bid']
+        bar = template.copy()
+        bar['open'] = bid[0]
+        bar['high'] = bid.max()
+        bar['low'] = bid.min()
+        bar['close'] = bid[-1]
+        bar['tick_volume'] = len(ticks)
+        bar['spread'] = round((ticks['ask'][-1] - bid[-1]) / self.point)
+        bar['real_volume'] = ticks['volume'].sum()
+        return bar
+
+
+class ReplayMarket:
+    """
+    Recorded ticks of a TickStore (optionally limited to [start_msc, end_msc]) in the
+    form the fake terminal asks for. `history` (a BarStore) provides the bars from
+    before the recording, so indicators have their full window from the first tick.
+    """
+    def __init__(self, store, symbols=None, start_msc: int = None, end_msc: int = None, history=None):
+        from src.testing.fake_mt5 import Tick, _base_price
+
+        self._tick_type = Tick
+        self.history = history
+        self.recorded = {}  # symbol -> ticks (ticks() is the copy_ticks_* hook)
+        for symbol in symbols or store.symbols():
+            ticks = store.read(symbol, start_msc, end_msc)
+            if len(ticks):
+                self.recorded[symbol] = np.asarray(ticks, dtype=TICKS_DTYPE)
+        if not self.recorded:
+            raise ValueError(f"No recorded ticks in {store.root} for the requested symbols / range.")
+
+        self.symbols = tuple(self.recorded)
+        self.points = {symbol: _base_price(symbol)[2] for symbol in self.symbols}
+        self.series = {}
+
+    @property
+    def start_msc(self) -> int:
+        return min(int(ticks['time_msc'][0]) for ticks in self.recorded.values())
+
+    @property
+    def end_msc(self) -> int:
+        return max(int(ticks['time_msc'][-1]) for ticks in self.recorded.values())
+
+    def event_times(self):
+        """Sorted distinct time_msc of every recorded tick (the replay steps)."""
+        return np.unique(np.concatenate([ticks['time_msc'] for ticks in self.recorded.values()]))
+
+    def _visible(self, symbol: str, now: float) -> int:
+        ticks = self.recorded.get(symbol)
+        if ticks is None:
+            return 0
+        return int(ticks['time_msc'].searchsorted(int(round(now * 1000)), side="right"))
+
+    # --- Terminal hooks (see FakeTerminal.market) ---
+
+    def tick(self, symbol: str, now: float):
+        visible = self._visible(symbol, now)
+        if visible == 0:
+            return None
+        t = self.recorded[symbol][visible - 1]
+        return self._tick_type(
+            int(t['time']), float(t['bid']), float(t['ask']), float(t['last']), int(t['volume']),
+            int(t['time_msc']), int(t['flags']), float(t['volume_real']),
+        )
+
+    def ticks(self, symbol: str, start_msc: int, end_msc: int, count: int = None):
+        ticks = self.recorded.get(symbol)
+        if ticks is None:
+            return np.empty(0, dtype=TICKS_DTYPE)
+        times = ticks['time_msc']
+        lo = int(times.searchsorted(start_msc, side="left"))
+        hi = int(times.searchsorted(end_msc, side="right"))
+        if count is not None:
+            hi = min(hi, lo + count)
+        return ticks[lo:hi].copy()
+
+    def rates(self, symbol: str, timeframe, pos: int, count: int, now: float):
+        key = (symbol, int(timeframe))
+        series = self.series.get(key)
+        if series is None:
+            history = self.history.bars(symbol, timeframe) if self.history is not None else None
+            series = _BarSeries(self.recorded.get(symbol, np.empty(0, dtype=TICKS_DTYPE)),
+                                _timeframe_seconds(timeframe), self.points.get(symbol, 0.00001), history)
+            self.series[key] = series
+        return series.rates(self._visible(symbol, now), pos, count)
+
+
+class ReplayEngine:
+    """
+    Moves the fake terminal's clock through the recorded ticks:
+    - speed=1: real time, speed=N: N x faster (sleeps between ticks)
+    - speed=0: as fast as possible (no sleeping, one step per distinct tick time)
+    on_step(time_msc), if given, is awaited after every clock move (e.g. TradingBot.tick);
+    when it is slower than the recording the replay falls behind (see stats["max_lag"]).
+    """
+    def __init__(self, market: ReplayMarket, speed: float = 1.0):
+        self.market = market
+        self.speed = speed
+        self.stats = {"steps": 0, "wall_seconds": 0.0, "market_seconds": 0.0, "speedup": 0.0, "max_lag": 0.0}
+
+    async def run(self, on_step=None, steps: int = None):
+        from src.testing import fake_mt5
+
+        times = self.market.event_times()
+        if steps is not None:
+            times = times[:steps]
+        if len(times) == 0:
+            return self.stats
+
+        base = int(times[0])
+        started = time.perf_counter()
+        for time_msc in times.tolist():
+            if self.speed:
+                delay = started + (time_msc - base) / 1000 / self.speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.stats["max_lag"] = max(self.stats["max_lag"], -delay)
+            fake_mt5.terminal.now = time_msc / 1000
+            self.stats["steps"] += 1
+
+            if on_step is not None:
+                await on_step(time_msc)
+            else:
+                await asyncio.sleep(0)  # Lets the API / bot tasks see every step
+
+        wall = time.perf_counter() - started
+        market = (int(times[-1]) - base) / 1000
+        self.stats.update(
+            wall_seconds=round(wall, 3),
+            market_seconds=market,
+            speedup=round(market / wall, 1) if wall else 0.0,
+            max_lag=round(self.stats["max_lag"], 4),
+        )
+        return self.stats
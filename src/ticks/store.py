@@ -0,0 +1,209 @@
+import datetime
+import os
+import struct
+import zlib
+
+import numpy as np
+
+# Layout of mt5.copy_ticks_from / copy_ticks_range records
+TICKS_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('last', '<f8'),
+    ('volume', '<u8'),
+    ('time_msc', '<i8'),
+    ('flags', '<u4'),
+    ('volume_real', '<f8'),
+])
+
+# Stored per chunk, column after column ('time' is time_msc // 1000, not stored)
+_COLUMNS = ('time_msc', 'bid', 'ask', 'last', 'volume', 'flags', 'volume_real')
+
+# magic, tick count, payload size, first time_msc, last time_msc
+_HEADER = struct.Struct("<4sIIqq")
+_MAGIC = b"TCK1"
+_COMPRESSION = 6
+_DAY_MSC = 86_400_000
+
+
+def to_ticks_dtype(ticks):
+    """Copies any MT5-like ticks array into TICKS_DTYPE (missing fields stay 0)."""
+    ticks = np.asarray(ticks)
+    if ticks.dtype == TICKS_DTYPE:
+        return ticks
+    out = np.zeros(len(ticks), dtype=TICKS_DTYPE)
+    for name in TICKS_DTYPE.names:
+        if name in ticks.dtype.names:
+            out[name] = ticks[name]
+    return out
+
+
+def _encode(ticks) -> bytes:
+    # Columns compress far better than interleaved records; time_msc as deltas
+    columns = [np.diff(ticks['time_msc'], prepend=ticks['time_msc'][0]).tobytes()]
+    columns += [np.ascontiguousarray(ticks[name]).tobytes() for name in _COLUMNS[1:]]
+    return zlib.compress(b"".join(columns), _COMPRESSION)
+
+
+def _decode(payload: bytes, count: int, first_msc: int):
+    raw = zlib.decompress(payload)
+    ticks = np.empty(count, dtype=TICKS_DTYPE)
+    offset = 0
+    for name in _COLUMNS:
+        dtype = TICKS_DTYPE[name]
+        ticks[name] = np.frombuffer(raw, dtype=dtype, count=count, offset=offset)
+        offset += count * dtype.itemsize
+    ticks['time_msc'] = first_msc + np.cumsum(ticks['time_msc'])
+    ticks['time'] = ticks['time_msc'] // 1000
+    return ticks
+
+
+class TickStore:
+    """
+    Append-only on-disk tick history, one folder per symbol and one file per UTC day.
+
+    A file is a sequence of independent zlib-compressed chunks (one per batched
+    write), each prefixed by a header with its tick count and time range, so reads
+    skip the chunks outside the requested range without decompressing them.
+    A chunk cut short by a crash is ignored on read and overwritten by the next append.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self._index = {}  # path -> (file size, [(offset, count, size, first_msc, last_msc)])
+
+    def path(self, symbol: str, day: datetime.date) -> str:
+        return os.path.join(self.root, symbol, f"{day.isoformat()}.ticks")
+
+    def symbols(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def files(self, symbol: str):
+        folder = os.path.join(self.root, symbol)
+        if not os.path.isdir(folder):
+            return []
+        return [os.path.join(folder, name) for name in sorted(os.listdir(folder)) if name.endswith(".ticks")]
+
+    # --- Chunk index ---
+
+    def chunks(self, path: str):
+        """[(offset, count, size, first_msc, last_msc)] of the complete chunks of a file."""
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        cached = self._index.get(path)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+
+        chunks = []
+        with open(path, "rb") as f:
+            offset = 0
+            while offset + _HEADER.size <= size:
+                f.seek(offset)
+                magic, count, length, first, last = _HEADER.unpack(f.read(_HEADER.size))
+                end = offset + _HEADER.size + length
+                if magic != _MAGIC or end > size:
+                    break  # Torn write: the rest of the file is not a valid chunk
+                chunks.append((offset, count, length, first, last))
+                offset = end
+        self._index[path] = (size, chunks)
+        return chunks
+
+    @staticmethod
+    def _valid_size(chunks) -> int:
+        if not chunks:
+            return 0
+        offset, _, length, _, _ = chunks[-1]
+        return offset + _HEADER.size + length
+
+    # --- Reads ---
+
+    def iter_chunks(self, symbol: str, start_msc: int = None, end_msc: int = None):
+        """Yields the decoded chunks overlapping [start_msc, end_msc], oldest first."""
+        for path in self.files(symbol):
+            day = datetime.date.fromisoformat(os.path.basename(path)[:-len(".ticks")])
+            day_msc = int(datetime.datetime(day.year, day.month, day.day, tzinfo=datetime.timezone.utc).timestamp()) * 1000
+            if end_msc is not None and day_msc > end_msc:
+                break
+            if start_msc is not None and day_msc + _DAY_MSC <= start_msc:
+                continue
+
+            chunks = self.chunks(path)
+            with open(path, "rb") as f:
+                for offset, count, length, first, last in chunks:
+                    if (start_msc is not None and last < start_msc) or (end_msc is not None and first > end_msc):
+                        continue
+                    f.seek(offset + _HEADER.size)
+                    yield _decode(f.read(length), count, first)
+
+    def read(self, symbol: str, start_msc: int = None, end_msc: int = None):
+        """Ticks with start_msc <= time_msc <= end_msc, as one TICKS_DTYPE array."""
+        parts = list(self.iter_chunks(symbol, start_msc, end_msc))
+        if not parts:
+            return np.empty(0, dtype=TICKS_DTYPE)
+        ticks = np.concatenate(parts)
+        times = ticks['time_msc']
+        lo = 0 if start_msc is None else int(times.searchsorted(start_msc, side="left"))
+        hi = len(ticks) if end_msc is None else int(times.searchsorted(end_msc, side="right"))
+        return ticks[lo:hi]
+
+    def last_chunk(self, symbol: str):
+        """Ticks of the newest chunk (empty array if nothing is stored)."""
+        for path in reversed(self.files(symbol)):
+            chunks = self.chunks(path)
+            if chunks:
+                offset, count, length, first, _ = chunks[-1]
+                with open(path, "rb") as f:
+                    f.seek(offset + _HEADER.size)
+                    return _decode(f.read(length), count, first)
+        return np.empty(0, dtype=TICKS_DTYPE)
+
+    def summary(self, symbol: str):
+        """Files, chunks, ticks, time range and bytes on disk of a symbol."""
+        files = self.files(symbol)
+        chunks = [chunk for path in files for chunk in self.chunks(path)]
+        ticks = sum(chunk[1] for chunk in chunks)
+        size = sum(os.path.getsize(path) for path in files)
+        return {
+            "symbol": symbol,
+            "files": len(files),
+            "chunks": len(chunks),
+            "ticks": ticks,
+            "first_msc": chunks[0][3] if chunks else None,
+            "last_msc": chunks[-1][4] if chunks else None,
+            "bytes": size,
+            "bytes_per_tick": round(size / ticks, 2) if ticks else None,
+        }
+
+    # --- Writes ---
+
+    def append(self, symbol: str, ticks) -> int:
+        """
+        Writes `ticks` (sorted by time_msc, newer than the stored ones) as one chunk
+        per UTC day they cover. Returns the number of ticks written.
+        """
+        if ticks is None or len(ticks) == 0:
+            return 0
+
+        ticks = to_ticks_dtype(ticks)
+        days = ticks['time_msc'] // _DAY_MSC
+        bounds = np.flatnonzero(np.diff(days)) + 1
+        for part in np.split(ticks, bounds):
+            day = datetime.datetime.fromtimestamp(int(part['time_msc'][0]) // 1000, datetime.timezone.utc).date()
+            self._write_chunk(self.path(symbol, day), part)
+        return len(ticks)
+
+    def _write_chunk(self, path: str, ticks):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = _encode(ticks)
+        header = _HEADER.pack(_MAGIC, len(ticks), len(payload), int(ticks['time_msc'][0]), int(ticks['time_msc'][-1]))
+
+        chunks = self.chunks(path) if os.path.exists(path) else []
+        offset = self._valid_size(chunks)
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.seek(offset)
+            f.truncate()  # Drops a torn chunk left by a crash
+            f.write(header + payload)
+
+        chunks = chunks + [(offset, len(ticks), len(payload), int(ticks['time_msc'][0]), int(ticks['time_msc'][-1]))]
+        self._index[path] = (offset + len(header) + len(payload), chunks)
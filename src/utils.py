@@ -1,13 +1,29 @@
 import MetaTrader5 as mt5
 
+TIMEFRAMES = {
+    "M1": mt5.TIMEFRAME_M1,
+    "M5": mt5.TIMEFRAME_M5,
+    "M15": mt5.TIMEFRAME_M15,
+    "M30": mt5.TIMEFRAME_M30,
+    "H1": mt5.TIMEFRAME_H1,
+    "H4": mt5.TIMEFRAME_H4,
+    "D1": mt5.TIMEFRAME_D1,
+}
+
 def get_mt5_timeframe(tf_str: str):
-    mapping = {
-        "M1": mt5.TIMEFRAME_M1,
-        "M5": mt5.TIMEFRAME_M5,
-        "M15": mt5.TIMEFRAME_M15,
-        "M30": mt5.TIMEFRAME_M30,
-        "H1": mt5.TIMEFRAME_H1,
-        "H4": mt5.TIMEFRAME_H4,
-        "D1": mt5.TIMEFRAME_D1,
-    }
-    return mapping.get(tf_str.upper(), mt5.TIMEFRAME_M5) # Default M5
\ No newline at end of file
+    return TIMEFRAMES.get(tf_str.upper(), mt5.TIMEFRAME_M5) # Default M5
+
+def get_timeframe_seconds(timeframe) -> int:
+    """
+    Duration of one bar in seconds for a MT5 timeframe constant.
+    MT5 encodes minutes directly, hours as 0x4000 | hours, weeks as 0x8000 | weeks
+    and months as 0xC000 | months (a month is approximated to 30 days).
+    """
+    timeframe = int(timeframe)
+    if timeframe & 0xC000 == 0xC000:
+        return 30 * 86400 * (timeframe & 0x3FFF)
+    if timeframe & 0x8000:
+        return 7 * 86400 * (timeframe & 0x3FFF)
+    if timeframe & 0x4000:
+        return 3600 * (timeframe & 0x3FFF)
+    return 60 * timeframe
@@ -0,0 +1,11 @@
+import os
+
+# Settings need the MT5 credentials; the fake terminal replaces MetaTrader5 (Linux/macOS CI)
+os.environ.setdefault("MT5_LOGIN", "1")
+os.environ.setdefault("MT5_PASSWORD", "test")
+os.environ.setdefault("MT5_SERVER", "Fake-Server")
+os.environ["TELEGRAM_TOKEN"] = ""
+
+from src.testing import fake_mt5  # noqa: E402
+
+fake_mt5.install()
@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from src.testing import fake_mt5
+
+fake_mt5.install()  # Also runs in the spawned workers, which import this module for run_fake_worker
+
+from src.config.settings import settings, AccountConfig  # noqa: E402
+from src.services.account_supervisor import AccountSupervisor  # noqa: E402
+from src.services.account_worker import run_worker  # noqa: E402
+from src.services.mt5_client import MT5TimeoutError  # noqa: E402
+from src.strategy.candles import RATES_DTYPE  # noqa: E402
+
+
+def run_fake_worker(*args):
+    """Worker process entry point on the fake terminal."""
+    fake_mt5.configure(now=1_700_000_000)
+    run_worker(*args)
+
+
+ACCOUNT = AccountConfig(name="demo", login=1, password="test", server="Fake-Server")
+
+
+@pytest.fixture
+def fast_supervision(monkeypatch):
+    monkeypatch.setattr(settings, "WORKER_HEARTBEAT_INTERVAL", 0.1)
+    monkeypatch.setattr(settings, "WORKER_SHM_SLOTS", 2)
+    monkeypatch.setattr(settings, "WORKER_SHM_BARS", 50)
+
+
+async def wait_until(condition, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.05)
+
+
+def test_worker_commands_crash_and_restart(fast_supervision):
+    async def run():
+        supervisor = AccountSupervisor([ACCOUNT], target=run_fake_worker)
+        supervisor.start()
+        handle = supervisor.get("demo")
+        try:
+            assert (await handle.call("ping", timeout=30))["connected"]
+
+            # Fits a slot: copied through shared memory; bigger: through the pipe
+            small = await handle.get_rates("EURUSDm", fake_mt5.TIMEFRAME_M5, 20)
+            large = await handle.get_rates("EURUSDm", fake_mt5.TIMEFRAME_M5, 120)
+            assert small.dtype == RATES_DTYPE and len(small) == 20
+            assert len(large) == 120
+            assert np.array_equal(small, large[-20:])
+            assert handle.free_slots.qsize() == 2  # Slots returned to the pool
+
+            order = await handle.send_order("BUY", "EURUSDm", 0.01)
+            assert order["retcode"] == fake_mt5.TRADE_RETCODE_DONE
+
+            # Crash: pending / new calls fail fast, the supervisor restarts the process
+            pid = handle.process.pid
+            handle.kill()
+            await wait_until(lambda: handle.restarts == 1 and handle.alive)
+            assert handle.process.pid != pid
+            assert handle.last_exit is not None and handle.last_exit != 0
+            assert handle.failures == 1  # Next crash waits 2s instead of 1s
+            assert (await handle.call("ping", timeout=30))["connected"]
+        finally:
+            await supervisor.stop()
+        assert not handle.alive
+
+    asyncio.run(run())
+
+
+class BusyHandle:
+    """Handle whose pings always time out (worker busy or hung)."""
+    name = "busy"
+    alive = True
+    process = None
+    failures = 0
+    restarts = 0
+    last_exit = None
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.last_reply = time.monotonic()
+        self.killed = False
+
+    def silent_for(self):
+        return time.monotonic() - self.last_reply
+
+    async def call(self, command, timeout=None):
+        await asyncio.sleep(0.01)
+        raise MT5TimeoutError("ping")
+
+    def kill(self):
+        self.killed = True
+        self.alive = False
+
+    def start(self):
+        self.alive = True
+
+
+def test_busy_worker_is_not_killed(monkeypatch):
+    monkeypatch.setattr(settings, "WORKER_HEARTBEAT_INTERVAL", 0.02)
+    monkeypatch.setattr(settings, "WORKER_CALL_TIMEOUT", 1.0)
+
+    async def run():
+        handle = BusyHandle()
+        task = asyncio.create_task(AccountSupervisor([])._supervise(handle))
+        try:
+            # Other commands keep answering: the queued ping is not a hang
+            for _ in range(20):
+                handle.last_reply = time.monotonic()
+                await asyncio.sleep(0.02)
+            assert not handle.killed
+
+            # Nothing answered for WORKER_CALL_TIMEOUT: hung
+            handle.last_reply -= 2.0
+            await wait_until(lambda: handle.killed, timeout=5)
+        finally:
+            task.cancel()
+
+    asyncio.run(run())
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from src.strategy.candles import RATES_DTYPE
+
+pytest.importorskip("pandas_ta")  # src.backtest.engine
+from src.backtest.engine import BacktestConfig, simulate  # noqa: E402
+
+# point 0.0001, 0.1 lot of 100000: one point is worth exactly 1.0
+CONFIG = dict(point=0.0001, volume=0.1, contract_size=100000, initial_balance=10000.0)
+OPENS = [1.1000, 1.1010, 1.1020, 1.1030, 1.1040, 1.1060, 1.1050, 1.1040]
+
+
+def make_bars(opens=OPENS, spread=2):
+    bars = np.zeros(len(opens), dtype=RATES_DTYPE)
+    bars['time'] = 1_700_000_100 + 300 * np.arange(len(opens))
+    bars['open'] = opens
+    bars['close'] = opens[1:] + [opens[-1] - 0.0010]  # Each bar closes at the next open
+    bars['high'] = np.maximum(bars['open'], bars['close']) + 0.0002
+    bars['low'] = np.minimum(bars['open'], bars['close']) - 0.0002
+    bars['spread'] = spread
+    return bars
+
+
+def signals(n, buy=(), sell=()):
+    buy_mask, sell_mask = np.zeros(n, bool), np.zeros(n, bool)
+    buy_mask[list(buy)] = True
+    sell_mask[list(sell)] = True
+    return buy_mask, sell_mask
+
+
+def test_long_trade_fills_at_ask_with_slippage_and_exits_on_opposite_signal():
+    bars = make_bars()
+    result = simulate(bars, *signals(8, buy=[1], sell=[4]), BacktestConfig(**CONFIG, slippage_points=1))
+
+    [trade] = result.trades
+    assert trade["direction"] == "BUY"
+    assert trade["entry_bar"] == 2 and trade["exit_bar"] == 5 and trade["exit_reason"] == "signal"
+    assert trade["entry_price"] == pytest.approx(1.1020 + 0.0002 + 0.0001)  # open + spread + slippage
+    assert trade["exit_price"] == pytest.approx(1.1060 - 0.0001)            # bid open - slippage
+    assert trade["profit"] == pytest.approx(36.0)
+
+    # Marked to market while open, realized from the exit bar on
+    assert result.equity == pytest.approx([10000, 10000, 10007, 10017, 10037, 10036, 10036, 10036])
+    assert result.stats["net_profit"] == pytest.approx(36.0)
+    assert result.stats["max_drawdown"] == pytest.approx(1.0)
+    assert result.stats["win_rate"] == 1.0
+
+
+def test_one_position_per_symbol():
+    bars = make_bars()
+    config = BacktestConfig(**CONFIG, exit_on_opposite=False, spread_points=5)
+    result = simulate(bars, *signals(8, buy=[1, 2, 3], sell=[2]), config)
+
+    # Repeated buys and the sell are ignored while the long is open; it runs to the end
+    [trade] = result.trades
+    assert trade["entry_price"] == pytest.approx(1.1020 + 0.0005)  # Fixed spread_points
+    assert trade["exit_reason"] == "end" and trade["exit_bar"] == 7
+    assert trade["exit_price"] == pytest.approx(1.1030)           # Last close (bid)
+    assert trade["profit"] == pytest.approx(5.0)
+
+
+def test_buy_wins_when_both_signals_fire():
+    result = simulate(make_bars(), *signals(8, buy=[1], sell=[1, 5]), BacktestConfig(**CONFIG))
+    assert [t["direction"] for t in result.trades] == ["BUY"]
+    assert result.trades[0]["exit_bar"] == 6
+
+
+def test_short_trade_hits_sl_before_tp_in_the_same_bar():
+    bars = make_bars()
+    bars['high'][3], bars['low'][3] = 1.1040, 1.0990  # Both levels inside bar 3
+    config = BacktestConfig(**CONFIG, sl_points=15, tp_points=15)
+    result = simulate(bars, *signals(8, sell=[1]), config)
+
+    [trade] = result.trades
+    assert trade["direction"] == "SELL"
+    assert trade["entry_price"] == pytest.approx(1.1020)  # Shorts fill at bid
+    assert trade["exit_bar"] == 3 and trade["exit_reason"] == "sl"
+    assert trade["exit_price"] == pytest.approx(1.1035)
+    assert trade["profit"] == pytest.approx(-15.0)
+
+
+def test_take_profit():
+    config = BacktestConfig(**CONFIG, tp_points=25, spread_points=0)
+    result = simulate(make_bars(), *signals(8, buy=[1]), config)
+
+    [trade] = result.trades
+    assert trade["exit_reason"] == "tp" and trade["exit_bar"] == 4  # First high >= 1.1045
+    assert trade["profit"] == pytest.approx(25.0)
+
+
+def test_slippage_above_deviation_rejects_every_order():
+    config = BacktestConfig(**CONFIG, slippage_points=30, deviation=20)
+    result = simulate(make_bars(), *signals(8, buy=[1, 7], sell=[3]), config)
+    assert result.trades == []
+    assert result.stats["rejected_orders"] == 2  # A signal on the last bar has no next open
+    assert result.equity == pytest.approx([10000] * 8)
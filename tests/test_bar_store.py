@@ -0,0 +1,64 @@
+import numpy as np
+
+from src.services.bar_store import BarStore
+from src.strategy.candles import RATES_DTYPE
+from src.testing import fake_mt5
+
+M5 = 5
+
+
+def make_bars(times):
+    bars = np.zeros(len(times), dtype=RATES_DTYPE)
+    bars['time'] = times
+    bars['close'] = 1.1 + np.arange(len(times)) * 0.001
+    return bars
+
+
+def test_forming_bar_is_overwritten(tmp_path):
+    store = BarStore(str(tmp_path))
+    assert store.append("EURUSDm", M5, make_bars([0, 300, 600])) == 3
+
+    forming = make_bars([600, 900])
+    forming['close'] = [2.0, 3.0]
+    assert store.append("EURUSDm", M5, forming) == 2
+
+    bars = store.bars("EURUSDm", M5)
+    assert bars['time'].tolist() == [0, 300, 600, 900]
+    assert bars['close'].tolist()[2:] == [2.0, 3.0]
+
+
+def test_torn_record_is_cut_off(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.append("EURUSDm", M5, make_bars([300 * i for i in range(5)]))
+    with open(store.path("EURUSDm", M5), "ab") as f:
+        f.write(b"\xff" * 20)  # Crash in the middle of a record
+
+    assert store.count("EURUSDm", M5) == 5
+    assert store.append("EURUSDm", M5, make_bars([1500, 1800])) == 2
+    assert store.append("EURUSDm", M5, make_bars([1800])) == 1  # Forming bar update
+
+    bars = store.bars("EURUSDm", M5)
+    assert bars['time'].tolist() == [300 * i for i in range(7)]
+    assert np.asarray(bars).tobytes() == open(store.path("EURUSDm", M5), "rb").read()
+
+
+def test_backfill_with_bars_closing_between_fetches(tmp_path):
+    fake_mt5.configure(now=1_700_000_000)
+    fake_mt5.initialize()
+    store = BarStore(str(tmp_path))
+    store.backfill("EURUSDm", M5, fake_mt5.copy_rates_from_pos, max_bars=100)
+
+    fake_mt5.advance(50 * 300)
+
+    def fetch_from_pos(symbol, timeframe, pos, count):
+        rates = fake_mt5.copy_rates_from_pos(symbol, timeframe, pos, count)
+        fake_mt5.advance(300)  # A bar closes before the next chunk is fetched
+        return rates
+
+    store.backfill("EURUSDm", M5, fetch_from_pos, chunk=10)
+
+    times = np.asarray(store.bars("EURUSDm", M5)['time'])
+    assert np.all(np.diff(times) == 300)
+    expected = fake_mt5.copy_rates_from_pos("EURUSDm", M5, 0, len(times) + 10)
+    assert set(times.tolist()) <= set(expected['time'].tolist())
+    assert len(store.range("EURUSDm", M5, int(times[-20]), int(times[-1]))) == 20
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from src.services.candle_cache import CandleCache
+from src.strategy.candles import SMA_PERIOD, rolling_sma
+from src.testing import fake_mt5
+
+SYMBOL = "EURUSDm"
+
+
+@pytest.fixture(autouse=True)
+def terminal():
+    terminal = fake_mt5.configure(now=1_700_000_000)
+    fake_mt5.initialize()
+    return terminal
+
+
+def assert_matches_terminal(cache, timeframe, count):
+    rates, sma = cache.get_window(SYMBOL, timeframe, count)
+    fresh = fake_mt5.copy_rates_from_pos(SYMBOL, timeframe, 0, count)
+    np.testing.assert_array_equal(rates, fresh)
+
+    expected = rolling_sma(np.asarray(fresh['close'], dtype=np.float64), SMA_PERIOD)
+    np.testing.assert_allclose(sma, expected, rtol=0, atol=1e-12, equal_nan=True)
+
+
+@pytest.mark.parametrize("timeframe", [fake_mt5.TIMEFRAME_M1, fake_mt5.TIMEFRAME_M5])
+def test_window_follows_the_terminal(timeframe):
+    cache = CandleCache(resample_from_m1=False)
+    assert_matches_terminal(cache, timeframe, 100)
+
+    seconds = 60 if timeframe == fake_mt5.TIMEFRAME_M1 else 300
+    series = cache.series[(SYMBOL, timeframe)]
+
+    # Forming bar updates (same bar time), single and multi-bar closes
+    for step in [10, 20, 30, seconds + 1, seconds, seconds - 1, 1, 7 * seconds + 17]:
+        fake_mt5.advance(step)
+        assert_matches_terminal(cache, timeframe, 100)
+
+    # Wrap-around: far more bars pushed one by one than the buffer holds
+    for _ in range(250):
+        fake_mt5.advance(seconds / 2)
+        assert_matches_terminal(cache, timeframe, 100)
+    assert series.start != 0
+    assert cache.stats["warmups"] == 1
+
+    # A gap longer than the buffer re-warms instead of merging
+    fake_mt5.advance(500 * seconds)
+    assert_matches_terminal(cache, timeframe, 100)
+    assert cache.stats["warmups"] == 2
+
+
+def test_forming_bar_is_replaced_not_appended():
+    cache = CandleCache(resample_from_m1=False)
+    rates, _ = cache.get_window(SYMBOL, fake_mt5.TIMEFRAME_M5, 50)
+    last_time = int(rates['time'][-1])
+
+    fake_mt5.advance(1)  # 1_700_000_000 is 200s into its M5 bar: still the same bar
+    rates, _ = cache.get_window(SYMBOL, fake_mt5.TIMEFRAME_M5, 50)
+    assert int(rates['time'][-1]) == last_time
+    assert cache.series[(SYMBOL, fake_mt5.TIMEFRAME_M5)].size == 50
+    np.testing.assert_array_equal(rates, fake_mt5.copy_rates_from_pos(SYMBOL, fake_mt5.TIMEFRAME_M5, 0, 50))
+
+
+def test_larger_window_rewarms():
+    cache = CandleCache(resample_from_m1=False)
+    assert_matches_terminal(cache, fake_mt5.TIMEFRAME_M5, 50)
+    assert_matches_terminal(cache, fake_mt5.TIMEFRAME_M5, 200)
+    assert cache.stats["warmups"] == 2
+    fake_mt5.advance(900)
+    assert_matches_terminal(cache, fake_mt5.TIMEFRAME_M5, 120)
@@ -0,0 +1,56 @@
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.bot_instance import global_bot
+from src.main import app
+from src.router import candle_stream
+from src.testing import fake_mt5
+
+
+@pytest.fixture
+def client():
+    # Fresh terminal: the API's service reconnects and rebuilds its candle cache
+    fake_mt5.configure(now=1_700_000_000)
+    global_bot.mt5_service.connected = False
+    global_bot.mt5_service.candle_cache.invalidate()
+    return TestClient(app)
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_websocket_snapshot_then_deltas(client):
+    with client.websocket_connect("/api/ws/candles?symbol=EURUSDm&timeframe=M1") as ws:
+        snapshot = json.loads(ws.receive_text())
+        assert snapshot["type"] == "snapshot"
+        assert snapshot["symbol"] == "EURUSDm"
+        assert len(snapshot["candles"]) == 100
+        last_time = snapshot["candles"][-1]["time"]
+
+        fake_mt5.advance(60)  # The forming M1 bar closes and a new one opens
+        message = json.loads(ws.receive_text())
+        while message["type"] != "append":
+            assert message["type"] in ("patch", "update")
+            message = json.loads(ws.receive_text())
+        assert message["candle"]["time"] == last_time + 60
+
+    # The channel (and its poll task) goes away with its last subscriber
+    assert wait_for(lambda: not candle_stream.channels)
+
+
+def test_websocket_disconnect_on_idle_market(client):
+    with client.websocket_connect("/api/ws/candles?symbol=EURUSDm&timeframe=M5") as ws:
+        assert json.loads(ws.receive_text())["type"] == "snapshot"
+        assert ("EURUSDm", fake_mt5.TIMEFRAME_M5) in candle_stream.channels
+        # Frozen clock: nothing more is sent, so only reading the socket notices the client left
+        ws.close()
+        assert wait_for(lambda: not candle_stream.channels)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from src.strategy.candles import RATES_DTYPE, SMA_PERIOD, V_SHAPE_COOLDOWN, build_candles
+
+
+def synthetic_rates(n: int, seed: int):
+    """Seeded random walk with volume spikes and back-to-back V-Shapes (cooldown edges)."""
+    rng = np.random.default_rng(seed)
+    rates = np.zeros(n, dtype=RATES_DTYPE)
+    rates['time'] = 1_700_000_000 + 300 * np.arange(n)
+    open_ = 1.1 + np.cumsum(rng.normal(0, 0.0005, n))
+    close = open_ + rng.normal(0, 0.0005, n)
+
+    # Big red + strong green pairs, some closer together than the cooldown
+    for i in range(1, n, max(2, V_SHAPE_COOLDOWN - 1 + seed % 3)):
+        if rng.random() < 0.5:
+            close[i - 1] = open_[i - 1] - 0.003
+            close[i] = open_[i] + 0.003 * rng.uniform(0.7, 1.2)
+
+    rates['open'] = open_
+    rates['close'] = close
+    rates['high'] = np.maximum(open_, close) + rng.uniform(0, 0.0005, n)
+    rates['low'] = np.minimum(open_, close) - rng.uniform(0, 0.0005, n)
+    volume = rng.integers(50, 150, n)
+    volume[rng.random(n) < 0.1] *= 3  # VSA climax bars
+    rates['tick_volume'] = volume
+    rates['spread'] = 10
+    return rates
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, SMA_PERIOD - 1, SMA_PERIOD, SMA_PERIOD + 1, 100, 1000])
+@pytest.mark.parametrize("seed", range(5))
+def test_vectorized_matches_loop(n, seed):
+    rates = synthetic_rates(n, seed)
+    assert build_candles(rates, engine="vectorized") == build_candles(rates, engine="loop")
+
+
+def test_synthetic_rates_hit_every_rule():
+    candles = build_candles(synthetic_rates(1000, 0), engine="vectorized")
+    colors = {c["color"] for c in candles}
+    assert {'#00FF00', '#FF0040', '#FF00FF'} <= colors
+
+    # Cooldown: two V-Shapes are never closer than V_SHAPE_COOLDOWN bars
+    hits = [i for i, c in enumerate(candles) if c["pattern"] == "V_SHAPE"]
+    assert len(hits) > 10
+    assert min(np.diff(hits)) >= V_SHAPE_COOLDOWN
+
+
+def test_empty_rates():
+    rates = np.zeros(0, dtype=RATES_DTYPE)
+    assert build_candles(rates, engine="vectorized") == []
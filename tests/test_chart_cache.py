@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from src.services.chart_cache import ChartDataCache
+from src.testing import fake_mt5
+
+
+@pytest.fixture(autouse=True)
+def terminal():
+    fake_mt5.configure(now=1_700_000_000)
+    fake_mt5.initialize()
+
+
+class CountingFetch:
+    """fetch() for ChartDataCache.get: current M5 bars of the fake terminal."""
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return fake_mt5.copy_rates_from_pos("EURUSDm", fake_mt5.TIMEFRAME_M5, 0, 100)
+
+
+def get(cache, fetch, symbol="EURUSDm"):
+    return cache.get(fetch, symbol, "M5", 100, "VSA_CLIMAX,V_SHAPE")
+
+
+def test_concurrent_identical_requests_compute_once():
+    cache = ChartDataCache(ttl=5.0, stale=0.0, maxsize=8)
+    fetch = CountingFetch(delay=0.05)
+
+    async def run():
+        return await asyncio.gather(*(get(cache, fetch) for _ in range(50)))
+
+    entries = asyncio.run(run())
+    assert fetch.calls == 1
+    assert all(entry is entries[0] for entry in entries)
+    assert cache.stats["misses"] == 1 and cache.stats["coalesced"] == 49
+    assert not cache.inflight
+
+
+def test_ttl_hit_and_stale_while_refreshing():
+    async def run():
+        cache = ChartDataCache(ttl=5.0, stale=10.0, maxsize=8)
+        fetch = CountingFetch()
+        first = await get(cache, fetch)
+        assert await get(cache, fetch) is first and fetch.calls == 1
+        assert cache.stats["hits"] == 1
+
+        # Expired but within the stale window: served at once, refreshed behind it
+        first.checked_at -= 6.0
+        slow = CountingFetch(delay=0.05)
+        assert await get(cache, slow) is first
+        assert cache.stats["stale"] == 1
+        await asyncio.sleep(0.1)
+        assert slow.calls == 1 and cache.stats["revalidated"] == 1
+
+    asyncio.run(run())
+
+
+def test_new_bar_replaces_the_entry():
+    async def run():
+        cache = ChartDataCache(ttl=0.0, stale=0.0, maxsize=8)
+        fetch = CountingFetch()
+        first = await get(cache, fetch)
+
+        # Same last bar: revalidated, columns kept
+        assert await get(cache, fetch) is first
+        assert cache.stats["revalidated"] == 1
+
+        fake_mt5.advance(300)  # New bar
+        second = await get(cache, fetch)
+        assert second is not first
+        assert second.last_time == first.last_time + 300
+        assert fetch.calls == 3
+
+    asyncio.run(run())
+
+
+def test_lru_bound_evicts_least_recently_used():
+    async def run():
+        cache = ChartDataCache(ttl=60.0, stale=0.0, maxsize=2)
+        fetch = CountingFetch()
+        await get(cache, fetch, "EURUSDm")
+        await get(cache, fetch, "XAUUSDm")
+        await get(cache, fetch, "EURUSDm")  # Hit: now the most recently used
+        await get(cache, fetch, "GBPUSDm")
+        return cache
+
+    cache = asyncio.run(run())
+    assert [key[1] for key in cache.entries] == ["EURUSDm", "GBPUSDm"]
+    assert cache.stats["evictions"] == 1
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 3
+
+
+def test_fetch_errors_reach_every_waiter():
+    cache = ChartDataCache(ttl=5.0, stale=0.0, maxsize=8)
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("terminal gone")
+
+    async def run():
+        return await asyncio.gather(*(get(cache, failing) for _ in range(5)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert not cache.entries and not cache.inflight
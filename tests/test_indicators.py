@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+import pytest
+
+pd = pytest.importorskip("pandas")
+ta = pytest.importorskip("pandas_ta")
+
+from src.strategy.indicators import IndicatorEngine  # noqa: E402
+
+BARS = 5000
+
+
+def synthetic_closes(seed: int):
+    """Final closes plus a few intermediate (forming bar) prices per bar."""
+    rng = np.random.default_rng(seed)
+    closes = 1.1 + np.cumsum(rng.normal(0, 0.0005, BARS))
+    forming = closes[:, None] + rng.normal(0, 0.0003, (BARS, 3))
+    return closes, forming
+
+
+def assert_close(streamed, expected, name, index):
+    if expected is None or math.isnan(expected):
+        assert streamed is None, f"{name}[{index}] should still be warming up"
+        return
+    assert streamed is not None, f"{name}[{index}] missing"
+    assert streamed == pytest.approx(expected, rel=1e-9, abs=1e-9), f"{name}[{index}]"
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_streaming_matches_pandas_ta(seed):
+    closes, forming = synthetic_closes(seed)
+    series = pd.Series(closes)
+    rsi = ta.rsi(series, length=14).to_numpy()
+    ema_20 = ta.ema(series, length=20).to_numpy()
+    ema_50 = ta.ema(series, length=50).to_numpy()
+    bands = ta.bbands(series, length=20, std=2)
+    lower, middle, upper = (bands.iloc[:, k].to_numpy() for k in range(3))
+
+    engine = IndicatorEngine()
+    for i in range(BARS):
+        bar_time = 1_700_000_000 + 300 * i
+        # The forming bar moves several times before it closes on its final price
+        for price in forming[i]:
+            engine.on_bar(bar_time, float(price))
+        engine.on_bar(bar_time, float(closes[i]))
+
+        values = engine.latest()
+        assert_close(values["RSI"], rsi[i], "RSI", i)
+        assert_close(values["EMA_20"], ema_20[i], "EMA_20", i)
+        assert_close(values["EMA_50"], ema_50[i], "EMA_50", i)
+        assert_close(values["BBL_20_2.0"], lower[i], "BBL", i)
+        assert_close(values["BBM_20_2.0"], middle[i], "BBM", i)
+        assert_close(values["BBU_20_2.0"], upper[i], "BBU", i)
+
+
+def test_feed_only_processes_new_bars():
+    closes, _ = synthetic_closes(0)
+    rates = np.zeros(300, dtype=[('time', '<i8'), ('close', '<f8')])
+    rates['time'] = 1_700_000_000 + 300 * np.arange(300)
+    rates['close'] = closes[:300]
+
+    full = IndicatorEngine()
+    full.feed(rates)
+
+    # Same bars fed as overlapping 100-bar windows, like TradingBot.tick does
+    windowed = IndicatorEngine()
+    for end in range(100, 301, 7):
+        windowed.feed(rates[max(0, end - 100):end])
+    windowed.feed(rates[-100:])
+
+    assert windowed.latest() == pytest.approx(full.latest(), rel=1e-12)
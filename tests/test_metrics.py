@@ -0,0 +1,82 @@
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.services.metrics import Counter, LoopLagMonitor, MetricsRegistry, registry
+
+
+def samples(text):
+    """`name{labels} value` lines of a Prometheus text exposition."""
+    return [line for line in text.splitlines() if line and not line.startswith("#")]
+
+
+def test_histogram_exposition():
+    metrics = MetricsRegistry()
+    histogram = metrics.histogram("job_seconds", "Job duration", ("job",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, job="sync")
+
+    assert metrics.render().splitlines() == [
+        "# HELP job_seconds Job duration",
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{job="sync",le="0.1"} 2',  # le is inclusive
+        'job_seconds_bucket{job="sync",le="1.0"} 3',
+        'job_seconds_bucket{job="sync",le="+Inf"} 4',
+        'job_seconds_sum{job="sync"} 3.65',
+        'job_seconds_count{job="sync"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    metrics = MetricsRegistry()
+    counter = metrics.counter("errors_total", "Errors", ("message",))
+    counter.inc(message='path C:\\mt5 "quoted"\nsecond line')
+
+    assert samples(metrics.render()) == [
+        'errors_total{message="path C:\\\\mt5 \\"quoted\\"\\nsecond line"} 1',
+    ]
+
+
+def test_duplicate_registration():
+    metrics = MetricsRegistry()
+    counter = metrics.counter("calls_total", "Calls", ("outcome",))
+    counter.inc(outcome="ok")
+    assert metrics.counter("calls_total", "Calls", ("outcome",)) is counter  # Samples kept
+
+    with pytest.raises(ValueError):
+        metrics.gauge("calls_total", "Calls")
+    with pytest.raises(ValueError):
+        metrics.counter("calls_total", "Calls", ("func",))
+    assert isinstance(metrics.metrics["calls_total"], Counter)
+
+
+def test_new_loop_lag_monitor_takes_over_the_gauge():
+    first, second = LoopLagMonitor(), LoopLagMonitor()
+    first.last_lag, second.last_lag = 1.5, 0.25
+
+    assert "event_loop_lag_last_seconds 0.25" in samples(registry.render())
+
+
+def test_metrics_endpoint_is_valid_prometheus_text():
+    with TestClient(app) as client:
+        client.get("/api/status")
+        response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    text = response.text
+    assert text.endswith("\n")
+    sample = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_]\w*="([^"\\\n]|\\.)*",?)*\})? \S+$')
+    for line in samples(text):
+        assert sample.match(line), line
+
+    types = dict(re.findall(r"^# TYPE (\S+) (\S+)$", text, re.M))
+    assert types["http_request_duration_seconds"] == "histogram"
+    assert types["event_loop_lag_last_seconds"] == "gauge"
+    route = r'method="GET",route="/api/status",status="200"'
+    assert re.search(rf'^http_request_duration_seconds_bucket\{{{route},le="\+Inf"\}} [1-9]', text, re.M)
+    assert re.search(rf"^http_request_duration_seconds_sum\{{{route}\}} ", text, re.M)
+    assert re.search(rf"^http_request_duration_seconds_count\{{{route}\}} [1-9]", text, re.M)
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.services.mt5_client import AsyncMT5Client, MT5QueueFullError, MT5TimeoutError
+
+
+@pytest.fixture
+def client():
+    client = AsyncMT5Client(max_queue=2, default_timeout=0.05)
+    yield client
+    client.stop(timeout=0.5)
+
+
+@pytest.fixture
+def stuck():
+    """A terminal call that blocks the worker until the test releases it."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def terminal_call():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    terminal_call.started = started
+    terminal_call.release = release
+    yield terminal_call
+    release.set()
+
+
+def test_timeout_releases_the_caller_and_skips_queued_calls(client, stuck):
+    ran = []
+
+    async def scenario():
+        with pytest.raises(MT5TimeoutError):
+            await client.run(stuck)
+        with pytest.raises(MT5TimeoutError):
+            await client.run(ran.append, "queued")  # Still waiting behind the stuck call
+
+    asyncio.run(scenario())
+    stuck.release.set()
+    assert client.submit(lambda: "after").result(timeout=1) == "after"
+
+    assert ran == []
+    assert client.metrics["timeouts"] == 2
+    assert client.metrics["cancelled"] == 1
+
+
+def test_cancelled_caller_skips_the_queued_call(client, stuck):
+    ran = []
+
+    async def scenario():
+        client.submit(stuck)
+        task = asyncio.create_task(client.run(ran.append, "queued", timeout=5))
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    stuck.release.set()
+    client.submit(lambda: None).result(timeout=1)
+
+    assert ran == []
+    assert client.metrics["cancelled"] == 1
+
+
+def test_full_queue_rejects_new_calls(client, stuck):
+    client.submit(stuck)
+    assert stuck.started.wait(1)
+    queued = [client.submit(lambda: 1), client.submit(lambda: 2)]
+
+    with pytest.raises(MT5QueueFullError):
+        client.submit(lambda: 3)
+    assert client.metrics["rejected"] == 1
+
+    stuck.release.set()
+    assert [future.result(timeout=1) for future in queued] == [1, 2]
+
+
+def test_stop_does_not_hang_on_a_stuck_worker_with_a_full_queue(client, stuck):
+    client.submit(stuck)
+    assert stuck.started.wait(1)
+    pending = [client.submit(lambda: None) for _ in range(client.max_queue)]
+
+    started = time.perf_counter()
+    client.stop(timeout=0.2)
+    assert time.perf_counter() - started < 1.0
+
+    assert all(future.cancelled() for future in pending)
+    assert client.metrics["cancelled"] == 2
+    assert client.queue_depth <= 1  # Only the stop sentinel may remain
+
+
+def test_stop_finishes_queued_calls_first(client):
+    futures = [client.submit(lambda i=i: i) for i in range(2)]
+    client.stop(timeout=1)
+    assert [future.result(timeout=0) for future in futures] == [0, 1]
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+
+from src.services.mt5_connection import ConnectionManager
+from src.services.mt5_service import MT5Service
+from src.testing import fake_mt5
+
+
+@pytest.fixture
+def service():
+    fake_mt5.configure(now=1_700_000_000)
+    return MT5Service()
+
+
+def manager(service, **kwargs):
+    options = {"check_interval": 60.0, "base_delay": 0.1, "max_delay": 0.4}
+    options.update(kwargs)
+    return ConnectionManager(service, **options)
+
+
+def test_backoff_is_exponential_capped_and_jittered(service):
+    connection = manager(service, base_delay=1.0, max_delay=30.0)
+    for failures, delay in ((1, 1.0), (2, 2.0), (3, 4.0), (5, 16.0), (6, 30.0), (20, 30.0)):
+        samples = [connection.backoff(failures) for _ in range(200)]
+        assert all(delay / 2 <= s <= delay for s in samples)
+        assert len(set(samples)) > 1  # Jitter: processes do not retry in lockstep
+
+
+def test_not_ready_is_answered_without_touching_the_terminal(service):
+    connection = manager(service)
+    fake_mt5.disconnect(down_for=60)
+
+    assert not connection.ensure()  # One real attempt
+    assert fake_mt5.terminal.calls["initialize"] == 1
+    assert 0 < connection.retry_in() <= 0.1
+
+    started = time.perf_counter()
+    assert not any(connection.ensure() for _ in range(1000))
+    assert time.perf_counter() - started < 0.1
+    assert fake_mt5.terminal.calls["initialize"] == 1
+    assert connection.stats["not_ready"] == 1000
+
+
+def test_reconnects_once_the_terminal_is_back(service):
+    connection = manager(service)
+    fake_mt5.disconnect(down_for=0.15)
+
+    attempts = 0
+    deadline = time.monotonic() + 5
+    while not connection.ensure():
+        attempts += 1
+        assert time.monotonic() < deadline
+        time.sleep(connection.retry_in() + 0.001)
+
+    assert 1 <= attempts <= 4  # 0.05-0.1s, then 0.1-0.2s... not a retry storm
+    assert connection.failures == 0 and connection.generation == 1
+    assert connection.ready
+
+
+def test_lost_terminal_is_detected_and_symbols_reselected(service):
+    connection = manager(service)
+    assert connection.ensure()
+    assert service.get_symbol_price("EURUSDm") is not None
+    assert service.get_symbol_price("EURUSDm") is not None
+    assert fake_mt5.terminal.calls["symbol_select"] == 1  # Selected once per connection
+
+    fake_mt5.disconnect()
+    assert connection.check()  # Throttled: no terminal_info yet
+    assert connection.stats["checks"] == 0
+    assert connection.check(force=True)  # terminal_info fails -> reconnected right away
+    assert connection.stats["lost"] == 1 and connection.generation == 2
+
+    assert service.get_symbol_price("EURUSDm") is not None
+    assert fake_mt5.terminal.calls["symbol_select"] == 2  # Re-selected after the reconnect
+
+
+def test_background_checks_run_reconnect_callbacks(service):
+    connection = manager(service, check_interval=0.05, base_delay=0.05)
+    reconnects = []
+
+    async def on_reconnect():
+        reconnects.append(connection.generation)
+
+    async def run():
+        connection.on_reconnect(on_reconnect)
+        connection.start()
+        try:
+            await asyncio.sleep(0.2)
+            assert connection.ready and reconnects == []  # The first connect is not a reconnect
+
+            fake_mt5.disconnect(down_for=0.1)
+            deadline = time.monotonic() + 5
+            while not reconnects:
+                assert time.monotonic() < deadline
+                await asyncio.sleep(0.02)
+        finally:
+            connection.stop()
+
+    asyncio.run(run())
+    assert reconnects == [2]
+    assert connection.stats["lost"] == 1
@@ -0,0 +1,123 @@
+import asyncio
+import datetime
+import time
+
+import pytest
+from telegram.error import BadRequest, RetryAfter, TimedOut
+
+from src.services import notification_dispatcher
+from src.services.notification_dispatcher import NotificationDispatcher
+
+
+class FakeBot:
+    """Records the calls; `errors` are raised by the next send_message calls, in order."""
+    def __init__(self, errors=(), hang=False):
+        self.errors = list(errors)
+        self.hang = hang
+        self.messages = []
+        self.photos = []
+        self.times = []
+
+    async def send_message(self, chat_id, text):
+        self.times.append(time.monotonic())
+        if self.hang:
+            await asyncio.Event().wait()
+        if self.errors:
+            raise self.errors.pop(0)
+        self.messages.append(text)
+
+    async def send_photo(self, chat_id, photo, caption=None):
+        self.times.append(time.monotonic())
+        self.photos.append((photo, caption))
+
+
+def dispatcher(bot, **kwargs):
+    options = {"rate": 100.0, "burst": 10, "coalesce_seconds": 0.0, "max_retries": 3}
+    options.update(kwargs)
+    return NotificationDispatcher(bot, chat_id=1, **options)
+
+
+def test_burst_is_coalesced_into_one_message():
+    bot = FakeBot()
+
+    async def run():
+        alerts = dispatcher(bot, coalesce_seconds=0.1)
+        for text in ("🟢 BUY EURUSDm", "🟢 BUY EURUSDm", "🔴 SELL XAUUSDm", "🟢 BUY EURUSDm"):
+            assert alerts.notify(text)
+        await alerts.drain()
+        alerts.stop()
+        return alerts.stats
+
+    stats = asyncio.run(run())
+    assert bot.messages == ["🟢 BUY EURUSDm (x2)\n\n🔴 SELL XAUUSDm\n\n🟢 BUY EURUSDm"]
+    assert stats["coalesced"] == 3 and stats["sent"] == 1
+
+
+def test_token_bucket_spaces_the_sends():
+    bot = FakeBot()
+
+    async def run():
+        alerts = dispatcher(bot, rate=20.0, burst=1)
+        for i in range(5):
+            alerts.notify_photo(b"png", caption=str(i))  # Photos are never merged
+        await alerts.drain()
+        alerts.stop()
+
+    asyncio.run(run())
+    assert [caption for _, caption in bot.photos] == ["0", "1", "2", "3", "4"]
+    gaps = [b - a for a, b in zip(bot.times, bot.times[1:])]
+    assert min(gaps) >= 0.045  # 20 per second
+
+
+def test_retry_after_and_network_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(notification_dispatcher.random, "random", lambda: 0.0)  # Backoff 0.5s
+    bot = FakeBot(errors=[RetryAfter(datetime.timedelta(seconds=0.3)), TimedOut()])
+
+    async def run():
+        alerts = dispatcher(bot)
+        started = time.monotonic()
+        alerts.notify("🟢 BUY EURUSDm")
+        await alerts.drain()
+        alerts.stop()
+        return alerts.stats, time.monotonic() - started
+
+    stats, elapsed = asyncio.run(run())
+    assert bot.messages == ["🟢 BUY EURUSDm"]
+    assert stats["retries"] == 2 and stats["sent"] == 1
+    # 429 paused the bucket for retry_after, then the TimedOut backoff
+    assert bot.times[1] - bot.times[0] >= 0.28
+    assert elapsed >= 0.75
+
+
+def test_bad_request_is_dropped_without_retry():
+    bot = FakeBot(errors=[BadRequest("chat not found")])
+
+    async def run():
+        alerts = dispatcher(bot)
+        alerts.notify("hello")
+        await alerts.drain()
+        alerts.stop()
+        return alerts.stats
+
+    stats = asyncio.run(run())
+    assert stats["failed"] == 1 and stats["retries"] == 0
+    assert len(bot.times) == 1
+
+
+def test_notify_never_blocks():
+    bot = FakeBot(hang=True)  # Telegram never answers
+
+    async def run():
+        alerts = dispatcher(bot, maxsize=10)
+        started = time.perf_counter()
+        accepted = [alerts.notify(f"alert {i}") for i in range(1000)]
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(0.05)  # Sender is stuck on the first message
+        assert alerts.notify("one more")  # Room again: the stuck batch left the queue
+        alerts.stop()
+        return accepted, elapsed, alerts.stats
+
+    accepted, elapsed, stats = asyncio.run(run())
+    assert elapsed < 0.5
+    assert accepted[:10] == [True] * 10 and not any(accepted[10:])
+    assert stats["dropped"] == 990
@@ -0,0 +1,104 @@
+import json
+from collections import OrderedDict
+
+import pytest
+
+from src.testing import fake_mt5
+
+pytest.importorskip("pandas_ta")  # src.backtest.engine
+from src.backtest.engine import BacktestConfig, run_backtest  # noqa: E402
+from src.backtest.optimizer import (  # noqa: E402
+    Optimizer,
+    _column,
+    _worker,
+    check_space,
+    evaluate,
+    grid,
+    parse_space,
+    rank,
+)
+
+
+@pytest.fixture(scope="module")
+def rates():
+    fake_mt5.configure(now=1_700_000_000)
+    fake_mt5.initialize()
+    bars = fake_mt5.copy_rates_from_pos("EURUSDm", fake_mt5.TIMEFRAME_M5, 0, 3000)
+    fake_mt5.configure(now=1_700_000_000)
+    return bars
+
+
+def small_grid():
+    space = parse_space([
+        "rsi_length=7,14", "vsa_multiplier=1.0,3.0", "confirm_vsa_climax=0,5", "confirm_v_shape=0,5",
+    ])
+    return grid(space)
+
+
+def test_parse_space_only_accepts_strategy_fields():
+    assert parse_space(["rsi_oversold=20:30:5"]) == {"rsi_oversold": [20, 25, 30]}
+    for spec in ("symbol=X,Y", "contract_size=1,10", "initial_balance=100,200", "volume=0.1,0.2"):
+        with pytest.raises(ValueError):
+            parse_space([spec])
+    # --set can still fix them
+    assert parse_space(["point=0.01"], BacktestConfig.model_fields) == {"point": [0.01]}
+
+
+def test_inert_filter_parameters_are_refused():
+    with pytest.raises(ValueError, match="vsa_multiplier"):
+        check_space(parse_space(["vsa_multiplier=1.0,3.0"]), {})
+    with pytest.raises(ValueError, match="ema_fast"):
+        check_space(parse_space(["ema_fast=10,20"]), {"ema_trend_filter": False})
+    check_space(parse_space(["vsa_multiplier=1.0,3.0", "confirm_vsa_climax=0,5"]), {})
+    check_space(parse_space(["ema_fast=10,20"]), {"ema_trend_filter": True})
+
+
+def test_vsa_multiplier_changes_the_signals(rates):
+    results = {
+        multiplier: run_backtest(rates, BacktestConfig(rsi_length=7, vsa_multiplier=multiplier, confirm_vsa_climax=5)).stats
+        for multiplier in (1.0, 3.0)
+    }
+    assert results[1.0]["vsa_climax_bars"] > results[3.0]["vsa_climax_bars"]
+    assert results[1.0]["trades"] != results[3.0]["trades"]
+
+
+def test_evaluate_with_cached_columns_matches_run_backtest(rates):
+    _worker["cache"] = OrderedDict()  # What _init_worker sets up in the pool processes
+    for params in small_grid():
+        config = BacktestConfig(**params)
+        expected = run_backtest(rates, config).stats
+        stats = evaluate(rates, config, _column)
+        assert stats == {key: expected[key] for key in stats}, params
+
+
+def test_optimizer_resumes_and_ranks(rates, tmp_path):
+    path = tmp_path / "results.jsonl"
+    combos = small_grid()
+
+    first = Optimizer(rates, results_path=str(path), workers=2)
+    first.run(combos[:len(combos) // 2])
+    assert first.stats["evaluated"] == len(combos) // 2
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"id": "torn')  # Killed in the middle of a line
+
+    second = Optimizer(rates, results_path=str(path), workers=2)
+    records = second.run(combos)
+    assert second.stats["skipped"] == len(combos) // 2
+    assert second.stats["evaluated"] == len(combos) - len(combos) // 2
+    assert len(records) == len(combos)
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines[len(combos) // 2] == '{"id": "torn'
+    assert len({json.loads(line)["id"] for line in lines if line != '{"id": "torn'}) == len(combos)
+
+    # Same stats as a single backtest of the combination
+    for record in records:
+        expected = run_backtest(rates, BacktestConfig(**record["params"])).stats
+        assert record["stats"]["net_profit"] == pytest.approx(expected["net_profit"])
+        assert record["stats"]["trades"] == expected["trades"]
+
+    ranked = rank(records, "net_profit")
+    profits = [r["stats"]["net_profit"] for r in ranked]
+    assert profits == sorted(profits, reverse=True)
+    drawdowns = [r["stats"]["max_drawdown"] for r in rank(records, "max_drawdown")]
+    assert drawdowns == sorted(drawdowns)
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from src.services.mt5_client import mt5_client
+from src.services.trade_service import OrderPipeline
+
+
+class SlowTrades:
+    """order_send that outlives the MT5 call timeout."""
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.sent = []
+
+    def send_market_order(self, symbol, side, volume, sl=0.0, tp=0.0, signal_time=None):
+        time.sleep(self.seconds)
+        self.sent.append((side, symbol))
+        return "filled"
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def test_timed_out_order_keeps_the_symbol_in_flight(monkeypatch):
+    monkeypatch.setattr(mt5_client, "default_timeout", 0.05)
+    trades = SlowTrades(0.3)
+
+    async def run():
+        pipeline = OrderPipeline(trades)
+        try:
+            assert await pipeline.submit("BUY", "EURUSDm", 0.01) is None  # Timed out
+            assert pipeline.is_in_flight("EURUSDm")  # order_send is still running
+            await wait_for(lambda: trades.sent)
+            await wait_for(lambda: not pipeline.is_in_flight("EURUSDm"))
+        finally:
+            pipeline.stop()
+
+    asyncio.run(run())
+    assert trades.sent == [("BUY", "EURUSDm")]
+
+
+def test_order_result_is_returned():
+    trades = SlowTrades(0.0)
+
+    async def run():
+        pipeline = OrderPipeline(trades)
+        try:
+            assert await pipeline.submit("SELL", "EURUSDm", 0.01) == "filled"
+            await wait_for(lambda: not pipeline.is_in_flight("EURUSDm"))
+        finally:
+            pipeline.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.bot_instance import global_bot
+from src.main import app
+from src.services.trade_service import TradeService
+from src.testing import fake_mt5
+
+
+@pytest.fixture
+def trade_service():
+    fake_mt5.configure(now=1_700_000_000)
+    fake_mt5.initialize()
+    return TradeService(magic_number=777)
+
+
+def market_order(symbol, order_type, magic=0, position=None):
+    tick = fake_mt5.symbol_info_tick(symbol)
+    request = {
+        "action": fake_mt5.TRADE_ACTION_DEAL, "symbol": symbol, "volume": 0.01, "type": order_type,
+        "price": tick.ask if order_type == fake_mt5.ORDER_TYPE_BUY else tick.bid, "deviation": 20, "magic": magic,
+    }
+    if position is not None:
+        request["position"] = position
+    return request, fake_mt5.order_send(request)
+
+
+def test_on_order_result_updates_the_book(trade_service):
+    book = trade_service.position_book
+    result = trade_service.send_market_order("EURUSDm", "BUY", 0.01)
+    assert result is not None and result.retcode == fake_mt5.TRADE_RETCODE_DONE
+
+    # Filled into the book right away, no positions_get needed
+    assert book.has_position("EURUSDm")
+    assert book.active_orders() == 1
+    assert fake_mt5.terminal.calls.get("positions_get", 0) == 0
+
+    request, close = market_order("EURUSDm", fake_mt5.ORDER_TYPE_SELL, magic=777, position=result.order)
+    book.on_order_result(request, close)
+    assert not book.has_position("EURUSDm")
+    assert book.active_orders() == 0
+
+
+def test_reconcile_replaces_stale_entries(trade_service):
+    book = trade_service.position_book
+    result = trade_service.send_market_order("EURUSDm", "BUY", 0.01)
+
+    # Closed behind the bot's back (SL/TP, manually), and opened by another program
+    fake_mt5.terminal.positions.pop(result.order)
+    market_order("XAUUSDm", fake_mt5.ORDER_TYPE_SELL, magic=777)
+    market_order("EURUSDm", fake_mt5.ORDER_TYPE_BUY, magic=1)
+    assert book.has_position("EURUSDm")
+
+    assert book.reconcile()
+    assert not book.has_position("EURUSDm")
+    assert book.has_position("EURUSDm", magic=1)
+    assert book.has_position("XAUUSDm")
+    assert book.stats["drift"] == 1
+
+    fake_mt5.disconnect()
+    assert not book.reconcile()  # Terminal did not answer: the book is kept
+    assert book.has_position("XAUUSDm")
+
+
+def test_has_exposure_gates_repeated_signals(trade_service):
+    async def run():
+        assert not trade_service.has_exposure("EURUSDm")
+        future = trade_service.pipeline.submit("BUY", "EURUSDm", 0.01)
+        assert trade_service.has_exposure("EURUSDm")  # Queued, not filled yet
+        await future
+        assert trade_service.has_exposure("EURUSDm")  # Filled: in the book
+        trade_service.pipeline.stop()
+
+    asyncio.run(run())
+    assert not trade_service.has_exposure("XAUUSDm")
+
+
+def test_status_reports_positions_without_starting_the_bot():
+    fake_mt5.configure(now=1_700_000_000)
+    global_bot.mt5_service.connected = False
+    fake_mt5.initialize()
+    market_order("EURUSDm", fake_mt5.ORDER_TYPE_BUY, magic=global_bot.trade_service.magic_number)
+
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 5
+        while client.get("/api/status").json()["activeOrders"] != 1:
+            assert time.monotonic() < deadline, "activeOrders never left 0"
+            time.sleep(0.05)
+        assert not client.get("/api/status").json()["isRunning"]
+
+
+def test_api_bot_reconciles_after_reconnect():
+    fake_mt5.configure(now=1_700_000_000)
+    fake_mt5.initialize()
+    book = global_bot.trade_service.position_book
+    book.positions = {}
+    market_order("XAUUSDm", fake_mt5.ORDER_TYPE_BUY, magic=global_bot.trade_service.magic_number)
+
+    # What ConnectionManager.run does once a lost connection is back
+    asyncio.run(global_bot.mt5_service.connection._notify())
+    assert book.has_position("XAUUSDm")
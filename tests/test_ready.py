@@ -0,0 +1,41 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.bot_instance import global_bot
+from src.config.settings import settings
+from src.main import app
+from src.router import startup
+from src.testing import fake_mt5
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake_mt5.configure(now=1_700_000_000)
+    global_bot.mt5_service.connected = False
+    global_bot.mt5_service.candle_cache.invalidate()
+    monkeypatch.setattr(startup, "steps", dict(startup.steps))
+    return TestClient(app)
+
+
+def wait_ready(client, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get("/api/ready")
+        if response.status_code == 200:
+            return response.json()
+        time.sleep(0.02)
+    return None
+
+
+def test_ready_follows_connection_without_warmup(client, monkeypatch):
+    monkeypatch.setattr(settings, "STARTUP_WARMUP", False)
+    with client:
+        status = wait_ready(client)
+        assert status is not None, "/api/ready stayed 503"
+        assert set(status["steps"].values()) == {"skipped"}
+        assert status["connection"]["connected"]
+
+        global_bot.mt5_service.connected = False
+        assert client.get("/api/ready").status_code == 503
@@ -0,0 +1,57 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.testing import fake_mt5
+from src.ticks.recorder import TickRecorder
+from src.ticks.replay import ReplayEngine, ReplayMarket
+from src.ticks.store import TickStore
+
+
+@pytest.fixture
+def market(tmp_path):
+    fake_mt5.configure(now=1_700_000_000)
+    fake_mt5.initialize()
+    store = TickStore(str(tmp_path))
+
+    async def record():
+        recorder = TickRecorder(store, ["EURUSDm"], interval=10)
+        for _ in range(30):
+            fake_mt5.advance(10)
+            await recorder.poll()
+        await recorder.stop()
+
+    asyncio.run(record())
+    market = ReplayMarket(store)
+    fake_mt5.configure(symbols=market.symbols, market=market, now=market.start_msc / 1000)
+    fake_mt5.initialize()
+    yield market
+    fake_mt5.configure(now=1_700_000_000)
+
+
+def test_copy_ticks_round_trip(market):
+    recorded = market.recorded["EURUSDm"]
+    assert len(recorded) > 0
+
+    fake_mt5.terminal.now = market.end_msc / 1000
+    ticks = fake_mt5.copy_ticks_range("EURUSDm", market.start_msc / 1000, market.end_msc / 1000,
+                                      fake_mt5.COPY_TICKS_ALL)
+    assert np.array_equal(ticks, recorded)
+
+    ticks = fake_mt5.copy_ticks_from("EURUSDm", market.start_msc / 1000, 50, fake_mt5.COPY_TICKS_ALL)
+    assert np.array_equal(ticks, recorded[:50])
+
+
+def test_copy_ticks_only_sees_the_replayed_part(market):
+    recorded = market.recorded["EURUSDm"]
+    middle = int(recorded['time_msc'][len(recorded) // 2])
+
+    async def replay():
+        await ReplayEngine(market, speed=0).run(steps=len(recorded) // 2 + 1)
+
+    asyncio.run(replay())
+    assert fake_mt5.terminal.now * 1000 == middle
+    ticks = fake_mt5.copy_ticks_from("EURUSDm", market.start_msc / 1000, len(recorded), fake_mt5.COPY_TICKS_ALL)
+    assert np.array_equal(ticks, recorded[recorded['time_msc'] <= middle])
+    assert fake_mt5.symbol_info_tick("EURUSDm").time_msc == middle
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from src.config.settings import settings
+from src.services.candle_cache import CandleCache
+from src.strategy.resample import resample
+from src.testing import fake_mt5
+from src.ticks.replay import ReplayMarket
+from src.ticks.store import TickStore
+
+DAY = 86400
+START = 1_699_920_000  # 2023-11-14 00:00 UTC
+FIELDS = ("time", "open", "high", "low", "close", "tick_volume", "real_volume")
+WINDOWS = {fake_mt5.TIMEFRAME_M5: 50, fake_mt5.TIMEFRAME_H1: 30, fake_mt5.TIMEFRAME_D1: 3}
+
+
+@pytest.fixture
+def replay(tmp_path, monkeypatch):
+    """
+    A consistent feed: every timeframe of the replayed market is built from the same
+    ticks (the fake walk's timeframes are independent and never match a resample).
+    """
+    monkeypatch.setattr(settings, "RESAMPLE_REFRESH_INTERVAL", 0.0)
+    fake_mt5.configure(now=START + 3.5 * DAY)
+    fake_mt5.initialize()
+    ticks = fake_mt5.copy_ticks_range("EURUSDm", START, START + 3.5 * DAY, fake_mt5.COPY_TICKS_ALL)
+    store = TickStore(str(tmp_path))
+    store.append("EURUSDm", ticks[::5])
+
+    market = ReplayMarket(store)
+    fake_mt5.configure(symbols=market.symbols, market=market, now=START + 2 * DAY + 22 * 3600)
+    fake_mt5.initialize()
+    yield market
+    fake_mt5.configure(now=1_700_000_000)
+
+
+def assert_matches_native(cache):
+    for timeframe, count in WINDOWS.items():
+        rates, _ = cache.get_window("EURUSDm", timeframe, count)
+        native = fake_mt5.copy_rates_from_pos("EURUSDm", timeframe, 0, count)
+        assert len(rates) == len(native)
+        for field in FIELDS:
+            assert np.array_equal(rates[field], native[field]), (timeframe, field)
+
+
+def test_resampled_timeframes_match_native_bars(replay):
+    cache = CandleCache(resample_from_m1=True)
+    assert_matches_native(cache)  # Warmup: native fetches
+
+    # 3 hours in 37s steps: M5 / H1 closes and the D1 close at midnight
+    for _ in range(300):
+        fake_mt5.advance(37)
+        assert_matches_native(cache)
+
+    assert cache.stats["resampled"] > 0
+    assert cache.stats["warmups"] == len(WINDOWS) + 1  # + the M1 series, no re-warm
+
+
+def test_shifted_session_warmup_is_capped(replay, monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_OFFSET_HOURS", -2.0)
+    monkeypatch.setattr(settings, "RESAMPLE_M1_WARMUP_MAX", 1500)
+    cache = CandleCache(resample_from_m1=True)
+
+    rates, _ = cache.get_window("EURUSDm", fake_mt5.TIMEFRAME_D1, 100)  # Would need 145,440 M1 bars
+    assert cache.stats["bars_fetched"] <= 1500
+
+    m1 = fake_mt5.copy_rates_from_pos("EURUSDm", fake_mt5.TIMEFRAME_M1, 0, 1500)
+    expected = resample(m1, DAY, -2 * 3600)
+    assert len(rates) == len(expected) < 100
+    assert np.array_equal(rates["time"] % DAY, np.full(len(rates), DAY - 2 * 3600))
+    for field in FIELDS:
+        assert np.array_equal(rates[field], expected[field]), field
+
+
+def test_resampling_is_off_by_default():
+    assert not CandleCache().resample_from_m1
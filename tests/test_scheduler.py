@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from src.config.settings import settings, WatchlistEntry
+from src.services.mt5_service import MT5Service
+from src.testing import fake_mt5
+
+pytest.importorskip("pandas_ta")  # src.scheduler -> src.strategy.analysis
+from src.scheduler import WatchlistScheduler  # noqa: E402
+
+
+class NoTrades:
+    def has_exposure(self, symbol):
+        return True
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    fake_mt5.configure(now=1_700_000_000)  # 2023-11-14 22:13:20 UTC
+    monkeypatch.setattr(settings, "ANALYSIS_TRIGGER", "bar_close")
+    entries = [WatchlistEntry(symbol="EURUSDm", timeframe="M5"), WatchlistEntry(symbol="EURUSDm", timeframe="H1")]
+    scheduler = WatchlistScheduler(MT5Service(), NoTrades(), entries=entries)
+    scheduler.mt5_service.initialize()
+
+    scheduler.processed = []
+    process = scheduler._process
+
+    async def recording(instrument, rates):
+        scheduler.processed.append(instrument.entry.timeframe)
+        await process(instrument, rates)
+
+    scheduler._process = recording
+    return scheduler
+
+
+def test_every_timeframe_of_a_symbol_sees_its_bar_closes(scheduler):
+    async def run():
+        await scheduler.run_cycle()
+        assert sorted(scheduler.processed) == ["H1", "M5"]
+
+        # 5 minute steps up to 23:05: M5 closes every step, H1 once at 23:00
+        for _ in range(10):
+            fake_mt5.advance(300)
+            await scheduler.run_cycle()
+
+    asyncio.run(run())
+    assert scheduler.processed.count("M5") == 11
+    assert scheduler.processed.count("H1") == 2